@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the Procrustes routines, run with airspeed velocity (asv).
+
+The benchmarks record the wall time (``time_*``), peak memory (``peakmem_*``) and the Procrustes
+error (``track_*``) of the routines for several problem sizes. For example, in the root directory
+of the repository,
+
+.. code-block:: bash
+
+    pip install asv
+    asv run                      # benchmark the latest commit of the master branch
+    asv continuous master HEAD   # compare two commits, reporting significant changes
+    asv compare master HEAD      # compare the stored results of two commits
+    asv publish && asv preview   # browse the results across commits
+
+The problems are built from seeded random number generators, so the tracked errors of different
+commits can be compared directly.
+"""
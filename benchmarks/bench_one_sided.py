@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the one-sided Procrustes routines."""
+
+from procrustes import generalized, generic, orthogonal, permutation, rotational, symmetric
+
+from .common import random_one_sided
+
+SOLVERS = {
+    "orthogonal": orthogonal,
+    "rotational": rotational,
+    "symmetric": symmetric,
+    "generic": generic,
+    "permutation": permutation,
+}
+
+
+class OneSided:
+    """Time, memory & error of the one-sided Procrustes of a single pair of arrays."""
+
+    params = (list(SOLVERS), [100, 10000], [3, 50])
+    param_names = ["method", "m", "n"]
+
+    def setup(self, method, m, n):
+        self.a, self.b = random_one_sided(m, n)
+
+    def time_solve(self, method, m, n):
+        SOLVERS[method](self.a, self.b, translate=True, scale=True)
+
+    def peakmem_solve(self, method, m, n):
+        SOLVERS[method](self.a, self.b, translate=True, scale=True)
+
+    def track_error(self, method, m, n):
+        return SOLVERS[method](self.a, self.b, translate=True, scale=True).error
+
+
+class Generalized:
+    """Time, memory & error of the generalized Procrustes analysis."""
+
+    params = ([5, 20], [100, 1000])
+    param_names = ["n_arrays", "m"]
+
+    def setup(self, n_arrays, m):
+        self.arrays = [random_one_sided(m, 3, seed=seed)[1] for seed in range(n_arrays)]
+
+    def time_generalized(self, n_arrays, m):
+        generalized(self.arrays)
+
+    def peakmem_generalized(self, n_arrays, m):
+        generalized(self.arrays)
+
+    def track_error(self, n_arrays, m):
+        return generalized(self.arrays)[1]
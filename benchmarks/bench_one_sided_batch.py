@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the batched & streamed one-sided Procrustes routines.
+
+These routines are newer than the single-pair ones, so their benchmarks are kept apart from
+bench_one_sided, which can then be run on older commits as well.
+"""
+
+from procrustes import (generic_batch, iter_row_chunks, orthogonal, orthogonal_batch,
+                        orthogonal_stream, permutation_batch, rotational_batch, symmetric_batch)
+
+from .bench_one_sided import SOLVERS
+from .common import random_one_sided
+
+BATCH_SOLVERS = {
+    "orthogonal": orthogonal_batch,
+    "rotational": rotational_batch,
+    "symmetric": symmetric_batch,
+    "generic": generic_batch,
+    "permutation": permutation_batch,
+}
+
+
+class OneSidedBatch:
+    """Time & memory of the one-sided Procrustes of stacks of array pairs."""
+
+    params = (list(BATCH_SOLVERS), [100, 10000], [3, 10])
+    param_names = ["method", "k", "n"]
+
+    def setup(self, method, k, n):
+        self.a, self.b = random_one_sided(2 * n, n, k=k)
+
+    def time_batch(self, method, k, n):
+        BATCH_SOLVERS[method](self.a, self.b, translate=True)
+
+    def time_loop(self, method, k, n):
+        for a, b in zip(self.a, self.b):
+            SOLVERS[method](a, b, translate=True)
+
+    def peakmem_batch(self, method, k, n):
+        BATCH_SOLVERS[method](self.a, self.b, translate=True)
+
+
+class OneSidedStream:
+    """Time & memory of the orthogonal Procrustes of tall arrays processed in chunks of rows."""
+
+    params = ([10 ** 5, 10 ** 6], [10 ** 4, 10 ** 5])
+    param_names = ["m", "chunk_size"]
+    timeout = 300
+
+    def setup(self, m, chunk_size):
+        self.a, self.b = random_one_sided(m, 10)
+
+    def time_stream(self, m, chunk_size):
+        orthogonal_stream(iter_row_chunks(self.a, self.b, chunk_size=chunk_size), translate=True)
+
+    def peakmem_stream(self, m, chunk_size):
+        orthogonal_stream(iter_row_chunks(self.a, self.b, chunk_size=chunk_size), translate=True)
+
+    def peakmem_in_memory(self, m, chunk_size):
+        orthogonal(self.a, self.b, translate=True)
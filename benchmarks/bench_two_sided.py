@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the two-sided Procrustes routines."""
+
+from procrustes import orthogonal_2sided, permutation_2sided, softassign
+
+from .common import random_two_sided
+
+
+class OrthogonalTwoSided:
+    """Time, memory & error of the two-sided orthogonal Procrustes."""
+
+    params = ([True, False], [10, 100, 500])
+    param_names = ["single", "n"]
+
+    def setup(self, single, n):
+        self.a, self.b = random_two_sided(n)
+
+    def time_solve(self, single, n):
+        orthogonal_2sided(self.a, self.b, single=single)
+
+    def peakmem_solve(self, single, n):
+        orthogonal_2sided(self.a, self.b, single=single)
+
+    def track_error(self, single, n):
+        return orthogonal_2sided(self.a, self.b, single=single).error
+
+
+class PermutationTwoSided:
+    """Time, memory & error of the two-sided permutation Procrustes with one transformation."""
+
+    params = (["approx-normal1", "approx-normal2", "approx-umeyama", "approx-umeyama-svd", "nmf",
+               "faq", "soft-assign"],
+              [10, 50, 200], [True, False])
+    param_names = ["method", "n", "symmetric"]
+    timeout = 300
+
+    def setup(self, method, n, symmetric):
+        self.a, self.b = random_two_sided(n, symmetric=symmetric)
+
+    def time_solve(self, method, n, symmetric):
+        permutation_2sided(self.a, self.b, single=True, method=method)
+
+    def peakmem_solve(self, method, n, symmetric):
+        permutation_2sided(self.a, self.b, single=True, method=method)
+
+    def track_error(self, method, n, symmetric):
+        return permutation_2sided(self.a, self.b, single=True, method=method).error
+
+
+class PermutationTwoSidedKopt:
+    """Time & error of the two-sided permutation Procrustes with the k-opt heuristic search."""
+
+    params = ([6, 12, 20], [2, 3])
+    param_names = ["n", "k"]
+    timeout = 600
+
+    def setup(self, n, k):
+        self.a, self.b = random_two_sided(n)
+
+    def time_solve(self, n, k):
+        permutation_2sided(self.a, self.b, single=True, method="k-opt", options={"k": k})
+
+    def track_error(self, n, k):
+        res = permutation_2sided(self.a, self.b, single=True, method="k-opt", options={"k": k})
+        return res.error
+
+
+class PermutationTwoSidedKoptDouble:
+    """Time & error of the two-sided permutation Procrustes (two transformations) with k-opt."""
+
+    # the k-opt search over pairs of permutations scales as n^(2k), so the sizes are small
+    params = ([4, 6, 8], [2, 3])
+    param_names = ["n", "k"]
+    timeout = 600
+
+    def setup(self, n, k):
+        self.a, self.b = random_two_sided(n, symmetric=False)
+
+    def time_solve(self, n, k):
+        permutation_2sided(self.a, self.b, single=False, method="k-opt", options={"k": k})
+
+    def track_error(self, n, k):
+        res = permutation_2sided(self.a, self.b, single=False, method="k-opt", options={"k": k})
+        return res.error
+
+
+class PermutationTwoSidedFlipFlop:
+    """Time, memory & error of the two-sided permutation Procrustes with two transformations."""
+
+    params = [10, 50, 200]
+    param_names = ["n"]
+
+    def setup(self, n):
+        self.a, self.b = random_two_sided(n, symmetric=False)
+
+    def time_solve(self, n):
+        permutation_2sided(self.a, self.b, single=False, method="flip-flop")
+
+    def peakmem_solve(self, n):
+        permutation_2sided(self.a, self.b, single=False, method="flip-flop")
+
+    def track_error(self, n):
+        return permutation_2sided(self.a, self.b, single=False, method="flip-flop").error
+
+
+class Softassign:
+    """Time, memory & error of the softassign algorithm."""
+
+    params = [10, 30, 50]
+    param_names = ["n"]
+    timeout = 600
+
+    def setup(self, n):
+        self.a, self.b = random_two_sided(n)
+
+    def time_solve(self, n):
+        softassign(self.a, self.b)
+
+    def peakmem_solve(self, n):
+        softassign(self.a, self.b)
+
+    def track_error(self, n):
+        return softassign(self.a, self.b).error
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Shared helpers for building the (seeded) benchmark problems."""
+
+import numpy as np
+
+__all__ = [
+    "random_one_sided",
+    "random_two_sided",
+]
+
+
+def random_one_sided(m, n, seed=42, k=None):
+    r"""Return random arrays A & B=AQ+noise, with Q orthogonal, or stacks of k such arrays."""
+    rng = np.random.RandomState(seed)
+    shape = (m, n) if k is None else (k, m, n)
+    a = rng.uniform(-10.0, 10.0, shape)
+    q, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    b = np.matmul(a, q) + rng.normal(scale=0.1, size=shape)
+    return a, b
+
+
+def random_two_sided(n, seed=42, symmetric=True):
+    r"""Return random arrays A & B=P^T A P+noise, with P a permutation matrix."""
+    rng = np.random.RandomState(seed)
+    a = rng.uniform(0.0, 10.0, (n, n))
+    if symmetric:
+        a = a + a.T
+    perm = rng.permutation(n)
+    b = a[np.ix_(perm, perm)] + rng.uniform(0.0, 0.1, (n, n))
+    if symmetric:
+        b = (b + b.T) / 2.0
+    return a, b
@@ -24,7 +24,7 @@
 
 import numpy as np
 from procrustes import orthogonal
-from procrustes.utils import _check_arraytypes
+from procrustes.utils import _check_arraytypes, _check_finite
 
 
 def generalized(array_list, ref=None, tol=1.e-7, n_iter=200, check_finite=True):
@@ -67,7 +67,7 @@ def generalized(array_list, ref=None, tol=1.e-7, n_iter=200, check_finite=True):
     _check_arraytypes(*array_list)
     # check finite
     if check_finite:
-        array_list = [np.asarray_chkfinite(arr) for arr in array_list]
+        array_list = [_check_finite(arr) for arr in array_list]
 
     # todo: translation and scaling
     if n_iter <= 0:
@@ -23,9 +23,17 @@
 """Generic Procrustes Module."""
 
 import numpy as np
-from procrustes.utils import compute_error, ProcrustesResult, setup_input_arrays
+from procrustes.utils import (_compute_error_analytic, _compute_error_statistics,
+                              _compute_statistics_stream,
+                              _setup_input_stacks, ProcrustesResult, setup_input_arrays)
 from scipy.linalg import pinv, pinv2
 
+__all__ = [
+    "generic",
+    "generic_batch",
+    "generic_stream",
+]
+
 
 def generic(
     a,
@@ -37,7 +45,8 @@ def generic(
     unpad_row=False,
     check_finite=True,
     weight=None,
-    use_svd=False
+    use_svd=False,
+    return_arrays=True,
 ):
     r"""Perform generic one-sided Procrustes.
 
@@ -89,6 +98,10 @@ def generic(
         If False, the the (Moore-Penrose) pseudo-inverse is computed by least-squares solver
         (using `scipy.linalg.pinv`). The least-squares implementation is less efficient, but more
         robust, than the SVD implementation.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -115,14 +128,138 @@ def generic(
         a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight,
     )
     # compute the generic solution
+    ata, atb = np.dot(new_a.T, new_a), np.dot(new_a.T, new_b)
     if use_svd:
         # Use the singular value decomposition, much faster but less robust.
-        a_inv = pinv2(np.dot(new_a.T, new_a))
+        a_inv = pinv2(ata)
     else:
         # Uses the least-squared method.
-        a_inv = pinv(np.dot(new_a.T, new_a))
+        a_inv = pinv(ata)
 
-    array_x = np.linalg.multi_dot([a_inv, new_a.T, new_b])
-    # compute one-sided error
-    e_opt = compute_error(new_a, new_b, array_x)
+    array_x = np.dot(a_inv, atb)
+    # compute one-sided error from A.T A & A.T B, i.e. Tr[X.T A.T A X] - 2 Tr[X.T A.T B] + ||B||^2
+    e_opt = _compute_error_statistics(ata, atb, np.linalg.norm(new_b) ** 2, array_x)
+    e_opt = _compute_error_analytic(e_opt, new_a, new_b, array_x)
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=e_opt, new_a=new_a, new_b=new_b, t=array_x, s=None)
+
+
+def generic_batch(
+    a,
+    b,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    weight=None,
+    return_arrays=True,
+):
+    r"""Perform generic one-sided Procrustes on a stack of matrix pairs.
+
+    Given stacks of matrices :math:`\mathbf{A}^{(i)}_{m \times n}` and reference matrices
+    :math:`\mathbf{B}^{(i)}_{m \times n}` with :math:`i=1,\dots,k`, find the transformation
+    matrices :math:`\mathbf{T}^{(i)}_{n \times n}` that make each
+    :math:`\mathbf{A}^{(i)}\mathbf{T}^{(i)}` as close as possible to :math:`\mathbf{B}^{(i)}`.
+    This is equivalent to calling :func:`generic` on each pair, but all pairs are solved at once
+    with batched (stacked) pseudo-inverses and matrix products, which is much faster for many
+    small problems.
+
+    Because all matrices in a stack share the same shape, no padding or unpadding is performed.
+    In preparing the :math:`\mathbf{A}` and :math:`\mathbf{B}` stacks, the (optional) order of
+    operations is: **1)** translate each matrix to the origin, **2)** weight entries of each
+    matrix, **3)** scale each matrix to have unit norm.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 3d-array :math:`\mathbf{A}_{k \times m \times n}` stacking the matrices which are
+        going to be transformed.
+    b : ndarray
+        The 3d-array :math:`\mathbf{B}_{k \times m \times n}` stacking the reference matrices.
+    translate : bool, optional
+        If True, each matrix is centered at origin (columns of the matrices will have mean zero).
+    scale : bool, optional
+        If True, each matrix is normalized with respect to the Frobenius norm.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row, shared by all matrices in the stacks.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` is the :math:`k \times n \times n` stack of transformations and ``error`` is the
+        1D-array of the :math:`k` Procrustes errors.
+
+    """
+    # check inputs
+    new_a, new_b = _setup_input_stacks(a, b, translate, scale, check_finite, weight)
+    # compute the generic solutions using the (SVD-based) pseudo-inverse of each A.T * A
+    new_at = np.swapaxes(new_a, 1, 2)
+    ata, atb = np.matmul(new_at, new_a), np.matmul(new_at, new_b)
+    array_x = np.matmul(np.linalg.pinv(ata), atb)
+    # compute one-sided errors from A.T A & A.T B
+    e_opt = (np.einsum("kij,kij->k", array_x, np.matmul(ata, array_x))
+             - 2 * np.einsum("kij,kij->k", array_x, atb) + np.einsum("kij,kij->k", new_b, new_b))
+    e_opt = _compute_error_analytic(e_opt, new_a, new_b, array_x)
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=e_opt, new_a=new_a, new_b=new_b, t=array_x, s=None)
+
+
+def generic_stream(
+    chunks,
+    pad=True,
+    translate=False,
+    scale=False,
+    check_finite=True,
+):
+    r"""Perform generic one-sided Procrustes on arrays given as a stream of row chunks.
+
+    This solves the same problem as :func:`generic`, but the (very tall) matrices
+    :math:`\mathbf{A}_{m \times n}` and :math:`\mathbf{B}_{m \times n}` are given as
+    chunks of rows. Only the sufficient statistics :math:`\mathbf{A}^\dagger\mathbf{A}`,
+    :math:`\mathbf{A}^\dagger\mathbf{B}` and the norms of the arrays are accumulated, so the
+    transformation matrix :math:`\mathbf{T}` and the error are computed using
+    :math:`\mathcal{O}(n^2)` memory regardless of the number of rows :math:`m`. The translation,
+    weighting and scaling of :math:`\mathbf{A}` and :math:`\mathbf{B}` (in that order) are
+    applied to the accumulated statistics. Unpadding zero rows/columns is not supported.
+
+    Parameters
+    ----------
+    chunks : iterable
+        An iterable (e.g., generator) of ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` tuples, where
+        ``a_i`` and ``b_i`` are 2D-arrays holding consecutive rows of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`, and ``w_i`` is the (optional) 1D-array of the corresponding row
+        weights. Each chunk is only used once, so the chunks can be read lazily from a file.
+    pad : bool, optional
+        Add zero columns (to the right-hand side) of matrices :math:`\mathbf{A}` and
+        :math:`\mathbf{B}` so that they have the same shape.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    check_finite : bool, optional
+        If True, convert the input chunks to arrays, checking for NaNs or Infs.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object. As the
+        processed arrays are never formed, ``new_a`` and ``new_b`` are None.
+
+    """
+    # accumulate A.T * A, A.T * B & norms of A and B
+    ata, atb, _, norm_b = _compute_statistics_stream(chunks, pad, translate, scale, check_finite)
+    # compute the generic solution using the least-squares pseudo-inverse of A.T * A
+    array_x = np.dot(pinv(ata), atb)
+    # compute one-sided error
+    e_opt = _compute_error_statistics(ata, atb, norm_b, array_x)
+    return ProcrustesResult(error=e_opt, new_a=None, new_b=None, t=array_x, s=None)
@@ -23,7 +23,13 @@
 """K-opt (Greedy) Heuristic Module."""
 
 
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import hashlib
 import itertools as it
+import os
+import time
 
 import numpy as np
 
@@ -31,10 +37,15 @@ import numpy as np
 __all__ = [
     "kopt_heuristic_single",
     "kopt_heuristic_double",
+    "kopt_heuristic_quadratic",
+    "tabu_search_quadratic",
+    "simulated_annealing_quadratic",
+    "ObjectiveCache",
 ]
 
 
-def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8):
+def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8, strategy="best", dont_look=False,
+                          cache=None):
     r"""Find a locally-optimal permutation matrix using the k-opt (greedy) heuristic.
 
     .. math::
@@ -47,6 +58,10 @@ def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8):
     Starting from this updated permutation matrix, the process is repeated until no further k-fold
     column-reordering of a given permutation matrix lower the objective function.
 
+    Each column-permutation is tried once, i.e., for each subset of 2, ..., k columns, only
+    the rearrangements which move all of its columns are tried (the others are tried for the
+    smaller subsets).
+
     Parameters
     ----------
     fun : callable
@@ -57,6 +72,20 @@ def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8):
         The order of the permutation. For example, `k=3` swaps all possible 3-permutations.
     tol : float, optional
         When value of the objective function is less than given tolerance, the algorithm stops.
+    strategy : {"best", "first"}, optional
+        If "best", all column-permutations of the permutation matrix are tried, and the search
+        continues from the best one. If "first", the search continues from the first
+        column-permutation lowering the objective function (without restarting the sweep over
+        the column-permutations).
+    dont_look : bool, optional
+        If True, the column-permutations in which none of the columns was part of a
+        column-permutation lowering the objective function in the previous sweep are skipped.
+        This makes the sweeps (after the first one) much cheaper, but the result may not be a
+        local optimum of the whole k-fold neighbourhood.
+    cache : ObjectiveCache, optional
+        If given, the values of the objective function are looked up in (and added to) the
+        cache, so that the objective function is not evaluated again for the permutation
+        matrices found in the cache (see :class:`ObjectiveCache`).
 
     Returns
     -------
@@ -66,8 +95,6 @@ def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8):
         The locally-optimal value of objective function given by :math:`\text{fun(p_opt)}`.
 
     """
-    # pylint: disable=too-many-nested-blocks
-
     # check whether p0 is a valid permutation matrix
     if p0.ndim != 2 or p0.shape[0] != p0.shape[1]:
         raise ValueError(f"Argument p0 should be a square array. Given p0 shape={p0.shape}")
@@ -76,42 +103,54 @@ def kopt_heuristic_single(fun, p0, k=3, tol=1.0e-8):
     if np.all(np.sum(p0, axis=0) != 1) or np.all(np.sum(p0, axis=1) != 1):
         raise ValueError("Sum over rows or columns of p0 matrix isn't equal 1.")
 
-    # check k
+    # check k & strategy
     if k < 2 or not isinstance(k, (int, np.integer)):
         raise ValueError(f"Argument k={k} must be a integer greater than 1. Given type {type(k)}")
     if k > p0.shape[0]:
         raise ValueError(f"Argument k={k} is not smaller than {p0.shape[0]} (number of p0 rows).")
+    if strategy not in ["best", "first"]:
+        raise ValueError(f"Argument strategy should be 'best' or 'first'. Given {strategy}")
+    if cache is not None:
+        fun = cache.wrap(fun)
 
     # compute initial value of the objective function & assign best P matrix
     best_f = fun(p0)
     best_p = np.copy(p0)
+    # columns which are searched (all of them, unless don't-look bits are used)
+    active = np.ones(p0.shape[0], dtype=bool)
     # swap rows and columns until the permutation matrix is not improved
     search = True
     while search:
         search = False
         # make sure p0 guess is the best permutation matrix found thus far
-        p0 = np.copy(best_p)
-        for perm in it.permutations(np.arange(p0.shape[0]), r=int(k)):
-            comb = tuple(sorted(perm))
-            if perm != comb:
-                # row-swap P matrix & compute objective function
-                perm_p = np.copy(p0)
-                perm_p[:, comb] = perm_p[:, perm]
-                # compute objective function for permuted P matrix & compare
-                perm_f = fun(perm_p)
-                if perm_f < best_f:
-                    best_p, best_f = perm_p, perm_f
-                    # set search=True to keep permuting the new best_p unless this is already an
-                    # exhaustive search (i.e., k equals number of rows of p matrix)
-                    search = bool(k < p0.shape[0])
-                    # check whether perfect permutation matrix is found
-                    # TODO: smarter threshold based on norm of matrix
-                    if best_f <= tol:
-                        return best_p, best_f
+        p0, p0_f = np.copy(best_p), best_f
+        improved = np.zeros(p0.shape[0], dtype=bool)
+        for comb, perm in _generate_moves(p0.shape[0], int(k), active):
+            # row-swap P matrix & compute objective function
+            perm_p = np.copy(p0)
+            perm_p[:, comb] = perm_p[:, perm]
+            # compute objective function for permuted P matrix & compare
+            perm_f = fun(perm_p)
+            if perm_f < p0_f:
+                improved[list(comb)] = True
+            if perm_f < best_f:
+                best_p, best_f = perm_p, perm_f
+                # set search=True to keep permuting the new best_p unless this is already an
+                # exhaustive search (i.e., k equals number of rows of p matrix)
+                search = bool(k < p0.shape[0]) or strategy == "first"
+                # check whether perfect permutation matrix is found
+                # TODO: smarter threshold based on norm of matrix
+                if best_f <= tol:
+                    return best_p, best_f
+                if strategy == "first":
+                    p0, p0_f = perm_p, perm_f
+        if dont_look:
+            active = improved
     return best_p, best_f
 
 
-def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8):
+def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8, mode="joint", polish=False,
+                          cache=None):
     r"""Find a locally-optimal two-sided permutation matrices using the k-opt (greedy) heuristic.
 
     .. math::
@@ -128,6 +167,12 @@ def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8):
     P}_2`. Starting from these updated permutation matrices, the process is repeated until no
     further k-fold reordering of either permutation matrix lower the objective function.
 
+    This joint search tries :math:`\left(\frac{n!}{(n-k)!}\right)^2` pairs of permutations in
+    each sweep. Alternatively, the permutation matrices can be searched alternately, i.e., a
+    k-opt search of :math:`\mathbf{P}_1` (with fixed :math:`\mathbf{P}_2`) is followed by a
+    k-opt search of :math:`\mathbf{P}_2` (with fixed :math:`\mathbf{P}_1`) using
+    :func:`kopt_heuristic_single`, until neither lowers the objective function.
+
     Parameters
     ----------
     fun : callable
@@ -140,6 +185,14 @@ def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8):
         The order of the permutation. For example, ``k=3`` swaps all possible 3-permutations.
     tol : float, optional
         When value of the objective function is less than given tolerance, the algorithm stops.
+    mode : {"joint", "alternating"}, optional
+        Whether to search the permutations of both matrices jointly, or alternately.
+    polish : bool, optional
+        If True, the result of the "alternating" mode is refined by the joint search.
+    cache : ObjectiveCache, optional
+        If given, the values of the objective function are looked up in (and added to) the
+        cache, so that the objective function is not evaluated again for the pairs of
+        permutation matrices found in the cache (see :class:`ObjectiveCache`).
 
     Returns
     -------
@@ -175,6 +228,15 @@ def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8):
         raise ValueError(f"Argument k={k} must be a integer greater than 1. Give type {type(k)}")
     if k > max(p1.shape[0], p2.shape[0]):
         raise ValueError(f"Argument k={k} is not smaller than {max(p1.shape[0], p2.shape[0])}.")
+    if mode not in ["joint", "alternating"]:
+        raise ValueError(f"Argument mode should be 'joint' or 'alternating'. Given {mode}")
+    if cache is not None:
+        fun = cache.wrap(fun)
+
+    if mode == "alternating":
+        p1, p2, best_f = _kopt_alternating(fun, p1, p2, k, tol)
+        if not polish or best_f <= tol:
+            return p1, p2, best_f
 
     # compute initial value of the objective function & assign best P1 & P2 matrices
     best_f = fun(p1, p2)
@@ -209,3 +271,614 @@ def kopt_heuristic_double(fun, p1, p2, k=3, tol=1.0e-8):
                         if best_f <= tol:
                             return best_p1, best_p2, best_f
     return best_p1, best_p2, best_f
+
+
+def kopt_heuristic_quadratic(a, b, p0, k=3, tol=1.0e-8, strategy="first", n_jobs=1):
+    r"""Find a locally-optimal permutation matrix of the quadratic objective using k-opt heuristic.
+
+    .. math::
+       \underbrace{\text{min}}_{\left\{\mathbf{P} \left| {[\mathbf{P}]_{ij} \in \{0, 1\}
+       \atop \sum_{i=1}^n [\mathbf{P}]_{ij} = \sum_{j=1}^n [\mathbf{P}]_{ij} = 1} \right. \right\}}
+       \|\mathbf{P}^\dagger \mathbf{A} \mathbf{P} - \mathbf{B}\|_{F}^2
+
+    This is the k-opt (greedy) heuristic of :func:`kopt_heuristic_single` specialized to the
+    objective function above. Instead of evaluating the objective function for each k-fold
+    column-permutation of :math:`\mathbf{P}`, which takes two :math:`O(n^3)` matrix products,
+    its change is computed from the rows & columns of :math:`\mathbf{P}^\dagger \mathbf{A}
+    \mathbf{P}` which are permuted, i.e., in :math:`O(kn)` operations. The changes for all
+    2-fold permutations (swaps) are computed at once as an :math:`n \times n` matrix, and the
+    best swap is applied until no swap lowers the objective function. Then, the first (or best)
+    of the 3-, ..., k-fold permutations lowering the objective function is applied, after which
+    the search continues with the swaps. The process is repeated until no k-fold
+    column-reordering lowers the objective function.
+
+    The 3-, ..., k-fold permutations can be tried in a pool of processes, where each process
+    tries the permutations of a subset of the columns & :math:`\mathbf{A}` and
+    :math:`\mathbf{B}` are placed in shared memory once. The result does not depend on the
+    number of processes.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+    b : ndarray
+        The 2D-array :math:`\mathbf{B}` representing the reference matrix.
+    p0 : ndarray
+        The 2D-array permutation matrix representing the initial guess for :math:`\mathbf{P}`.
+    k : int, optional
+        The order of the permutation. For example, `k=3` swaps all possible 3-permutations.
+    tol : float, optional
+        When value of the objective function is less than given tolerance, the algorithm stops.
+    strategy : {"first", "best"}, optional
+        Whether the first or the best 3-, ..., k-fold permutation lowering the objective function
+        is applied.
+    n_jobs : int, optional
+        The number of processes trying the 3-, ..., k-fold permutations. If None, the number of
+        CPUs is used. If 1, they are tried in the calling process.
+
+    Returns
+    -------
+    p_opt : ndarray
+        The locally-optimal permutation matrix :math:`\mathbf{P}` (i.e., solution).
+    f_opt : float
+        The locally-optimal value of objective function.
+
+    """
+    a, b = _check_quadratic(a, b, p0)
+
+    # check k & strategy
+    if k < 2 or not isinstance(k, (int, np.integer)):
+        raise ValueError(f"Argument k={k} must be a integer greater than 1. Given type {type(k)}")
+    if k > p0.shape[0]:
+        raise ValueError(f"Argument k={k} is not smaller than {p0.shape[0]} (number of p0 rows).")
+    if strategy not in ["best", "first"]:
+        raise ValueError(f"Argument strategy should be 'best' or 'first'. Given {strategy}")
+
+    # P[index[j], j] = 1, so the permuted matrix C = P.T A P = A[index][:, index]; a k-fold
+    # column-permutation P[:, comb] = P[:, perm] of the search changes index[comb] = index[perm]
+    index = np.argmax(p0, axis=0)
+    n_workers = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if n_workers > 1 and k > 2:
+            executor = stack.enter_context(_kopt_pool(a, b, n_workers))
+        index, _ = _kopt_quadratic_search(a, b, index, int(k), tol, strategy, executor,
+                                          n_workers)
+
+    return _result_quadratic(a, b, index)
+
+
+def tabu_search_quadratic(a, b, p0, max_iter=None, max_time=None, tol=1.0e-8, seed=None):
+    r"""Find a permutation matrix of the quadratic objective using robust tabu search.
+
+    .. math::
+       \underbrace{\text{min}}_{\left\{\mathbf{P} \left| {[\mathbf{P}]_{ij} \in \{0, 1\}
+       \atop \sum_{i=1}^n [\mathbf{P}]_{ij} = \sum_{j=1}^n [\mathbf{P}]_{ij} = 1} \right. \right\}}
+       \|\mathbf{P}^\dagger \mathbf{A} \mathbf{P} - \mathbf{B}\|_{F}^2
+
+    Unlike the k-opt heuristic, the search does not stop at a local minimum. At each iteration,
+    the swap of two columns of :math:`\mathbf{P}` which lowers the objective function the most
+    (or raises it the least) is applied, where the changes of the objective function for all
+    swaps are updated in :math:`O(n^2)` operations after each swap [1]. To avoid cycling, a swap
+    is tabu (i.e., not allowed) if both columns return to positions they left within the last
+    :math:`t` iterations, unless it gives a lower objective function than the best one found so
+    far. As in robust tabu search [1], the tenure :math:`t` is randomly chosen between
+    :math:`0.9n` and :math:`1.1n` at each iteration. The best permutation matrix found is
+    returned.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+    b : ndarray
+        The 2D-array :math:`\mathbf{B}` representing the reference matrix.
+    p0 : ndarray
+        The 2D-array permutation matrix representing the initial guess for :math:`\mathbf{P}`.
+    max_iter : int, optional
+        The maximum number of iterations. If both ``max_iter`` and ``max_time`` are None,
+        ``10 * n`` iterations are done.
+    max_time : float, optional
+        The maximum wall-clock time of the search in seconds.
+    tol : float, optional
+        When value of the objective function is less than given tolerance, the algorithm stops.
+    seed : int or np.random.Generator, optional
+        The seed of the random tenures.
+
+    Returns
+    -------
+    p_opt : ndarray
+        The best permutation matrix :math:`\mathbf{P}` found.
+    f_opt : float
+        The value of objective function of the best permutation matrix.
+
+    References
+    ----------
+    [1] E. Taillard, "Robust taboo search for the quadratic assignment problem," Parallel
+        Computing, 17(4-5):443-455, 1991.
+
+    """
+    a, b = _check_quadratic(a, b, p0)
+    n = a.shape[0]
+    rng = np.random.default_rng(seed)
+    if max_iter is None and max_time is None:
+        max_iter = 10 * n
+
+    # P[index[j], j] = 1, so the permuted matrix C = P.T A P = A[index][:, index]
+    index = np.argmax(p0, axis=0)
+    c = a[np.ix_(index, index)]
+    f = best_f = np.linalg.norm(c - b) ** 2
+    best_index = np.copy(index)
+    eps = 1.0e-12 * (np.vdot(a, a) + np.vdot(b, b))
+    if n < 2:
+        return _result_quadratic(a, b, index)
+    # column index[j] can not return to position j before iteration tabu[j, index[j]]
+    tabu = np.zeros((n, n), dtype=int)
+    start, step = time.perf_counter(), 0
+    while best_f > tol and not _budget_spent(step, max_iter, start, max_time):
+        # the changes & objective function are updated after each swap & recomputed every n
+        # iterations (so that the rounding errors of the updates do not accumulate)
+        if step % n == 0:
+            delta = _compute_delta_swaps(c, b)
+            f = np.linalg.norm(c - b) ** 2
+        # swapping positions r & s moves column index[s] to position r & index[r] to position s
+        until = tabu[:, index]
+        allowed = ~((until > step) & (until.T > step)) | (f + delta < best_f - eps)
+        np.fill_diagonal(allowed, False)
+        if not allowed.any():
+            # all swaps are tabu, so the tabu status is ignored
+            allowed = ~np.eye(n, dtype=bool)
+        row, col = np.unravel_index(np.argmin(np.where(allowed, delta, np.inf)), delta.shape)
+        tenure = rng.integers(int(0.9 * n), int(np.ceil(1.1 * n)) + 1, size=2)
+        tabu[row, index[row]] = step + tenure[0]
+        tabu[col, index[col]] = step + tenure[1]
+        f += delta[row, col]
+        _swap_quadratic(c, index, row, col)
+        _update_delta_swaps(delta, c, b, row, col)
+        if f < best_f - eps:
+            best_index, best_f = np.copy(index), f
+        step += 1
+
+    return _result_quadratic(a, b, best_index)
+
+
+def simulated_annealing_quadratic(a, b, p0, max_iter=None, max_time=None, t0=None,
+                                  t_final=None, tol=1.0e-8, seed=None):
+    r"""Find a permutation matrix of the quadratic objective using simulated annealing.
+
+    .. math::
+       \underbrace{\text{min}}_{\left\{\mathbf{P} \left| {[\mathbf{P}]_{ij} \in \{0, 1\}
+       \atop \sum_{i=1}^n [\mathbf{P}]_{ij} = \sum_{j=1}^n [\mathbf{P}]_{ij} = 1} \right. \right\}}
+       \|\mathbf{P}^\dagger \mathbf{A} \mathbf{P} - \mathbf{B}\|_{F}^2
+
+    At each iteration, a random swap of two columns of :math:`\mathbf{P}` is tried, where the
+    change of the objective function :math:`\Delta` is computed from the two swapped rows &
+    columns of :math:`\mathbf{P}^\dagger \mathbf{A} \mathbf{P}` in :math:`O(n)` operations.
+    The swap is applied if :math:`\Delta < 0`, or with probability :math:`e^{-\Delta / T}`,
+    where the temperature :math:`T` is lowered geometrically from ``t0`` to ``t_final`` over the
+    iteration (or time) budget. The best permutation matrix found is returned.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+    b : ndarray
+        The 2D-array :math:`\mathbf{B}` representing the reference matrix.
+    p0 : ndarray
+        The 2D-array permutation matrix representing the initial guess for :math:`\mathbf{P}`.
+    max_iter : int, optional
+        The maximum number of iterations (i.e., tried swaps). If both ``max_iter`` and
+        ``max_time`` are None, ``1000 * n`` iterations are done.
+    max_time : float, optional
+        The maximum wall-clock time of the search in seconds.
+    t0 : float, optional
+        The initial temperature. If None, the mean absolute change of the objective function of
+        100 random swaps is used.
+    t_final : float, optional
+        The final temperature. If None, ``1.0e-3 * t0`` is used.
+    tol : float, optional
+        When value of the objective function is less than given tolerance, the algorithm stops.
+    seed : int or np.random.Generator, optional
+        The seed of the random swaps & their acceptance.
+
+    Returns
+    -------
+    p_opt : ndarray
+        The best permutation matrix :math:`\mathbf{P}` found.
+    f_opt : float
+        The value of objective function of the best permutation matrix.
+
+    """
+    a, b = _check_quadratic(a, b, p0)
+    n = a.shape[0]
+    rng = np.random.default_rng(seed)
+    if max_iter is None and max_time is None:
+        max_iter = 1000 * n
+
+    # P[index[j], j] = 1, so the permuted matrix C = P.T A P = A[index][:, index]
+    index = np.argmax(p0, axis=0)
+    c = a[np.ix_(index, index)]
+    f = best_f = np.linalg.norm(c - b) ** 2
+    best_index = np.copy(index)
+    eps = 1.0e-12 * (np.vdot(a, a) + np.vdot(b, b))
+    if n < 2:
+        return _result_quadratic(a, b, index)
+    if t0 is None:
+        t0 = np.mean([abs(_compute_delta_quadratic(c, b, [row, col], [col, row]))
+                      for row, col in _random_swaps(rng, n, 100)]) or 1.0
+    if t_final is None:
+        t_final = 1.0e-3 * t0
+    start, step = time.perf_counter(), 0
+    while best_f > tol and not _budget_spent(step, max_iter, start, max_time):
+        # fraction of the budget which is spent
+        spent = max(step / max_iter if max_iter else 0.0,
+                    (time.perf_counter() - start) / max_time if max_time else 0.0)
+        temp = t0 * (t_final / t0) ** spent
+        (row, col), = _random_swaps(rng, n, 1)
+        delta = _compute_delta_quadratic(c, b, [row, col], [col, row])
+        if delta < 0 or rng.random() < np.exp(-delta / temp):
+            _swap_quadratic(c, index, row, col)
+            f += delta
+            if f < best_f - eps:
+                best_index, best_f = np.copy(index), f
+        step += 1
+
+    return _result_quadratic(a, b, best_index)
+
+
+class ObjectiveCache:
+    r"""Bounded cache of the values of an objective function of permutation matrices.
+
+    The k-opt heuristics restart the search from the best permutation matrix after each
+    improvement, so they evaluate the objective function for many permutation matrices they
+    have already tried. When the objective function is expensive, passing a cache to
+    :func:`kopt_heuristic_single` or :func:`kopt_heuristic_double` avoids these repeated
+    evaluations. The values are stored with a compact (16-byte) hash of the index vectors of
+    the permutation matrices as keys, and the least recently used values are discarded when the
+    cache is full.
+
+    A cache holds the values of one objective function, so it should not be shared between
+    different objective functions (e.g., for different matrices :math:`\mathbf{A}` and
+    :math:`\mathbf{B}`).
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of values kept in the cache.
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of values kept in the cache.
+    hits : int
+        The number of evaluations which were found in the cache.
+    misses : int
+        The number of evaluations of the objective function (i.e., not found in the cache).
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> a = np.random.uniform(-10.0, 10.0, (6, 6))
+    >>> b = np.random.uniform(-10.0, 10.0, (6, 6))
+    >>> fun = lambda p: np.linalg.norm(np.linalg.multi_dot([p.T, a, p]) - b) ** 2
+    >>> cache = ObjectiveCache(maxsize=10000)
+    >>> p_opt, f_opt = kopt_heuristic_single(fun, np.eye(6), k=3, cache=cache)
+    >>> hit_ratio = cache.hits / (cache.hits + cache.misses)
+
+    """
+
+    def __init__(self, maxsize=4096):
+        """Initialize an empty cache holding at most maxsize values."""
+        if maxsize < 1 or not isinstance(maxsize, (int, np.integer)):
+            raise ValueError(f"Argument maxsize={maxsize} must be a positive integer.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        """Return the number of values in the cache."""
+        return len(self._values)
+
+    def clear(self):
+        """Remove all values from the cache & reset the hit & miss counters."""
+        self._values.clear()
+        self.hits, self.misses = 0, 0
+
+    def wrap(self, fun):
+        """Return the objective function whose values are looked up in the cache first."""
+        def cached_fun(*perms):
+            key = _permutation_key(perms)
+            if key in self._values:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return self._values[key]
+            value = fun(*perms)
+            self.misses += 1
+            self._values[key] = value
+            if len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+            return value
+        return cached_fun
+
+
+def _check_quadratic(a, b, p0):
+    # check & return A & B (as float arrays) & the initial permutation matrix of the search
+    # engines of the quadratic objective function
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    # check whether A & B are square arrays of the same shape
+    if a.ndim != 2 or a.shape[0] != a.shape[1] or a.shape != b.shape:
+        raise ValueError(f"Arguments a & b should be square arrays of the same shape. "
+                         f"Given a shape={a.shape} & b shape={b.shape}")
+    # check whether p0 is a valid permutation matrix
+    if p0.shape != a.shape:
+        raise ValueError(f"Argument p0 should be a {a.shape} array. Given p0 shape={p0.shape}")
+    if not np.all(np.logical_or(p0 == 0, p0 == 1)):
+        raise ValueError("Elements of permutation matrix p0 can only be 0 or 1.")
+    if np.any(np.sum(p0, axis=0) != 1) or np.any(np.sum(p0, axis=1) != 1):
+        raise ValueError("Sum over rows or columns of p0 matrix isn't equal 1.")
+    return a, b
+
+
+def _permutation_key(perms):
+    # hash the index vectors of the permutation matrices (P[index[j], j] = 1) into a 16-byte key
+    digest = hashlib.blake2b(digest_size=16)
+    for perm in perms:
+        digest.update(np.asarray(perm.shape, dtype=np.int64).tobytes())
+        digest.update(np.argmax(perm, axis=0).astype(np.int64).tobytes())
+    return digest.digest()
+
+
+def _budget_spent(step, max_iter, start, max_time):
+    # check whether the iteration or wall-clock time budget of a search is spent
+    if max_iter is not None and step >= max_iter:
+        return True
+    return max_time is not None and time.perf_counter() - start >= max_time
+
+
+def _random_swaps(rng, n, size):
+    # return random pairs of distinct positions
+    rows = rng.integers(n, size=size)
+    cols = (rows + rng.integers(1, n, size=size)) % n
+    return list(zip(rows, cols))
+
+
+def _swap_quadratic(c, index, row, col):
+    # swap positions row & col of the index vector, & rows & columns of C = A[index][:, index]
+    index[[row, col]] = index[[col, row]]
+    c[[row, col]] = c[[col, row]]
+    c[:, [row, col]] = c[:, [col, row]]
+
+
+def _result_quadratic(a, b, index):
+    # return the permutation matrix of the index vector & its (recomputed) objective function
+    p = np.zeros(a.shape)
+    p[index, np.arange(index.size)] = 1
+    return p, np.linalg.norm(a[np.ix_(index, index)] - b) ** 2
+
+
+def _refine_quadratic(a, b, p0, method, k=3, max_iter=None, max_time=None, seed=None):
+    # refine the permutation matrix of the quadratic objective with the given search method
+    if method == "k-opt":
+        return kopt_heuristic_quadratic(a, b, p0, k=k)
+    if method == "tabu":
+        return tabu_search_quadratic(a, b, p0, max_iter=max_iter, max_time=max_time, seed=seed)
+    if method == "anneal":
+        return simulated_annealing_quadratic(a, b, p0, max_iter=max_iter, max_time=max_time,
+                                             seed=seed)
+    raise ValueError(f"Refinement method should be 'k-opt', 'tabu' or 'anneal'. Given {method}")
+
+
+def _kopt_quadratic_search(a, b, index, k, tol, strategy, executor, n_workers):
+    # k-opt search of kopt_heuristic_quadratic starting from the index vector of P, where the
+    # 3-, ..., k-fold permutations are tried by the executor (if not None)
+    c = a[np.ix_(index, index)]
+    best_f = np.linalg.norm(c - b) ** 2
+    # changes smaller than the rounding errors of the computed changes are not improvements
+    eps = 1.0e-12 * (np.vdot(a, a) + np.vdot(b, b))
+    delta, n_updates = _compute_delta_swaps(c, b), 0
+    while best_f > tol:
+        row, col = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[row, col] < -eps:
+            # the changes of the swaps are updated in O(n^2) after a swap, & recomputed every n
+            # swaps (so that the rounding errors of the updates do not accumulate)
+            best_f += delta[row, col]
+            _swap_quadratic(c, index, row, col)
+            n_updates = (n_updates + 1) % a.shape[0]
+            if n_updates == 0:
+                delta = _compute_delta_swaps(c, b)
+            else:
+                _update_delta_swaps(delta, c, b, row, col)
+        elif n_updates:
+            # the updated changes are recomputed before concluding that no swap lowers |C - B|^2
+            delta, n_updates = _compute_delta_swaps(c, b), 0
+            best_f = np.linalg.norm(c - b) ** 2
+        else:
+            if executor is None:
+                move = _find_move_quadratic(c, b, k, eps, strategy)
+            else:
+                # each task tries the permutations whose first column is in its chunk (the chunks
+                # are interleaved, as there are fewer permutations for the last columns)
+                chunks = [range(i, a.shape[0], 4 * n_workers) for i in range(4 * n_workers)]
+                tasks = [(index, k, eps, strategy, chunk) for chunk in chunks]
+                move = _reduce_moves(executor.map(_kopt_task, tasks), strategy)
+            if move is None:
+                break
+            _, _, comb, perm = move
+            index[comb] = index[perm]
+            c = a[np.ix_(index, index)]
+            best_f = np.linalg.norm(c - b) ** 2
+            delta = _compute_delta_swaps(c, b)
+    return index, best_f
+
+
+def _kopt_alternating(fun, p1, p2, k, tol):
+    # alternate the k-opt searches of P1 (with fixed P2) & P2 (with fixed P1) until neither lowers
+    # the objective function, where the rows of P1 are permuted as the columns of P1.T
+    best_f = fun(p1, p2)
+    search = True
+    while search:
+        start_f = best_f
+        if min(k, p1.shape[0]) > 1:
+            p1_t, best_f = kopt_heuristic_single(lambda q: fun(q.T, p2), p1.T,
+                                                 min(k, p1.shape[0]), tol)
+            p1 = p1_t.T
+        if best_f > tol and min(k, p2.shape[0]) > 1:
+            p2, best_f = kopt_heuristic_single(lambda q: fun(p1, q), p2, min(k, p2.shape[0]), tol)
+        search = best_f < start_f and best_f > tol
+    return np.copy(p1), np.copy(p2), best_f
+
+
+def _compute_delta_swaps(c, b, rows=None):
+    r"""Return the changes of |C - B|^2 when rows & columns r and s of C are swapped.
+
+    As |C|^2 does not change, the change is -2 times the change of <C, B>, which is computed
+    for all r & s using C B.T, C.T B and the rows & columns r and s of C and B (the diagonal of
+    the returned array is zero). If rows is given, only the changes for r in rows are computed
+    (in O(n^2) operations per row).
+    """
+    rows = np.arange(c.shape[0]) if rows is None else np.asarray(rows)
+    # rows of X = C B.T, X.T, Y = C.T B & Y.T, and the diagonals of X & Y
+    x, xt = np.dot(c[rows], b.T), np.dot(b[rows], c.T)
+    y, yt = np.dot(c[:, rows].T, b), np.dot(b[:, rows].T, c)
+    dx, dy = np.einsum("ij,ij->i", c, b), np.einsum("ji,ji->i", c, b)
+    dc, db = np.diag(c), np.diag(b)
+    dxr, dyr, dcr, dbr = dx[rows, None], dy[rows, None], dc[rows, None], db[rows, None]
+    c_r, ct_r, b_r, bt_r = c[rows], c[:, rows].T, b[rows], b[:, rows].T
+    # changes of elements (r, j) & (s, j) for all j, and (i, r) & (i, s) for all i
+    change = x + xt - dxr - dx + y + yt - dyr - dy
+    # remove the terms of elements (r, r), (r, s), (s, r) & (s, s) counted in these sums
+    change -= (ct_r - dcr) * (dbr - bt_r) + (dc - c_r) * (b_r - db)
+    change -= (c_r - dcr) * (dbr - b_r) + (dc - ct_r) * (bt_r - db)
+    # add the changes of elements (r, r), (r, s), (s, r) & (s, s)
+    change += (dc - dcr) * (dbr - db) + (ct_r - c_r) * (b_r - bt_r)
+    change *= -2
+    change[np.arange(rows.size), rows] = 0.0
+    return change
+
+
+def _update_delta_swaps(delta, c, b, row, col):
+    r"""Update the changes of |C - B|^2 of all swaps after swapping rows & columns row and col.
+
+    Here, C is the swapped array. For swaps r & s not involving row or col, only the terms of
+    elements in rows & columns row and col change, which is an O(1) update per swap [1]; the
+    changes of the swaps involving row or col are recomputed. So, the update takes O(n^2)
+    operations.
+
+    References
+    ----------
+    [1] E. Taillard, "Robust taboo search for the quadratic assignment problem," Parallel
+        Computing, 17(4-5):443-455, 1991.
+    """
+    col_b, col_c = b[:, row] - b[:, col], c[:, row] - c[:, col]
+    row_b, row_c = b[row] - b[col], c[row] - c[col]
+    delta += 2 * (np.subtract.outer(col_b, col_b) * np.subtract.outer(col_c, col_c)
+                  + np.subtract.outer(row_b, row_b) * np.subtract.outer(row_c, row_c))
+    changed = _compute_delta_swaps(c, b, [row, col])
+    delta[[row, col]] = changed
+    delta[:, [row, col]] = changed.T
+
+
+def _compute_delta_quadratic(c, b, comb, perm):
+    r"""Return the change of |C - B|^2 when rows & columns comb of C are replaced by perm.
+
+    Only the rows & columns comb of C change, so the change is computed in O(kn) operations.
+    """
+    rest = np.ones(c.shape[0], dtype=bool)
+    rest[comb] = False
+    # permuted C has rows C[perm][:, pi] & columns C[rest][:, perm], where pi[comb] = perm
+    pi = np.arange(c.shape[0])
+    pi[comb] = perm
+    b_rows, b_cols = b[comb], b[np.ix_(rest, comb)]
+    change = np.sum((c[np.ix_(perm, pi)] - b_rows) ** 2) - np.sum((c[comb] - b_rows) ** 2)
+    change += np.sum((c[np.ix_(rest, perm)] - b_cols) ** 2)
+    change -= np.sum((c[np.ix_(rest, comb)] - b_cols) ** 2)
+    return change
+
+
+def _find_move_quadratic(c, b, k, eps, strategy="first", first=None):
+    # return the first (or best) 3-, ..., k-fold permutation which lowers |C - B|^2 (among those
+    # whose first column is in first, if given) as (change, position, comb, perm), or None, where
+    # position = (len(comb), comb, perm) orders the permutations as they are generated
+    best = None
+    for comb, perm in _generate_moves(c.shape[0], k, min_order=3, first=first):
+        change = _compute_delta_quadratic(c, b, list(comb), list(perm))
+        if change < -eps and (best is None or change < best[0]):
+            best = (change, (len(comb), comb, perm), list(comb), list(perm))
+            if strategy == "first":
+                break
+    return best
+
+
+def _reduce_moves(moves, strategy):
+    # return the first (or best) of the moves found by _find_move_quadratic, where ties are broken
+    # by their position, so the result does not depend on how the permutations are divided
+    moves = [move for move in moves if move is not None]
+    if not moves:
+        return None
+    if strategy == "first":
+        return min(moves, key=lambda move: move[1])
+    return min(moves, key=lambda move: move[:2])
+
+
+def _generate_moves(n, k, active=None, min_order=2, first=None):
+    # yield the column-permutations (comb, perm), i.e., columns comb are replaced by columns perm,
+    # for each subset comb of min_order, ..., k of the n columns (with at least one active column,
+    # if given, & with the first column in first, if given) & each rearrangement perm of comb
+    # which moves all of its columns (the others are column-permutations of smaller subsets), so
+    # each column-permutation is generated once
+    for order in range(min_order, k + 1):
+        derangements = [perm for perm in it.permutations(range(order))
+                        if all(i != j for i, j in enumerate(perm))]
+        if first is None:
+            combs = it.combinations(range(n), order)
+        else:
+            combs = ((i,) + rest for i in first for rest in it.combinations(range(i + 1, n),
+                                                                            order - 1))
+        for comb in combs:
+            if active is not None and not any(active[i] for i in comb):
+                continue
+            for perm in derangements:
+                yield comb, tuple(comb[i] for i in perm)
+
+
+# arrays (& their shared memory blocks) of the worker processes of kopt_heuristic_quadratic
+_KOPT_SHARED = {}
+
+
+@contextlib.contextmanager
+def _kopt_pool(a, b, n_workers):
+    # yield a process pool, where A & B are copied once into shared memory
+    from multiprocessing import shared_memory
+
+    blocks = []
+    try:
+        specs = []
+        for array in (a, b):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            specs.append((block.name, array.shape, array.dtype.str))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_kopt_attach,
+                                 initargs=(specs,)) as executor:
+            yield executor
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _kopt_attach(specs):
+    # attach a worker process to the shared memory blocks of A & B
+    from multiprocessing import shared_memory
+
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype, buffer=block.buf)
+              for block, (_, shape, dtype) in zip(blocks, specs)]
+    _KOPT_SHARED.update(blocks=blocks, arrays=arrays)
+
+
+def _kopt_task(task):
+    # find the first (or best) permutation of a chunk of columns in a worker process
+    a, b = _KOPT_SHARED["arrays"]
+    index, k, eps, strategy, first = task
+    return _find_move_quadratic(a[np.ix_(index, index)], b, k, eps, strategy, first)
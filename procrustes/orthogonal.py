@@ -25,11 +25,15 @@
 # import warnings
 
 import numpy as np
-from procrustes.utils import compute_error, ProcrustesResult, setup_input_arrays
+from procrustes.utils import (_compute_error_analytic, _compute_error_statistics,
+                              _compute_statistics_stream, _setup_input_stacks, ProcrustesResult,
+                              setup_input_arrays)
 import scipy
 
 __all__ = [
     "orthogonal",
+    "orthogonal_batch",
+    "orthogonal_stream",
     "orthogonal_2sided",
 ]
 
@@ -44,7 +48,8 @@ def orthogonal(
     unpad_row=False,
     check_finite=True,
     weight=None,
-    lapack_driver="gesvd"
+    lapack_driver="gesvd",
+    return_arrays=True,
 ):
     r"""Perform orthogonal Procrustes.
 
@@ -96,6 +101,10 @@ def orthogonal(
         Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
         general rectangular approach ('gesvd') to compute the singular-value decomposition with
         `scipy.linalg.svd`.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -149,15 +158,141 @@ def orthogonal(
             "Check pad, unpad_col, and unpad_row arguments."
         )
     # calculate SVD of A.T * B
-    u, _, vt = scipy.linalg.svd(np.dot(new_a.T, new_b), lapack_driver=lapack_driver)
+    u, s, vt = scipy.linalg.svd(np.dot(new_a.T, new_b), lapack_driver=lapack_driver)
     # compute optimal orthogonal transformation
     u_opt = np.dot(u, vt)
-    # compute one-sided error
-    error = compute_error(new_a, new_b, u_opt)
+    # compute one-sided error, i.e. ||A||^2 + ||B||^2 - 2 Tr[Q.T A.T B] with Tr[Q.T A.T B] = sum(s)
+    error = np.linalg.norm(new_a) ** 2 + np.linalg.norm(new_b) ** 2 - 2 * np.sum(s)
+    error = _compute_error_analytic(error, new_a, new_b, u_opt)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt, s=None)
+
 
+def orthogonal_batch(
+    a,
+    b,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    weight=None,
+    return_arrays=True,
+):
+    r"""Perform orthogonal Procrustes on a stack of matrix pairs.
+
+    Given stacks of matrices :math:`\mathbf{A}^{(i)}_{m \times n}` and reference matrices
+    :math:`\mathbf{B}^{(i)}_{m \times n}` with :math:`i=1,\dots,k`, find the orthogonal
+    transformation matrices :math:`\mathbf{Q}^{(i)}_{n \times n}` that make each
+    :math:`\mathbf{A}^{(i)}\mathbf{Q}^{(i)}` as close as possible to :math:`\mathbf{B}^{(i)}`.
+    This is equivalent to calling :func:`orthogonal` on each pair, but all pairs are solved at
+    once with batched (stacked) singular value decompositions and matrix products, which is much
+    faster for many small problems.
+
+    Because all matrices in a stack share the same shape, no padding or unpadding is performed.
+    In preparing the :math:`\mathbf{A}` and :math:`\mathbf{B}` stacks, the (optional) order of
+    operations is: **1)** translate each matrix to the origin, **2)** weight entries of each
+    matrix, **3)** scale each matrix to have unit norm.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 3d-array :math:`\mathbf{A}_{k \times m \times n}` stacking the matrices which are
+        going to be transformed.
+    b : ndarray
+        The 3d-array :math:`\mathbf{B}_{k \times m \times n}` stacking the reference matrices.
+    translate : bool, optional
+        If True, each matrix is centered at origin (columns of the matrices will have mean zero).
+    scale : bool, optional
+        If True, each matrix is normalized with respect to the Frobenius norm.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row, shared by all matrices in the stacks.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` is the :math:`k \times n \times n` stack of transformations and ``error`` is the
+        1D-array of the :math:`k` Procrustes errors.
+
+    """
+    # check inputs
+    new_a, new_b = _setup_input_stacks(a, b, translate, scale, check_finite, weight)
+    # calculate SVD of each A.T * B
+    u, s, vt = np.linalg.svd(np.matmul(np.swapaxes(new_a, 1, 2), new_b))
+    # compute optimal orthogonal transformations
+    u_opt = np.matmul(u, vt)
+    # compute one-sided errors from the singular values
+    error = (np.einsum("kij,kij->k", new_a, new_a) + np.einsum("kij,kij->k", new_b, new_b)
+             - 2 * np.sum(s, axis=1))
+    error = _compute_error_analytic(error, new_a, new_b, u_opt)
+
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt, s=None)
 
 
+def orthogonal_stream(
+    chunks,
+    pad=True,
+    translate=False,
+    scale=False,
+    check_finite=True,
+):
+    r"""Perform orthogonal Procrustes on arrays given as a stream of row chunks.
+
+    This solves the same problem as :func:`orthogonal`, but the (very tall) matrices
+    :math:`\mathbf{A}_{m \times n}` and :math:`\mathbf{B}_{m \times n}` are given as
+    chunks of rows. Only the sufficient statistics :math:`\mathbf{A}^\dagger\mathbf{A}`,
+    :math:`\mathbf{A}^\dagger\mathbf{B}` and the norms of the arrays are accumulated, so the
+    transformation matrix :math:`\mathbf{Q}` and the error are computed using
+    :math:`\mathcal{O}(n^2)` memory regardless of the number of rows :math:`m`. The translation,
+    weighting and scaling of :math:`\mathbf{A}` and :math:`\mathbf{B}` (in that order) are
+    applied to the accumulated statistics. Unpadding zero rows/columns is not supported.
+
+    Parameters
+    ----------
+    chunks : iterable
+        An iterable (e.g., generator) of ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` tuples, where
+        ``a_i`` and ``b_i`` are 2D-arrays holding consecutive rows of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`, and ``w_i`` is the (optional) 1D-array of the corresponding row
+        weights. Each chunk is only used once, so the chunks can be read lazily from a file.
+    pad : bool, optional
+        Add zero columns (to the right-hand side) of matrices :math:`\mathbf{A}` and
+        :math:`\mathbf{B}` so that they have the same shape.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    check_finite : bool, optional
+        If True, convert the input chunks to arrays, checking for NaNs or Infs.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object. As the
+        processed arrays are never formed, ``new_a`` and ``new_b`` are None.
+
+    """
+    # accumulate A.T * A, A.T * B & norms of A and B
+    ata, atb, _, norm_b = _compute_statistics_stream(chunks, pad, translate, scale, check_finite)
+    # calculate SVD of A.T * B & compute optimal orthogonal transformation
+    u, _, vt = scipy.linalg.svd(atb)
+    u_opt = np.dot(u, vt)
+    # compute one-sided error
+    error = _compute_error_statistics(ata, atb, norm_b, u_opt)
+
+    return ProcrustesResult(error=error, new_a=None, new_b=None, t=u_opt, s=None)
+
+
 def orthogonal_2sided(
     a,
     b,
@@ -169,7 +304,8 @@ def orthogonal_2sided(
     unpad_row=False,
     check_finite=True,
     weight=None,
-    lapack_driver="gesvd"
+    lapack_driver="gesvd",
+    return_arrays=True,
 ):
     r"""Perform two-sided orthogonal Procrustes with one- or two-transformations.
 
@@ -235,6 +371,10 @@ def orthogonal_2sided(
     lapack_driver : {"gesvd", "gesdd"}, optional
         Used in the singular value decomposition function from SciPy. Only allowed two options,
         with "gesvd" being less-efficient than "gesdd" but is more robust. Default is "gesvd".
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -348,17 +488,22 @@ def orthogonal_2sided(
 
     # two-sided orthogonal Procrustes with one-transformations
     if single:
-        _, ua = np.linalg.eigh(new_a)
-        _, ub = np.linalg.eigh(new_b)
+        sa, ua = np.linalg.eigh(new_a)
+        sb, ub = np.linalg.eigh(new_b)
         u_opt = np.dot(ua, ub.T)
-        # compute one-sided error
-        error = compute_error(new_a, new_b, u_opt, u_opt.T)
+        # compute two-sided error, i.e. U.T A U - B = Ub (diag(sa) - diag(sb)) Ub.T
+        error = _compute_error_analytic(np.sum((sa - sb) ** 2), new_a, new_b, u_opt, u_opt.T)
+        if not return_arrays:
+            new_a, new_b = None, None
         return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt, s=u_opt.T)
 
     # two-sided orthogonal Procrustes with two-transformations
-    ua, _, vta = scipy.linalg.svd(new_a, lapack_driver=lapack_driver)
-    ub, _, vtb = scipy.linalg.svd(new_b, lapack_driver=lapack_driver)
+    ua, sa, vta = scipy.linalg.svd(new_a, lapack_driver=lapack_driver)
+    ub, sb, vtb = scipy.linalg.svd(new_b, lapack_driver=lapack_driver)
     u_opt1 = np.dot(ua, ub.T)
     u_opt2 = np.dot(vta.T, vtb)
-    error = compute_error(new_a, new_b, u_opt2, u_opt1.T)
+    # compute two-sided error, i.e. U1.T A U2 - B = Ub (diag(sa) - diag(sb)) Vb
+    error = _compute_error_analytic(np.sum((sa - sb) ** 2), new_a, new_b, u_opt2, u_opt1.T)
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt2, s=u_opt1.T)
@@ -23,13 +23,32 @@
 """Permutation Procrustes Module."""
 
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import time
+
 import numpy as np
-from procrustes.kopt import kopt_heuristic_double, kopt_heuristic_single
-from procrustes.utils import _zero_padding, compute_error, ProcrustesResult, setup_input_arrays
+from procrustes.kopt import (_refine_quadratic, kopt_heuristic_double, kopt_heuristic_quadratic,
+                             kopt_heuristic_single)
+from procrustes.utils import (_compute_error_analytic, _compute_error_statistics,
+                              _compute_statistics_stream, _pad_sparse, _setup_input_arrays_sparse,
+                              _setup_input_stacks, _zero_padding, ProcrustesResult,
+                              setup_input_arrays)
 import scipy
 from scipy.optimize import linear_sum_assignment
+import scipy.sparse
+import scipy.sparse.linalg
+
+__all__ = [
+    "permutation",
+    "permutation_batch",
+    "permutation_stream",
+    "permutation_2sided",
+    "permutation_2sided_multistart",
+]
 
-__all__ = ["permutation", "permutation_2sided"]
+# (method, single) pairs of permutation_2sided which support scipy.sparse arrays
+_SPARSE_METHODS = {("approx-umeyama", True), ("k-opt", True), ("nmf", True), ("k-opt", False)}
 
 
 def permutation(
@@ -42,6 +61,7 @@ def permutation(
     unpad_row=False,
     check_finite=True,
     weight=None,
+    return_arrays=True,
 ):
     r"""Perform one-sided permutation Procrustes.
 
@@ -64,15 +84,16 @@ def permutation(
 
     Parameters
     ----------
-    a : ndarray
+    a : ndarray or scipy.sparse matrix
         The 2d-array :math:`\mathbf{A}` which is going to be transformed.
-    b : ndarray
+    b : ndarray or scipy.sparse matrix
         The 2d-array :math:`\mathbf{B}` representing the reference matrix.
     pad : bool, optional
         Add zero rows (at the bottom) and/or columns (to the right-hand side) of matrices
         :math:`\mathbf{A}` and :math:`\mathbf{B}` so that they have the same shape.
     translate : bool, optional
         If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+        This is not supported for sparse arrays.
     scale : bool, optional
         If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
         :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
@@ -87,11 +108,17 @@ def permutation(
         The 1D-array representing the weights of each row of :math:`\mathbf{A}`. This defines the
         elements of the diagonal matrix :math:`\mathbf{W}` that is multiplied by :math:`\mathbf{A}`
         matrix, i.e., :math:`\mathbf{A} \rightarrow \mathbf{WA}`.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
     res : ProcrustesResult
-        The Procrustes result represented as a class:`utils.ProcrustesResult` object.
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object. When
+        :math:`\mathbf{A}` or :math:`\mathbf{B}` is a `scipy.sparse` matrix, the processed arrays
+        and the permutation matrix are sparse CSR matrices.
 
     Notes
     -----
@@ -122,6 +149,11 @@ def permutation(
     is used to solve for the permutation that maximizes the linear sum assignment problem.
 
     """
+    if scipy.sparse.issparse(a) or scipy.sparse.issparse(b):
+        return _permutation_sparse(
+            a, b, pad, translate, scale, unpad_col, unpad_row, check_finite, weight, return_arrays,
+        )
+
     # check inputs
     new_a, new_b = setup_input_arrays(
         a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight,
@@ -132,12 +164,184 @@ def permutation(
 
     # compute cost matrix C = A.T B
     c = np.dot(new_a.T, new_b)
-    # compute permutation matrix using Hungarian algorithm
-    p = _compute_permutation_hungarian(c)
+    # compute permutation (as index vector & matrix) using Hungarian algorithm
+    index = _compute_permutation_hungarian(c, return_index=True)
+    p = _permutation_from_index(index)
+    # compute one-sided permutation error from the value of the optimal assignment Tr[P.T A.T B]
+    error = (np.linalg.norm(new_a) ** 2 + np.linalg.norm(new_b) ** 2
+             - 2 * np.sum(c[index, np.arange(index.size)]))
+    error = _compute_error_analytic(error, new_a, new_b, p)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(new_a=new_a, new_b=new_b, t=p, error=error, t_index=index)
+
+
+def _permutation_sparse(
+    a, b, pad, translate, scale, unpad_col, unpad_row, check_finite, weight, return_arrays,
+):
+    r"""Perform one-sided permutation Procrustes of sparse arrays (see `permutation`)."""
+    # check inputs
+    new_a, new_b = _setup_input_arrays_sparse(
+        a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight,
+    )
+    # if number of rows is less than column, the arrays are made square
+    if (new_a.shape[0] < new_a.shape[1]) or (new_b.shape[0] < new_b.shape[1]):
+        dim = max(new_a.shape + new_b.shape)
+        new_a, new_b = _pad_sparse(new_a, (dim, dim)), _pad_sparse(new_b, (dim, dim))
+
+    # compute sparse cost matrix C = A.T B & the sparse permutation matrix
+    c = (new_a.T @ new_b).tocsr()
+    p = _compute_permutation_sparse(c)
+    # compute one-sided permutation error from the value of the optimal assignment
+    error = np.sum(new_a.data ** 2) + np.sum(new_b.data ** 2) - 2 * c.multiply(p).sum()
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    # each row of the CSR permutation matrix has one element, i.e., P[i, p.indices[i]] = 1
+    index = np.argsort(p.indices)
+    return ProcrustesResult(new_a=new_a, new_b=new_b, t=p, error=max(error, 0.0), t_index=index)
+
+
+def permutation_batch(
+    a,
+    b,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    weight=None,
+    n_jobs=None,
+    return_arrays=True,
+):
+    r"""Perform one-sided permutation Procrustes on a stack of matrix pairs.
+
+    Given stacks of matrices :math:`\mathbf{A}^{(i)}_{m \times n}` and reference matrices
+    :math:`\mathbf{B}^{(i)}_{m \times n}` with :math:`i=1,\dots,k`, find the permutation
+    matrices :math:`\mathbf{P}^{(i)}_{n \times n}` that make each
+    :math:`\mathbf{A}^{(i)}\mathbf{P}^{(i)}` as close as possible to :math:`\mathbf{B}^{(i)}`.
+    This is equivalent to calling :func:`permutation` on each pair, but the cost matrices of all
+    pairs are computed with one batched matrix product, and the linear sum assignment problems
+    are distributed over a pool of threads.
+
+    Because all matrices in a stack share the same shape, no unpadding is performed; if
+    :math:`m < n`, the matrices are padded with zeros to be square. In preparing the
+    :math:`\mathbf{A}` and :math:`\mathbf{B}` stacks, the (optional) order of operations is:
+    **1)** translate each matrix to the origin, **2)** weight entries of each matrix, **3)** scale
+    each matrix to have unit norm.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 3d-array :math:`\mathbf{A}_{k \times m \times n}` stacking the matrices which are
+        going to be transformed.
+    b : ndarray
+        The 3d-array :math:`\mathbf{B}_{k \times m \times n}` stacking the reference matrices.
+    translate : bool, optional
+        If True, each matrix is centered at origin (columns of the matrices will have mean zero).
+    scale : bool, optional
+        If True, each matrix is normalized with respect to the Frobenius norm.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row, shared by all matrices in the stacks.
+    n_jobs : int, optional
+        The number of threads used for solving the linear sum assignment problems. If None, the
+        number of CPUs is used.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` is the :math:`k \times n \times n` stack of permutation matrices and ``error`` is
+        the 1D-array of the :math:`k` Procrustes errors.
+
+    """
+    # check inputs
+    new_a, new_b = _setup_input_stacks(a, b, translate, scale, check_finite, weight)
+    # if number of rows is less than column, the arrays are made square
+    k, m, n = new_a.shape
+    if m < n:
+        new_a = np.concatenate((new_a, np.zeros((k, n - m, n))), axis=1)
+        new_b = np.concatenate((new_b, np.zeros((k, n - m, n))), axis=1)
+
+    # compute cost matrices C = A.T B
+    c = np.matmul(np.swapaxes(new_a, 1, 2), new_b)
+    # compute permutation matrices using Hungarian algorithm, where each thread solves a chunk
+    # of the assignment problems (submitting them one-by-one has too much overhead)
+    p = np.zeros(c.shape)
+    index = np.zeros(c.shape[:2], dtype=int)
+    n_workers = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        chunks = np.array_split(np.arange(k), min(k, 4 * n_workers))
+        list(executor.map(lambda chunk: _fill_permutation_hungarian(c, p, index, chunk), chunks))
+    # compute one-sided permutation errors from the values of the optimal assignments
+    assigned = np.take_along_axis(c, index[:, np.newaxis, :], axis=1)
+    error = (np.einsum("kij,kij->k", new_a, new_a) + np.einsum("kij,kij->k", new_b, new_b)
+             - 2 * np.sum(assigned, axis=(1, 2)))
+    error = _compute_error_analytic(error, new_a, new_b, p)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(new_a=new_a, new_b=new_b, t=p, error=error, t_index=index)
+
+
+def permutation_stream(
+    chunks,
+    pad=True,
+    translate=False,
+    scale=False,
+    check_finite=True,
+):
+    r"""Perform one-sided permutation Procrustes on arrays given as a stream of row chunks.
+
+    This solves the same problem as :func:`permutation`, but the (very tall) matrices
+    :math:`\mathbf{A}_{m \times n}` and :math:`\mathbf{B}_{m \times n}` are given as
+    chunks of rows. Only the sufficient statistics :math:`\mathbf{A}^\dagger\mathbf{A}`,
+    :math:`\mathbf{A}^\dagger\mathbf{B}` and the norms of the arrays are accumulated, so the
+    transformation matrix :math:`\mathbf{P}` and the error are computed using
+    :math:`\mathcal{O}(n^2)` memory regardless of the number of rows :math:`m`. The translation,
+    weighting and scaling of :math:`\mathbf{A}` and :math:`\mathbf{B}` (in that order) are
+    applied to the accumulated statistics. Unpadding zero rows/columns is not supported.
+
+    Parameters
+    ----------
+    chunks : iterable
+        An iterable (e.g., generator) of ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` tuples, where
+        ``a_i`` and ``b_i`` are 2D-arrays holding consecutive rows of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`, and ``w_i`` is the (optional) 1D-array of the corresponding row
+        weights. Each chunk is only used once, so the chunks can be read lazily from a file.
+    pad : bool, optional
+        Add zero columns (to the right-hand side) of matrices :math:`\mathbf{A}` and
+        :math:`\mathbf{B}` so that they have the same shape.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    check_finite : bool, optional
+        If True, convert the input chunks to arrays, checking for NaNs or Infs.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object. As the
+        processed arrays are never formed, ``new_a`` and ``new_b`` are None.
+
+    """
+    # accumulate A.T * A, A.T * B & norms of A and B
+    ata, atb, _, norm_b = _compute_statistics_stream(chunks, pad, translate, scale, check_finite)
+    # compute permutation matrix using Hungarian algorithm with cost matrix C = A.T B
+    index = _compute_permutation_hungarian(atb, return_index=True)
+    p = _permutation_from_index(index)
     # compute one-sided permutation error
-    error = compute_error(new_a, new_b, p)
+    error = _compute_error_statistics(ata, atb, norm_b, p)
 
-    return ProcrustesResult(new_a=new_a, new_b=new_b, t=p, error=error)
+    return ProcrustesResult(new_a=None, new_b=None, t=p, error=error, t_index=index)
 
 
 def permutation_2sided(
@@ -156,15 +360,20 @@ def permutation_2sided(
     options=None,
     weight=None,
     lapack_driver="gesvd",
+    return_arrays=True,
 ):
     r"""Perform two-sided permutation Procrustes.
 
     Parameters
     ----------
-    a : ndarray
+    a : ndarray or scipy.sparse matrix
         The 2d-array :math:`\mathbf{A}` which is going to be transformed.
-    b : ndarray
-        The 2d-array :math:`\mathbf{B}` representing the reference matrix.
+    b : ndarray or scipy.sparse matrix
+        The 2d-array :math:`\mathbf{B}` representing the reference matrix. If :math:`\mathbf{A}`
+        or :math:`\mathbf{B}` is a `scipy.sparse` matrix, they are not made dense (so translate
+        is not supported) and the "approx-umeyama", "k-opt" and "nmf" methods (for
+        `single=True`) and the "k-opt" method (for `single=False`) are supported. The processed
+        arrays and the permutation matrices of the result are sparse CSR matrices.
     single : bool, optional
         If `True`, the single-transformation Procrustes is performed to obtain :math:`\mathbf{P}`.
         If `False`, the two-transformations Procrustes is performed to obtain :math:`\mathbf{P}_1`
@@ -172,12 +381,15 @@ def permutation_2sided(
     method : str, optional
         The method to solve for permutation matrices. For `single=False`, these include "flip-flop"
         and "k-opt" methods. For `single=True`, these include "approx-normal1", "approx-normal2",
-        "approx-umeyama", "approx-umeyama-svd", "k-opt", "soft-assign", and "nmf".
+        "approx-umeyama", "approx-umeyama-svd", "k-opt", "soft-assign", "nmf", and "faq".
     guess_p1 : np.ndarray, optional
-        Guess for :math:`\mathbf{P}_1` matrix given as a 2D-array. This is only required for the
-        two-transformations case specified by setting `single=False`.
+        Guess for :math:`\mathbf{P}_1` matrix given as a 2D-array, i.e., the permutation matrix
+        multiplying :math:`\mathbf{A}` from the left (like ``s`` of the result). This is only
+        required for the two-transformations case specified by setting `single=False`.
     guess_p2 : np.ndarray, optional
-        Guess for :math:`\mathbf{P}_2` matrix given as a 2D-array.
+        Guess for :math:`\mathbf{P}_2` matrix given as a 2D-array. If None, the identity matrix
+        is used, except for the "soft-assign" and "faq" methods which start from the uniform
+        matrix.
     pad : bool, optional
         Add zero rows (at the bottom) and/or columns (to the right-hand side) of matrices
         :math:`\mathbf{A}` and :math:`\mathbf{B}` so that they have the same shape.
@@ -194,7 +406,33 @@ def permutation_2sided(
     check_finite : bool, optional
         If True, convert the input to an array, checking for NaNs or Infs.
     options : dict, optional
-       A dictionary of method options.
+       A dictionary of method options. The "tol" (default 1.0e-8) and "maxiter" (default 500) keys
+       are the convergence threshold & maximum number of iterations of the "flip-flop", "nmf" and
+       "faq" methods; for the "soft-assign" method, they are the threshold of the change of the
+       relaxed permutation matrix between annealing steps & the maximum number of softassign
+       iterations at each annealing step. The "k" (default 3) is the order of the "k-opt" method,
+       and "n_jobs" (default 1) is the number of processes trying its 3-, ..., k-fold permutations
+       for `single=True` (see :func:`procrustes.kopt.kopt_heuristic_quadratic`). For `single=False`,
+       the "k-opt" method searches :math:`\mathbf{P}_1` and :math:`\mathbf{P}_2` alternately (see
+       :func:`procrustes.kopt.kopt_heuristic_double`), and if "polish" (default False) is True, its
+       result is refined by searching both jointly. For the "k-opt" method with `single=False` or
+       sparse arrays, "cache" (default None) can be a :class:`procrustes.kopt.ObjectiveCache` of the
+       errors of the permutation matrices tried. For the "nmf" method, "dtype" (default float64) is
+       the floating type used in the iterations (e.g., ``np.float32`` halves the memory & roughly
+       doubles the speed of the matrix products for large matrices), and the change of the
+       permutation matrix is only computed every "check_every" (default 1) iterations. For the
+       "approx-umeyama" and "approx-umeyama-svd" methods, if "n_eig" (default None) is given, only
+       the eigenvectors of the "n_eig" eigenvalues with largest absolute value are computed (with
+       `scipy.sparse.linalg.eigsh`) instead of the full eigendecomposition, which is much faster for
+       large matrices (for sparse arrays, the eigenvectors are then computed from sparse matrix
+       products). For `single=True` & dense arrays, the permutation of any method can be refined by
+       setting "refine" (default None) to "k-opt" (see
+       :func:`procrustes.kopt.kopt_heuristic_quadratic`), "tabu" (see
+       :func:`procrustes.kopt.tabu_search_quadratic`) or "anneal" (see
+       :func:`procrustes.kopt.simulated_annealing_quadratic`), where the budget of the latter two is
+       given by "refine_iter" (maximum number of iterations, default None) and "refine_time"
+       (maximum time in seconds, default None), and "seed" (default None) is the seed of their
+       random numbers.
     weight : ndarray, optional
         The 1D-array representing the weights of each row of :math:`\mathbf{A}`. This defines the
         elements of the diagonal matrix :math:`\mathbf{W}` that is multiplied by :math:`\mathbf{A}`
@@ -203,6 +441,10 @@ def permutation_2sided(
         Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
         general rectangular approach ('gesvd') to compute the singular-value decomposition with
         `scipy.linalg.svd`.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -358,6 +600,22 @@ def permutation_2sided(
             -62 &  154 &  100 &  127 \\
         \end{bmatrix} \\
 
+    **Fast Approximate QAP:**
+
+    The "faq" method [4] maximizes :math:`f(\mathbf{P}) = \text{Tr}\left[\mathbf{P}^\dagger
+    \mathbf{A}^\dagger\mathbf{P}\mathbf{B}\right]` over the doubly-stochastic matrices with the
+    Frank-Wolfe algorithm. At each iteration, the permutation matrix :math:`\mathbf{Q}`
+    maximizing :math:`\text{Tr}\left[\mathbf{Q}^\dagger\nabla f(\mathbf{P})\right]`, with
+    :math:`\nabla f(\mathbf{P}) = \mathbf{A}\mathbf{P}\mathbf{B}^\dagger +
+    \mathbf{A}^\dagger\mathbf{P}\mathbf{B}`, is found by the Hungarian algorithm, and
+    :math:`\mathbf{P}` is moved towards :math:`\mathbf{Q}` by the step size maximizing the
+    quadratic :math:`f(\mathbf{P} + \alpha(\mathbf{Q} - \mathbf{P}))` for
+    :math:`0 \leq \alpha \leq 1`. As :math:`\mathbf{AQ}` and :math:`\mathbf{QB}` are
+    permutations of the columns & rows of :math:`\mathbf{A}` and :math:`\mathbf{B}`, each
+    iteration needs two matrix products (one for symmetric :math:`\mathbf{A}` and
+    :math:`\mathbf{B}`) and one linear assignment problem. The closest permutation matrix to the
+    final doubly-stochastic matrix is returned.
+
     References
     ----------
     [1] C. Ding, T. Li and M. I. Jordan, "Nonnegative Matrix Factorization for Combinatorial
@@ -368,16 +626,28 @@ def permutation_2sided(
             PhD diss., University of Manchester, 1993.
     [3] S. Umeyama. An eigendecomposition approach toweighted graph matching problems.
           IEEE Trans. on Pattern Analysis and Machine Intelligence, 10:695 –703, 1988.
+    [4] J. T. Vogelstein, J. M. Conroy, V. Lyzinski, L. J. Podrazik, S. G. Kratzer, E. T. Harley,
+          D. E. Fishkind, R. J. Vogelstein and C. E. Priebe, "Fast Approximate Quadratic
+          Programming for Graph Matching," PLoS ONE, 10(4):e0121002, 2015.
 
     """
     # check single argument
     if not isinstance(single, bool):
         raise TypeError(f"Argument single is not a boolean! Given type={type(single)}")
 
-    # check inputs
-    new_a, new_b = setup_input_arrays(
-        a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight
-    )
+    # check inputs (sparse arrays are kept sparse, see _setup_input_arrays_sparse)
+    sparse = scipy.sparse.issparse(a) or scipy.sparse.issparse(b)
+    if sparse:
+        new_a, new_b = _setup_input_arrays_sparse(
+            a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight
+        )
+    else:
+        new_a, new_b = setup_input_arrays(
+            a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight
+        )
+    if sparse and (method, single) not in _SPARSE_METHODS:
+        raise ValueError(f"Method={method} with single={single} is not supported for sparse "
+                         f"arrays. Supported (method, single) are {sorted(_SPARSE_METHODS)}.")
 
     # check that A & B are square in case of single transformation
     if single and new_a.shape[0] != new_a.shape[1]:
@@ -407,13 +677,16 @@ def permutation_2sided(
             raise ValueError(f"Argument guess_p1 should be either None or a ({m}, {m}) array.")
 
     # assign & check initial guess for P2
+    guess_p2_default = guess_p2 is None
     if guess_p2 is None:
         guess_p2 = np.eye(n)
     if guess_p2.shape != (n, n):
         raise ValueError(f"Argument guess_p2 should be either None or a ({n}, {n}) array.")
 
     # check options dictionary & assign default keys
-    defaults = {"tol": 1.0e-8, "maxiter": 500, "k": 3}
+    defaults = {"tol": 1.0e-8, "maxiter": 500, "k": 3, "dtype": None, "check_every": 1,
+                "n_eig": None, "polish": False, "n_jobs": 1, "refine": None, "refine_iter": None,
+                "refine_time": None, "seed": None, "cache": None}
     if options is not None:
         if not isinstance(options, dict):
             raise ValueError(f"Argument options should be a dictionary. Given type={type(options)}")
@@ -422,24 +695,41 @@ def permutation_2sided(
                              f"Given options contains {options.keys()} keys!")
         # update defaults dictionary to use the specified options
         defaults.update(options)
+    if defaults["refine"] not in [None, "k-opt", "tabu", "anneal"]:
+        raise ValueError("Option refine should be None, 'k-opt', 'tabu' or 'anneal'. "
+                         f"Given refine={defaults['refine']}")
+    if defaults["refine"] is not None and (sparse or not single):
+        raise ValueError(f"Option refine is not supported for single={single} or sparse arrays.")
 
     # 2-sided permutation Procrustes with two transformations
     # -------------------------------------------------------
     if not single:
         if method == "flip-flop":
             # compute permutations using flip-flop algorithm
-            perm1, perm2, error = _permutation_2sided_2trans_flipflop(
+            index1, index2, error = _permutation_2sided_2trans_flipflop(
                 new_a, new_b, defaults["tol"], defaults["maxiter"], guess_p1, guess_p2)
+            perm1, perm2 = _permutation_from_index(index1).T, _permutation_from_index(index2)
         elif method == "k-opt":
-            # compute permutations using k-opt heuristic search
-            fun_error = lambda p1, p2: compute_error(new_a, new_b, p2, p1.T)
+            # compute permutations using k-opt heuristic search, where P1.T A P2 is gathered and
+            # the left permutation matrix is S = P1.T (so that S A = A[index1])
+            fun_error = lambda p1, p2: _compute_error_permutation(
+                new_a, new_b, np.argmax(p2, axis=0), np.argmax(p1, axis=0))
             perm1, perm2, error = kopt_heuristic_double(
-                fun_error, p1=guess_p1, p2=guess_p2, k=defaults["k"]
+                fun_error, p1=guess_p1.T, p2=guess_p2, k=defaults["k"], mode="alternating",
+                polish=defaults["polish"], cache=defaults["cache"],
             )
+            index1, index2 = np.argmax(perm1, axis=0), np.argmax(perm2, axis=0)
+            perm1 = perm1.T
         else:
             raise ValueError(f"Method={method} not supported for single={single} transformation!")
 
-        return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=perm2, s=perm1)
+        if sparse:
+            perm1 = _permutation_from_index_sparse(index1).T.tocsr()
+            perm2 = _permutation_from_index_sparse(index2)
+        if not return_arrays:
+            new_a, new_b = None, None
+        return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=perm2, s=perm1,
+                                t_index=index2, s_index=index1)
 
     # 2-sided permutation Procrustes with one transformation
     # ------------------------------------------------------
@@ -448,213 +738,576 @@ def permutation_2sided(
     # negative. To avoid this, all matrix entries are shifted (by the smallest amount) to be
     # positive. This causes no change to the objective function, as it's a constant value
     # being added to all entries of a and b.
+    # For sparse A & B, the shift is not added to their entries (which would make them dense);
+    # instead, A + shift is applied implicitly as the rank-one correction A + shift 1 1.T (see
+    # _matmul_shifted & _shifted_operator).
     shift = 1.0e-6
-    if np.min(new_a) < 0 or np.min(new_b) < 0:
-        shift += abs(min(np.min(new_a), np.min(new_b)))
+    if new_a.min() < 0 or new_b.min() < 0:
+        shift += abs(min(new_a.min(), new_b.min()))
     # shift is a float, so even if new_a or new_b are ints, the positive matrices are floats
     # default shift is not zero to avoid division by zero later in the algorithm
-    pos_a = new_a + shift
-    pos_b = new_b + shift
+    if not sparse:
+        pos_a = new_a + shift
+        pos_b = new_b + shift
 
+    # the methods which give an exact permutation assign its index vector, while the others
+    # assign an (approximate) matrix, for which the closest permutation is found below
+    index, perm = None, None
     if method == "approx-normal1":
         tmp_a = _approx_permutation_2sided_1trans_normal1(a)
         tmp_b = _approx_permutation_2sided_1trans_normal1(b)
-        perm = permutation(tmp_a, tmp_b).t
+        # match columns of the (truncated) signatures, i.e., 1-sided permutation procrustes
+        index = _compute_permutation_hungarian(np.dot(tmp_a.T, tmp_b), return_index=True)
 
     elif method == "approx-normal2":
         tmp_a = _approx_permutation_2sided_1trans_normal2(a)
         tmp_b = _approx_permutation_2sided_1trans_normal2(b)
-        perm = permutation(tmp_a, tmp_b).t
+        # match columns of the (truncated) signatures, i.e., 1-sided permutation procrustes
+        index = _compute_permutation_hungarian(np.dot(tmp_a.T, tmp_b), return_index=True)
 
     elif method == "approx-umeyama":
-        perm = _approx_permutation_2sided_1trans_umeyama(pos_a, pos_b)
+        if sparse:
+            perm = _approx_permutation_2sided_1trans_umeyama_sparse(
+                new_a, new_b, shift, defaults["n_eig"])
+        else:
+            perm = _approx_permutation_2sided_1trans_umeyama(pos_a, pos_b, defaults["n_eig"])
 
     elif method == "approx-umeyama-svd":
-        perm = _approx_permutation_2sided_1trans_umeyama_svd(a, b, lapack_driver)
+        perm = _approx_permutation_2sided_1trans_umeyama_svd(a, b, lapack_driver,
+                                                             defaults["n_eig"])
 
     elif method == "k-opt":
-        fun_error = lambda p: compute_error(pos_a, pos_b, p, p.T)
-        perm, error = kopt_heuristic_single(fun_error, p0=guess_p2, k=defaults["k"])
+        # the shift cancels out in P.T (A + shift) P - (B + shift), so it is left out
+        if sparse:
+            # P.T A P is gathered using the index vector of P
+            fun_error = lambda p: _compute_error_permutation(
+                new_a, new_b, np.argmax(p, axis=0), np.argmax(p, axis=0))
+            perm, _ = kopt_heuristic_single(fun_error, p0=guess_p2, k=defaults["k"],
+                                            cache=defaults["cache"])
+        else:
+            # the changes of the error are computed from the permuted rows & columns of P.T A P
+            perm, _ = kopt_heuristic_quadratic(new_a, new_b, guess_p2, k=defaults["k"],
+                                               n_jobs=defaults["n_jobs"])
+        index = np.argmax(perm, axis=0)
 
     elif method == "soft-assign":
-        raise NotImplementedError
+        # the relaxation starts from the uniform doubly-stochastic matrix unless guess is given
+        perm = _permutation_2sided_1trans_softassign(
+            new_a, new_b, np.ones((n, n)) if guess_p2_default else guess_p2, defaults["tol"],
+            defaults["maxiter"],
+        )
+
+    elif method == "faq":
+        # the Frank-Wolfe iterations start from the barycenter of the doubly-stochastic matrices
+        # unless guess is given
+        perm = _permutation_2sided_1trans_faq(
+            new_a, new_b, np.full((n, n), 1.0 / n) if guess_p2_default else guess_p2,
+            defaults["tol"], defaults["maxiter"],
+        )
 
     elif method == "nmf":
+        # sparse A & B are passed with the shift, which is applied implicitly in the products
+        nmf_a, nmf_b, nmf_shift = (new_a, new_b, shift) if sparse else (pos_a, pos_b, 0.0)
         # check whether A & B are symmetric (within a relative & absolute tolerance)
-        is_pos_a_symmetric = np.allclose(pos_a, pos_a.T, rtol=1.0e-05, atol=1.0e-08)
-        is_pos_b_symmetric = np.allclose(pos_b, pos_b.T, rtol=1.0e-05, atol=1.0e-08)
-
-        if is_pos_a_symmetric and is_pos_b_symmetric:
+        if _is_symmetric(nmf_a) and _is_symmetric(nmf_b):
             # undirected graph matching problem (iterative procedure)
             perm = _permutation_2sided_1trans_undirected(
-                pos_a, pos_b, guess_p2, defaults['tol'], defaults['maxiter']
+                nmf_a, nmf_b, guess_p2, defaults['tol'], defaults['maxiter'], defaults['dtype'],
+                defaults['check_every'], nmf_shift,
             )
         else:
             # directed graph matching problem (iterative procedure)
             perm = _permutation_2sided_1trans_directed(
-                pos_a, pos_b, guess_p2, defaults['tol'], defaults['maxiter']
+                nmf_a, nmf_b, guess_p2, defaults['tol'], defaults['maxiter'], defaults['dtype'],
+                defaults['check_every'], nmf_shift,
             )
     else:
         raise ValueError(f"Method={method} not supported for single={single} transformation!")
 
     # some of the methods for 2-sided-1-transformation permutation procrustes does not produce a
     # permutation matrix. So, their output is treated like a guess, and the closest permutation
-    # matrix is found using 1-sided permutation procrustes (where A=I & B=perm)
-    # Even though this step is not needed for ALL methods (e.g. k-opt, normal1, & normal2), to
-    # make the code simple, this step is performed for all methods as its cost is negligible.
-    perm = permutation(
-        np.eye(perm.shape[0]),
-        perm,
-        translate=False,
-        scale=False,
-        unpad_col=False,
-        unpad_row=False,
-        check_finite=True,
-    ).t
-    # compute error
-    error = compute_error(new_a, new_b, t=perm, s=perm.T)
-
-    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=perm, s=perm.T)
+    # matrix is found using 1-sided permutation procrustes (where A=I & B=perm), i.e., by solving
+    # the linear sum assignment problem with cost matrix I.T perm = perm
+    if index is None:
+        index = _compute_permutation_hungarian(perm, return_index=True)
+    # refine the permutation with the k-opt heuristic, tabu search or simulated annealing
+    if defaults["refine"] is not None:
+        perm, _ = _refine_quadratic(
+            new_a, new_b, _permutation_from_index(index), defaults["refine"], defaults["k"],
+            defaults["refine_iter"], defaults["refine_time"], defaults["seed"],
+        )
+        index = np.argmax(perm, axis=0)
+    perm = _permutation_from_index_sparse(index) if sparse else _permutation_from_index(index)
+    # compute error of P.T A P = A[index][:, index]
+    error = _compute_error_permutation(new_a, new_b, index, index)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=perm,
+                            s=perm.T.tocsr() if sparse else perm.T, t_index=index, s_index=index)
+
+
+def permutation_2sided_multistart(
+    a,
+    b,
+    single=True,
+    method="k-opt",
+    n_starts=8,
+    n_jobs=None,
+    seed=None,
+    pad=False,
+    unpad_col=False,
+    unpad_row=False,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    options=None,
+    weight=None,
+    lapack_driver="gesvd",
+    return_arrays=True,
+):
+    r"""Perform two-sided permutation Procrustes from multiple initial guesses.
+
+    The "nmf", "faq", "k-opt" and "flip-flop" methods of :func:`permutation_2sided` are local
+    searches, so their solution depends on the initial guess. Here, :func:`permutation_2sided` is
+    started from ``n_starts`` initial guesses, which are solved in a pool of processes, and the
+    result with the lowest error is returned. For ``single=True``, the initial guesses are (in
+    order) the identity, the "approx-umeyama", "approx-umeyama-svd", "approx-normal1" and
+    "approx-normal2" solutions, followed by random permutations. For ``single=False``, the
+    initial guesses are the identity followed by random permutations. As the multiplicative
+    updates of the "nmf" method do not move away from a permutation matrix, this method starts
+    from the average of each initial guess and the uniform matrix :math:`\frac{1}{n}\mathbf{J}`.
+
+    The processed :math:`\mathbf{A}` and :math:`\mathbf{B}` matrices are placed in shared memory
+    (see `multiprocessing.shared_memory`, Python >= 3.8), so they are not copied for each start;
+    only the index vectors of the initial guesses and solutions are sent between processes.
+    Like any use of `multiprocessing`, on platforms which spawn processes (e.g., Windows and
+    macOS), this function should be called under an ``if __name__ == "__main__":`` guard.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 2d-array :math:`\mathbf{A}` which is going to be transformed.
+    b : ndarray
+        The 2d-array :math:`\mathbf{B}` representing the reference matrix.
+    single : bool, optional
+        If `True`, the single-transformation Procrustes is performed to obtain :math:`\mathbf{P}`.
+        If `False`, the two-transformations Procrustes is performed to obtain :math:`\mathbf{P}_1`
+        and :math:`\mathbf{P}_2`.
+    method : str, optional
+        The local search method, which is "k-opt", "nmf" or "faq" for ``single=True``, and
+        "k-opt" or "flip-flop" for ``single=False``.
+    n_starts : int, optional
+        The number of initial guesses.
+    n_jobs : int, optional
+        The number of processes. If None, the number of CPUs is used. If 1, the starts are
+        solved one-by-one in the calling process.
+    seed : int or np.random.Generator, optional
+        The seed of the random initial guesses. The result does not depend on ``n_jobs``.
+    pad : bool, optional
+        Add zero rows (at the bottom) and/or columns (to the right-hand side) of matrices
+        :math:`\mathbf{A}` and :math:`\mathbf{B}` so that they have the same shape.
+    unpad_col : bool, optional
+        If True, zero columns (with values less than 1.0e-8) on the right-hand side are removed.
+    unpad_row : bool, optional
+        If True, zero rows (with values less than 1.0e-8) at the bottom are removed.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    options : dict, optional
+       A dictionary of method options passed to :func:`permutation_2sided`.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row of :math:`\mathbf{A}`. This defines the
+        elements of the diagonal matrix :math:`\mathbf{W}` that is multiplied by :math:`\mathbf{A}`
+        matrix, i.e., :math:`\mathbf{A} \rightarrow \mathbf{WA}`.
+    lapack_driver : {'gesvd', 'gesdd'}, optional
+        Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
+        general rectangular approach ('gesvd') to compute the singular-value decomposition with
+        `scipy.linalg.svd`.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result of the best start represented as a class:`utils.ProcrustesResult`
+        object. Its ``starts`` attribute is the list of the statistics of all starts, each given
+        as a dictionary with "guess" (the name of the initial guess), "error" and "time" (the
+        wall-clock time of the local search in seconds) keys.
+
+    """
+    # check single argument & method
+    if not isinstance(single, bool):
+        raise TypeError(f"Argument single is not a boolean! Given type={type(single)}")
+    methods = ["k-opt", "nmf", "faq"] if single else ["k-opt", "flip-flop"]
+    if method not in methods:
+        raise ValueError(f"Method={method} not supported for single={single}! Use {methods}.")
+    if not isinstance(n_starts, (int, np.integer)) or n_starts < 1:
+        raise ValueError(f"Argument n_starts should be a positive integer. Given {n_starts}")
+    if scipy.sparse.issparse(a) or scipy.sparse.issparse(b):
+        raise ValueError("Sparse arrays are not supported by the multi-start driver; use "
+                         "permutation_2sided for sparse A & B.")
+
+    # check inputs
+    new_a, new_b = setup_input_arrays(
+        a, b, unpad_col, unpad_row, pad, translate, scale, check_finite, weight
+    )
+    if single and (new_a.shape[0] != new_a.shape[1] or new_b.shape[0] != new_b.shape[1]):
+        raise ValueError(f"For single={single}, matrices A & B should be square but A.shape="
+                         f"{new_a.shape} & B.shape={new_b.shape}. Check pad, unpad_col, and "
+                         "unpad_row arguments.")
+
+    # make initial guesses (as index vectors) & solve the local search of each one
+    names, guesses = _multistart_guesses(new_a, new_b, single, n_starts, seed, lapack_driver)
+    tasks = [(single, method, options, index1, index2) for index1, index2 in guesses]
+    n_workers = min(n_starts, n_jobs if n_jobs is not None else (os.cpu_count() or 1))
+    if n_workers == 1:
+        outcomes = [_multistart_solve(new_a, new_b, *task) for task in tasks]
+    else:
+        outcomes = _multistart_pool(new_a, new_b, tasks, n_workers)
+
+    # pick the start with the lowest error (the first one, in case of ties)
+    best = int(np.argmin([outcome[0] for outcome in outcomes]))
+    error, index2, index1, _ = outcomes[best]
+    perm2 = _permutation_from_index(index2)
+    perm1 = perm2.T if single else _permutation_from_index(index1).T
+    starts = [{"guess": name, "error": outcome[0], "time": outcome[3]}
+              for name, outcome in zip(names, outcomes)]
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=perm2, s=perm1,
+                            t_index=index2, s_index=index1, starts=starts)
+
+
+def _multistart_guesses(a, b, single, n_starts, seed, lapack_driver):
+    # make names & index vectors of (P1, P2) initial guesses of the multi-start driver
+    rng = np.random.default_rng(seed)
+    m, n = a.shape
+    if single:
+        names = ["identity", "approx-umeyama", "approx-umeyama-svd", "approx-normal1",
+                 "approx-normal2"][:n_starts]
+        guesses = [(None, np.arange(n))]
+        guesses += [(None, permutation_2sided(a, b, method=name, check_finite=False,
+                                              lapack_driver=lapack_driver).t_index)
+                    for name in names[1:]]
+        names += ["random"] * (n_starts - len(names))
+        guesses += [(None, rng.permutation(n)) for _ in range(n_starts - len(guesses))]
+    else:
+        names = ["identity"] + ["random"] * (n_starts - 1)
+        guesses = [(np.arange(m), np.arange(n))]
+        guesses += [(rng.permutation(m), rng.permutation(n)) for _ in range(n_starts - 1)]
+    return names, guesses
+
+
+def _multistart_solve(a, b, single, method, options, index1, index2):
+    # solve the local search of one start, returning its error, index vectors & wall-clock time
+    start = time.perf_counter()
+    # for single=False, the guess of P1 is the left permutation matrix S, where S A = A[index1]
+    guess_p1 = None if single else _permutation_from_index(index1).T
+    guess_p2 = _permutation_from_index(index2)
+    if method == "nmf":
+        # the multiplicative updates of nmf keep the zeros of a permutation matrix (which is a
+        # fixed point), so it starts from a doubly-stochastic matrix inside the Birkhoff polytope
+        guess_p2 = 0.5 * guess_p2 + 0.5 / guess_p2.shape[0]
+    res = permutation_2sided(a, b, single=single, method=method, guess_p1=guess_p1,
+                             guess_p2=guess_p2, check_finite=False, options=options,
+                             return_arrays=False)
+    return res.error, res.t_index, res.s_index, time.perf_counter() - start
+
+
+# arrays (& their shared memory blocks) of the worker processes of the multi-start driver
+_MULTISTART_SHARED = {}
+
+
+def _multistart_pool(a, b, tasks, n_workers):
+    # solve the tasks in a process pool, where A & B are copied once into shared memory
+    from multiprocessing import shared_memory
+
+    blocks = []
+    try:
+        specs = []
+        for array in (a, b):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            specs.append((block.name, array.shape, array.dtype.str))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_multistart_attach,
+                                 initargs=(specs,)) as executor:
+            outcomes = list(executor.map(_multistart_task, tasks))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return outcomes
+
+
+def _multistart_attach(specs):
+    # attach a worker process to the shared memory blocks of A & B
+    from multiprocessing import shared_memory
+
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype, buffer=block.buf)
+              for block, (_, shape, dtype) in zip(blocks, specs)]
+    _MULTISTART_SHARED.update(blocks=blocks, arrays=arrays)
+
+
+def _multistart_task(task):
+    # solve the local search of one start in a worker process
+    return _multistart_solve(*_MULTISTART_SHARED["arrays"], *task)
 
 
 def _permutation_2sided_2trans_flipflop(n, m, tol, max_iter, p0=None, q0=None):
     # two-sided permutation Procrustes with 2 transformations :math:` {\(\vert PNQ-M \vert\)}^2_F`
     # taken from page 64 in parallel solution of svd-related problems, with applications
     # Pythagoras Papadimitriou, University of Manchester, 1993
+    # The permutations are represented by index vectors, i.e., P N Q = N[p][:, q], so the
+    # permuted matrices & the errors are computed by gathering the rows/columns of N.
+
+    # initial guesses: 1st case starts from P1 (identity if guess P0 is not given) and 2nd case
+    # starts from Q2 (identity if guess Q0 is not given); the two cases are independent, so they
+    # are run concurrently (NumPy & SciPy release the GIL in their compiled loops)
+    p1 = np.arange(m.shape[0]) if p0 is None else np.argmax(p0, axis=1)
+    q2 = np.arange(m.shape[1]) if q0 is None else np.argmax(q0, axis=0)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        case1 = executor.submit(_flipflop_alternate, n, m, tol, max_iter, p1, None, "1st")
+        case2 = executor.submit(_flipflop_alternate, n, m, tol, max_iter, None, q2, "2nd")
+        p1, q1, error1 = case1.result()
+        p2, q2, error2 = case2.result()
 
-    # initial guesses: set P1 to identity if guess P0 is not given, and compute Q1 using 1-sided
-    # permutation procrustes where A=(P1N), B=M, & cost = A.T B
-    p1 = p0
-    if p1 is None:
-        p1 = np.eye(m.shape[0])
-    q1 = _compute_permutation_hungarian(np.dot(np.dot(n.T, p1.T), m))
-    # compute initial error1 = |(P1)N(Q1) - M|
-    error1 = compute_error(n, m, q1, p1)
+    # return permutations corresponding to the lowest error
+    if error1 <= error2:
+        return p1, q1, error1
+    return p2, q2, error2
 
-    step = 0
-    while error1 > tol and step < max_iter:
-        # update P1 using 1-sided permutation procrustes where A=(NQ1).T, B=M.T, & cost = A.T B
-        # 1-sided procrustes finds the right-hand-side transformation T, so to solve for P1, one
-        # needs to minimize |Q.T N.T P.T - M.T| which is the same as original objective function.
-        p1 = _compute_permutation_hungarian(np.dot(np.dot(n, q1), m.T)).T
-        # update Q1 using 1-sided permutation procrustes where A=(P1N).T, B=M, & cost = A.T B
-        q1 = _compute_permutation_hungarian(np.dot(np.dot(n.T, p1.T), m))
-        error1 = compute_error(n, m, q1, p1)
-        step += 1
-    if step == max_iter:
-        print(f"Maximum iterations reached in 1st case of flip-flop! error={error1} & tol={tol}")
 
-    # initial guesses: set Q2 to identity if guess Q0 is not given, and compute P2 using 1-sided
-    # permutation procrustes where A=(NQ2).T, B=M.T, & cost = A.T B
-    q2 = q0
-    if q2 is None:
-        q2 = np.eye(m.shape[1])
-    p2 = _compute_permutation_hungarian(np.dot(np.dot(n, q2), m.T)).T
-    # compute initial error2 = |(P2)N(Q2) - M|
-    error2 = compute_error(n, m, q2, p2)
+def _flipflop_alternate(n, m, tol, max_iter, p=None, q=None, case=""):
+    # alternate between updating the index vectors of P & Q of the flip-flop algorithm, starting
+    # from the given P (updating Q first) or from the given Q (updating P first)
+    def update_q(p):
+        # 1-sided permutation procrustes where A=(PN), B=M, & cost = A.T B
+        return _compute_permutation_hungarian(np.dot(n[p].T, m), return_index=True)
+
+    def update_p(q):
+        # 1-sided permutation procrustes where A=(NQ).T, B=M.T, & cost = A.T B
+        # 1-sided procrustes finds the right-hand-side transformation T, so to solve for P, one
+        # needs to minimize |Q.T N.T P.T - M.T| which is the same as original objective function.
+        # The index vector of P.T as a right-hand-side transformation is that of P as left-hand-
+        # side transformation.
+        return _compute_permutation_hungarian(np.dot(n[:, q], m.T), return_index=True)
 
+    from_q = q is not None
+    if from_q:
+        p = update_p(q)
+    else:
+        q = update_q(p)
+    error = _compute_error_permutation(n, m, q, p)
+
+    # each update minimizes the error over one permutation, so the error never increases; once a
+    # pair of permutations is repeated (i.e., a fixed point or a cycle among pairs with the same
+    # error is reached), further iterations cannot lower the error. So, hashes of the visited
+    # index vectors are stored to stop the iterations.
+    visited = {hash((p.tobytes(), q.tobytes()))}
     step = 0
-    while error2 > tol and step < max_iter:
-        # update Q2 using 1-sided permutation procrustes where A=(P2N), B=M, & cost = A.T B
-        q2 = _compute_permutation_hungarian(np.dot(np.dot(n.T, p2.T), m))
-        # update P2 using 1-sided permutation procrustes where A=(NQ2).T, B=M.T, & cost = A.T B
-        p2 = _compute_permutation_hungarian(np.dot(np.dot(n, q2), m.T)).T
-        error2 = compute_error(n, m, q2, p2)
+    while error > tol and step < max_iter:
+        if from_q:
+            q = update_q(p)
+            p = update_p(q)
+        else:
+            p = update_p(q)
+            q = update_q(p)
+        error = _compute_error_permutation(n, m, q, p)
         step += 1
+        key = hash((p.tobytes(), q.tobytes()))
+        if key in visited:
+            break
+        visited.add(key)
     if step == max_iter:
-        print(f"Maximum iterations reached in 2nd case of flip-flop! error={error1} & tol={tol}")
+        print(f"Maximum iterations reached in {case} case of flip-flop! error={error} & tol={tol}")
+    return p, q, error
 
-    # return permutations corresponding to the lowest error
-    if error1 <= error2:
-        return p1, q1, error1
-    return p2, q2, error2
 
-
-def _compute_permutation_hungarian(cost_matrix):
+def _compute_permutation_hungarian(cost_matrix, return_index=False):
     # solve linear sum assignment problem to get the row/column indices of optimal assignment
     row_ind, col_ind = linear_sum_assignment(cost_matrix, maximize=True)
+    if return_index:
+        # index vector of the permutation matrix, i.e., A P = A[:, index]
+        index = np.zeros(cost_matrix.shape[1], dtype=int)
+        index[col_ind] = row_ind
+        return index
     # make the permutation matrix by setting the corresponding elements to 1
     perm = np.zeros(cost_matrix.shape)
     perm[(row_ind, col_ind)] = 1
     return perm
 
 
-def _approx_permutation_2sided_1trans_normal1(a):
+def _permutation_from_index(index):
+    # make the permutation matrix P with A P = A[:, index], i.e., P[index[j], j] = 1
+    perm = np.zeros((index.size, index.size))
+    perm[index, np.arange(index.size)] = 1
+    return perm
+
+
+def _permutation_from_index_sparse(index):
+    # return the sparse CSR permutation matrix P with P[index[j], j] = 1
+    n = index.size
+    return scipy.sparse.csr_matrix((np.ones(n), (index, np.arange(n))), shape=(n, n))
+
+
+def _compute_error_permutation(a, b, t_index, s_index=None):
+    # compute |A T - B|^2 (or |S A T - B|^2) by gathering the columns (and rows) of A, where
+    # A T = A[:, t_index] & S A = A[s_index]; this avoids the O(n^3) matrix products
+    if scipy.sparse.issparse(a):
+        return _compute_error_permutation_sparse(a, b, t_index, s_index)
+    a_perm = a[:, t_index] if s_index is None else a[np.ix_(s_index, t_index)]
+    return np.linalg.norm(a_perm - b) ** 2
+
+
+def _compute_error_permutation_sparse(a, b, t_index, s_index=None):
+    # compute |S A T - B|^2 = |A|^2 + |B|^2 - 2 <S A T, B> of sparse A & B, where the nonzero
+    # A[k, l] is moved to (s_inv[k], t_inv[l]) of S A T, & s_inv, t_inv are the inverse of the
+    # index vectors; so, only the elements of B at the moved nonzero elements of A are gathered
+    a = a.tocoo()
+    rows = a.row if s_index is None else np.argsort(s_index)[a.row]
+    cols = np.argsort(t_index)[a.col]
+    overlap = np.dot(a.data, np.asarray(b.tocsr()[rows, cols]).ravel())
+    return max(np.sum(a.data ** 2) + np.sum(b.data ** 2) - 2 * overlap, 0.0)
+
+
+def _compute_permutation_sparse(cost_matrix):
+    r"""Return the sparse permutation matrix maximizing the sum of the assigned sparse costs.
+
+    Only the explicitly stored elements of the cost matrix are edges of the bipartite graph, so
+    a full matching of the rows & columns of the cost matrix may not exist. So, each row (column)
+    is allowed to be matched to a dummy column (row) representing a zero cost, and the dummy rows
+    & columns are connected by the transposed sparsity pattern, so that any (partial) matching of
+    the rows & columns can be completed. The minimum weight full matching of this graph with
+    2n vertices on each side is found with `scipy.sparse.csgraph.min_weight_full_bipartite_matching`
+    (SciPy >= 1.6). Then, rows matched to dummy columns are assigned to the remaining columns,
+    which is optimal when the costs of these assignments are not negative. Otherwise, the
+    remaining assignment problem (or, if that does not suffice, the whole problem) is solved
+    with the dense `scipy.optimize.linear_sum_assignment`.
+    """
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    n = cost_matrix.shape[0]
+    cost = cost_matrix.tocoo()
+    nonzero = cost.data != 0
+    rows, cols, data = cost.row[nonzero], cost.col[nonzero], cost.data[nonzero]
+    # all weights are shifted to be positive, because explicit zeros are not considered as edges;
+    # this does not change the solution, because any full matching has 2n edges
+    shift = np.max(data, initial=0.0) + 1.0
+    graph = scipy.sparse.csr_matrix(
+        (np.concatenate((shift - data, np.full(2 * n + data.size, shift))),
+         (np.concatenate((rows, np.arange(n), n + np.arange(n), n + cols)),
+          np.concatenate((cols, n + np.arange(n), np.arange(n), n + rows)))),
+        shape=(2 * n, 2 * n),
+    )
+    row_ind, col_ind = min_weight_full_bipartite_matching(graph)
+    # assignment of rows to columns, where -1 denotes rows matched to a dummy column
+    assign = np.full(n, -1)
+    real = (row_ind < n) & (col_ind < n)
+    assign[row_ind[real]] = col_ind[real]
+    # assign the remaining rows to the remaining columns
+    free_rows = np.flatnonzero(assign < 0)
+    free_cols = np.setdiff1d(np.arange(n), assign[assign >= 0])
+    assign[free_rows] = free_cols
+    if free_rows.size and np.min(cost_matrix[free_rows, free_cols]) < 0:
+        # solve the remaining (dense) assignment problem
+        sub_cost = cost_matrix[free_rows][:, free_cols].toarray()
+        row_ind, col_ind = linear_sum_assignment(sub_cost, maximize=True)
+        assign[free_rows[row_ind]] = free_cols[col_ind]
+        if np.sum(sub_cost[row_ind, col_ind]) < 0:
+            # the remaining assignment may not be optimal, so solve the (dense) problem
+            row_ind, col_ind = linear_sum_assignment(cost_matrix.toarray(), maximize=True)
+            assign[row_ind] = col_ind
+    return scipy.sparse.csr_matrix((np.ones(n), assign, np.arange(n + 1)), shape=(n, n))
+
+
+def _fill_permutation_hungarian(cost_matrices, perms, perm_indices, items):
+    # solve the linear sum assignment problems of the given items of a stack of cost matrices,
+    # & fill the corresponding permutation matrices & index vectors
+    for item in items:
+        row_ind, col_ind = linear_sum_assignment(cost_matrices[item], maximize=True)
+        perms[item][(row_ind, col_ind)] = 1
+        perm_indices[item][col_ind] = row_ind
+
+
+def _approx_permutation_2sided_1trans_normal1(a, n_off=None, weight_p=2 ** -0.5):
     # This assumes that array_a has all positive entries, this guess does not match that found
     #    in the notes/paper because it doesn't include the sign function.
-    # build the empty target array
-    array_c = np.zeros(a.shape)
-    # Fill the first row of array_c with diagonal entries
-    array_c[0, :] = a.diagonal()
-    array_mask = ~np.eye(a.shape[0], dtype=bool)
-    # get all the non-diagonal element
-    array_c_non_diag = (a[array_mask]).T.reshape(a.shape[0], a.shape[1] - 1)
-    array_c_non_diag = array_c_non_diag[
-        np.arange(np.shape(array_c_non_diag)[0])[:, np.newaxis],
-        np.argsort(abs(array_c_non_diag))]
-
-    # form the right format in order to combine with matrix A
-    array_c_sorted = np.fliplr(array_c_non_diag).T
-    # fill the array_c with array_c_sorted
-    array_c[1:, :] = array_c_sorted
-    # the weight matrix
-    weight_c = np.zeros(a.shape)
-    weight_p = np.power(2, -0.5)
-
-    for weight in range(a.shape[0]):
-        weight_c[weight, :] = np.power(weight_p, weight)
-    # build the new matrix array_new
-    array_new = np.multiply(array_c, weight_c)
-
-    return array_new
-
-
-def _approx_permutation_2sided_1trans_normal2(a):
+    # The columns of the signature are the diagonal element & the n_off off-diagonal elements with
+    # largest absolute value (sorted in decreasing order) of each row of A, weighted by powers of
+    # weight_p. By default, the signature is truncated after floor(-2 ln(10) / ln(p) + 1)
+    # off-diagonal rows, as the weights of the following rows are less than 1% of the weight of
+    # the first off-diagonal row.
+    off_diag, top = _select_off_diagonal(a, n_off, weight_p)
+    array_c = np.empty((top.shape[1] + 1, a.shape[0]))
+    array_c[0] = a.diagonal()
+    array_c[1:] = np.take_along_axis(off_diag, top, axis=1).T
+    # multiply the rows by the weights
+    array_c *= np.power(weight_p, np.arange(array_c.shape[0]))[:, np.newaxis]
+    return array_c
+
+
+def _approx_permutation_2sided_1trans_normal2(a, n_off=None, weight_p=2 ** -0.5):
     # This assumes that array_a has all positive entries, this guess does not match that found
     #    in the notes/paper because it doesn't include the sign function.
-    array_mask_a = ~np.eye(a.shape[0], dtype=bool)
-    # array_off_diag0 is the off diagonal elements of A
-    array_off_diag = a[array_mask_a].reshape((a.shape[0], a.shape[1] - 1))
-    # array_off_diag1 is sorted off diagonal elements of A
-    array_off_diag = array_off_diag[np.arange(np.shape(array_off_diag)[0])[:, np.newaxis],
-                                    np.argsort(abs(array_off_diag))]
-    array_off_diag = np.fliplr(array_off_diag).T
-
-    # array_c is newly built matrix B without weights
-    # build array_c with the expected shape
-    col_num_new = a.shape[0] * 2 - 1
-    array_c = np.zeros((col_num_new, a.shape[1]))
-    array_c[0, :] = a.diagonal()
-
-    # use inf to represent the diagonal element
-    a_inf = a - np.diag(np.diag(a)) + np.diag([-np.inf] * a.shape[0])
-    index_inf = np.argsort(-np.abs(a_inf), axis=1)
-
-    # the weight matrix
-    weight_p = np.power(2, -0.5)
-    weight_c = np.zeros((col_num_new, a.shape[1]))
-    weight_c[0, :] = np.power(weight_p, 0)
-
-    for index_col in range(1, a.shape[0]):
-        # the index_col*2 row of array_c
-        array_c[index_col * 2, :] = array_off_diag[index_col - 1, :]
-        # the index_col*2-1 row of array_c
-        array_c[index_col * 2 - 1, :] = a[index_inf[:, index_col], index_inf[:, index_col]]
-
-        # the index_col*2 row of weight_c
-        weight_c[index_col * 2, :] = np.power(weight_p, index_col)
-        # the index_col*2 row of weight_c
-        weight_c[index_col * 2 - 1, :] = np.power(weight_p, index_col)
-
-    # the new matrix B
-    array_new = np.multiply(array_c, weight_c)
-    return array_new
-
-
-def _approx_permutation_2sided_1trans_umeyama(a, b):
+    # Like normal1, but each off-diagonal element is preceded by the diagonal element of the
+    # corresponding column, i.e., a_{j_k j_k} & a_{i j_k} for the k-th largest off-diagonal element
+    # a_{i j_k} of row i. By default, the signature is truncated after
+    # floor(-2 ln(10) / ln(p) + 1) pairs of off-diagonal rows (like normal1).
+    off_diag, top = _select_off_diagonal(a, n_off, weight_p)
+    n = a.shape[0]
+    # column indices of the selected off-diagonal elements (row i of off_diag skips column i)
+    cols = top + (top >= np.arange(n)[:, np.newaxis])
+    array_c = np.empty((2 * top.shape[1] + 1, n))
+    array_c[0] = a.diagonal()
+    array_c[1::2] = a.diagonal()[cols].T
+    array_c[2::2] = np.take_along_axis(off_diag, top, axis=1).T
+    # multiply the rows by the weights, where each pair of rows has the same weight
+    powers = np.concatenate(([0], np.repeat(np.arange(1, top.shape[1] + 1), 2)))
+    array_c *= np.power(weight_p, powers)[:, np.newaxis]
+    return array_c
+
+
+def _select_off_diagonal(a, n_off, weight_p):
+    # return the (n, n - 1) array of the off-diagonal elements of each row of A & the (n, n_off)
+    # indices of the n_off elements with largest absolute value of each row (in decreasing order,
+    # where ties are ordered by index), where n_off defaults to floor(-2 ln(10) / ln(p) + 1)
+    n = a.shape[0]
+    if n_off is None:
+        n_off = int(np.floor(-2 * np.log(10) / np.log(weight_p) + 1))
+    n_off = min(n_off, n - 1)
+    off_diag = a[~np.eye(n, dtype=bool)].reshape(n, n - 1)
+    abs_off_diag = np.abs(off_diag)
+    # select the n_off largest elements of each row without sorting the whole rows
+    if n_off < n - 1:
+        top = np.argpartition(-abs_off_diag, n_off - 1, axis=1)[:, :n_off]
+    else:
+        top = np.broadcast_to(np.arange(n - 1), (n, n - 1))
+    # sort the selected elements by decreasing absolute value (& increasing index for ties)
+    order = np.lexsort((top, -np.take_along_axis(abs_off_diag, top, axis=1)), axis=1)
+    return off_diag, np.take_along_axis(top, order, axis=1)
+
+
+def _approx_permutation_2sided_1trans_umeyama(a, b, n_eig=None):
     # check whether A & B are symmetric (within a relative & absolute tolerance)
     is_a_symmetric = np.allclose(a, a.T, rtol=1.0e-05, atol=1.0e-08)
     is_b_symmetric = np.allclose(b, b.T, rtol=1.0e-05, atol=1.0e-08)
+    if n_eig is not None:
+        # use the n_eig eigenvectors with largest (absolute) eigenvalues
+        is_symmetric = is_a_symmetric and is_b_symmetric
+        ua = _compute_eigenvectors_truncated(a, n_eig, is_symmetric)
+        ub = _compute_eigenvectors_truncated(b, n_eig, is_symmetric)
+        return np.dot(ua, ub.T)
     # symmetrize A & B if not symmetric
     if not (is_a_symmetric and is_b_symmetric):
         a = _symmetrize_matrix(a)
@@ -671,65 +1324,337 @@ def _approx_permutation_2sided_1trans_umeyama(a, b):
     return u_umeyama
 
 
-def _approx_permutation_2sided_1trans_umeyama_svd(a, b, lapack_driver):
+def _approx_permutation_2sided_1trans_umeyama_sparse(a, b, shift, n_eig=None):
+    # Umeyama for the shifted sparse A + shift & B + shift; only the n_eig eigenvectors are
+    # computed from products with the shifted matrices, which are applied as linear operators
+    if n_eig is None:
+        return _approx_permutation_2sided_1trans_umeyama(a.toarray() + shift,
+                                                         b.toarray() + shift)
+    is_symmetric = _is_symmetric(a) and _is_symmetric(b)
+    ua = _compute_eigenvectors_truncated(_shifted_operator(a, shift), n_eig, is_symmetric)
+    ub = _compute_eigenvectors_truncated(_shifted_operator(b, shift), n_eig, is_symmetric)
+    return np.dot(ua, ub.T)
+
+
+def _shifted_operator(a, shift):
+    # linear operator of A + shift 1 1.T, where (A + shift 1 1.T) x = A x + shift (1.T x) 1
+    ones = np.ones(a.shape[0])
+
+    def matvec(vec):
+        vec = np.ravel(vec)
+        return a @ vec + shift * np.sum(vec) * ones
+
+    def rmatvec(vec):
+        vec = np.ravel(vec)
+        return a.T @ vec + shift * np.sum(vec) * ones
+
+    return scipy.sparse.linalg.LinearOperator(a.shape, matvec=matvec, rmatvec=rmatvec,
+                                              dtype=float)
+
+
+def _matmul_shifted(x, y, out, shift=0.0):
+    # compute out = X Y, where X or Y can be a sparse matrix standing for the (implicitly) shifted
+    # matrix X + shift 1 1.T (or Y + shift 1 1.T), i.e., the rank-one correction of the product is
+    # shift 1 (1.T Y) (or shift (X 1) 1.T)
+    if scipy.sparse.issparse(x):
+        out[...] = x @ y
+        if shift:
+            out += shift * np.sum(y, axis=0)
+    elif scipy.sparse.issparse(y):
+        out[...] = x @ y
+        if shift:
+            out += shift * np.sum(x, axis=1)[:, np.newaxis]
+    else:
+        np.dot(x, y, out=out)
+    return out
+
+
+def _is_symmetric(a):
+    # check whether dense or sparse A is symmetric (within a relative & absolute tolerance)
+    if scipy.sparse.issparse(a):
+        diff = abs(a - a.T) - 1.0e-05 * abs(a.T)
+        return diff.nnz == 0 or diff.max() <= 1.0e-08
+    return np.allclose(a, a.T, rtol=1.0e-05, atol=1.0e-08)
+
+
+def _approx_permutation_2sided_1trans_umeyama_svd(a, b, lapack_driver, n_eig=None):
     # compute u_umeyama
-    perm = _approx_permutation_2sided_1trans_umeyama(a, b)
+    perm = _approx_permutation_2sided_1trans_umeyama(a, b, n_eig)
     # compute approximated umeyama matrix
     u, _, vt = scipy.linalg.svd(perm, lapack_driver=lapack_driver)
     u_umeyama_approx = np.dot(np.abs(u), np.abs(vt))
     return u_umeyama_approx
 
 
+def _compute_eigenvectors_truncated(a, n_eig, is_symmetric):
+    # return absolute values of the eigenvectors corresponding to the n_eig eigenvalues with
+    # largest absolute value (sorted by eigenvalue) computed with scipy.sparse.linalg.eigsh, which
+    # only needs products with A (so A can be a dense or sparse matrix or a linear operator)
+    n = a.shape[0]
+    if not 0 < n_eig < n:
+        raise ValueError(f"Option n_eig should be a positive integer smaller than {n}. "
+                         f"Given n_eig={n_eig}")
+    # the starting vector of ones is invariant to permutations, so A & its permuted B are treated
+    # the same way
+    if is_symmetric:
+        eigval, eigvec = scipy.sparse.linalg.eigsh(a, k=n_eig, which="LM", v0=np.ones(n))
+        return np.abs(eigvec[:, np.argsort(eigval)])
+
+    # non-symmetric A is symmetrized to the Hermitian S + iK (see _symmetrize_matrix), where
+    # S = (A + A.T)/2 & K = (A - A.T)/2. Instead of complex arithmetic, the real symmetric matrix
+    # [[S, -K], [K, S]] is used, whose eigenvectors [x; y] correspond to eigenvectors x + iy of
+    # S + iK (each eigenvalue appears twice, for x + iy and i(x + iy) which have the same absolute
+    # values). Its products are computed from the products with A & A.T.
+    def matvec(vec):
+        vec = np.ravel(vec)
+        a_x, at_x = a @ vec[:n], a.T @ vec[:n]
+        a_y, at_y = a @ vec[n:], a.T @ vec[n:]
+        return 0.5 * np.concatenate((a_x + at_x - a_y + at_y, a_x - at_x + a_y + at_y))
+
+    operator = scipy.sparse.linalg.LinearOperator((2 * n, 2 * n), matvec=matvec, dtype=float)
+    eigval, eigvec = scipy.sparse.linalg.eigsh(operator, k=2 * n_eig, which="LM",
+                                               v0=np.ones(2 * n))
+    eigvec = eigvec[:, np.argsort(eigval)]
+    return np.sqrt(eigvec[:n] ** 2 + eigvec[n:] ** 2)
+
+
 def _symmetrize_matrix(a):
     # symmetrized matrix A would be complex
     return (a + a.T) * 0.5 + (a - a.T) * 0.5 * 1j
 
 
-def _permutation_2sided_1trans_undirected(a, b, guess, tol, iteration):
+def _permutation_2sided_1trans_undirected(
+    a, b, guess, tol, iteration, dtype=None, check_every=1, shift=0.0,
+):
     """Solve for 2-sided permutation Procrustes with 1-transformation when A & B are symmetric."""
-
-    p_old = guess
+    # all n x n intermediates are written into preallocated buffers, & the arrays are (optionally)
+    # converted to a reduced-precision dtype (e.g., float32) once. Sparse A & B stand for the
+    # shifted A + shift & B + shift (see _matmul_shifted).
+    a, b, p_old = _setup_nmf_arrays(a, b, guess, dtype)
+    p_new, temp, work, alpha = (np.empty_like(p_old) for _ in range(4))
     change = np.inf
     step = 0
 
     while change > tol and step < iteration:
-        # compute alpha matrix
-        temp = np.dot(a, np.dot(p_old, b))
-        alpha = np.dot(p_old.T, temp)
-        alpha = (alpha + alpha.T) / 2
-        # compute new permutation matrix & change
-        p_new = p_old * np.sqrt(temp / np.dot(p_old, alpha))
-        change = np.trace(np.dot((p_new - p_old).T, (p_new - p_old)))
-        # update permutation matrix
-        p_old = p_new
+        # compute temp = A P B & alpha matrix
+        _matmul_shifted(p_old, b, work, shift)
+        _matmul_shifted(a, work, temp, shift)
+        np.dot(p_old.T, temp, out=alpha)
+        np.add(alpha, alpha.T, out=work)
+        work *= 0.5
+        # compute new permutation matrix P * sqrt(temp / (P alpha))
+        np.dot(p_old, work, out=alpha)
+        np.divide(temp, alpha, out=p_new)
+        np.sqrt(p_new, out=p_new)
+        p_new *= p_old
         step += 1
+        # compute change (squared Frobenius norm) every check_every steps
+        if step % check_every == 0 or step == iteration:
+            np.subtract(p_new, p_old, out=work)
+            change = np.vdot(work, work)
+        # update permutation matrix (by swapping the buffers)
+        p_old, p_new = p_new, p_old
 
     if step == iteration:
         print(f"Maximum iteration reached! change={change} & tolerance={tol}")
 
-    return p_new
+    return p_old
 
 
-def _permutation_2sided_1trans_directed(a, b, guess, tol, iteration):
+def _permutation_2sided_1trans_directed(
+    a, b, guess, tol, iteration, dtype=None, check_every=1, shift=0.0,
+):
     """Solve for 2-sided permutation Procrustes with 1-transformation."""
 
     # Algorithm 2 from Appendix of Procrustes paper
-    p_old = guess
+    # all n x n intermediates are written into preallocated buffers, & the arrays are (optionally)
+    # converted to a reduced-precision dtype (e.g., float32) once. Sparse A & B stand for the
+    # shifted A + shift & B + shift (see _matmul_shifted).
+    a, b, p_old = _setup_nmf_arrays(a, b, guess, dtype)
+    p_new, tmp, work, alpha = (np.empty_like(p_old) for _ in range(4))
     change = np.inf
     step = 0
     while change > tol and step < iteration:
+        # compute tmp1 + tmp2 = A P B.T + A.T P B once (stored in p_new)
+        _matmul_shifted(p_old, b.T, work, shift)
+        _matmul_shifted(a, work, p_new, shift)
+        _matmul_shifted(p_old, b, work, shift)
+        _matmul_shifted(a.T, work, tmp, shift)
+        p_new += tmp
         # compute alpha matrix
-        tmp1 = np.dot(a, np.dot(p_old, b.T))
-        tmp2 = np.dot(a.T, np.dot(p_old, b))
-        alpha = 0.25 * np.dot(p_old.T, tmp1 + tmp2) + np.dot((tmp1 + tmp2).T, p_old)
-        # compute new permutation matrix & change
-        p_new = p_old * np.sqrt((tmp1 + tmp2) / (2 * np.dot(p_old, alpha)))
-        change = np.trace(np.dot((p_new - p_old).T, (p_new - p_old)))
-        # update permutation matrix
-        p_old = p_new
+        np.dot(p_old.T, p_new, out=alpha)
+        alpha *= 0.25
+        np.dot(p_new.T, p_old, out=tmp)
+        alpha += tmp
+        # compute new permutation matrix P * sqrt((tmp1 + tmp2) / (2 P alpha))
+        np.dot(p_old, alpha, out=tmp)
+        tmp *= 2
+        p_new /= tmp
+        np.sqrt(p_new, out=p_new)
+        p_new *= p_old
         step += 1
+        # compute change (squared Frobenius norm) every check_every steps
+        if step % check_every == 0 or step == iteration:
+            np.subtract(p_new, p_old, out=work)
+            change = np.vdot(work, work)
+        # update permutation matrix (by swapping the buffers)
+        p_old, p_new = p_new, p_old
 
     if step == iteration:
         print(f"Maximum iteration reached! change={change} & tolerance={tol}")
 
-    return p_new
+    return p_old
+
+
+def _permutation_2sided_1trans_faq(a, b, guess, tol, iteration):
+    """Solve for 2-sided permutation Procrustes with 1-transformation using Frank-Wolfe (FAQ)."""
+    # maximize f(P) = Tr[P.T A.T P B] = <A P, P B> over the doubly-stochastic matrices, where the
+    # gradient A P B.T + A.T P B is computed from A P & P B. As the search direction D = Q - P
+    # points to a permutation matrix Q, A P & P B are updated using A Q & Q B gathers.
+    is_symmetric = (np.allclose(a, a.T, rtol=1.0e-05, atol=1.0e-08)
+                    and np.allclose(b, b.T, rtol=1.0e-05, atol=1.0e-08))
+    p = np.array(guess, dtype=float)
+    ap, pb = np.dot(a, p), np.dot(p, b)
+    change = np.inf
+    step = 0
+
+    while change > tol and step < iteration:
+        # compute gradient, which is 2 A P B for symmetric A & B
+        if is_symmetric:
+            grad = np.dot(ap, b)
+            grad *= 2
+        else:
+            grad = np.dot(ap, b.T)
+            grad += np.dot(a.T, pb)
+        # find the permutation Q maximizing <grad, Q>, where A Q = A[:, index] & Q B = B[inverse]
+        index = _compute_permutation_hungarian(grad, return_index=True)
+        direction = _permutation_from_index(index)
+        direction -= p
+        ad = a[:, index] - ap
+        db = b[np.argsort(index)] - pb
+        # exact line search of f(P + alpha D) = f(P) + alpha <grad, D> + alpha^2 <A D, D B>
+        slope, curvature = np.vdot(grad, direction), np.vdot(ad, db)
+        if curvature < 0:
+            alpha = min(max(-slope / (2 * curvature), 0.0), 1.0)
+        else:
+            alpha = 1.0 if slope + curvature > 0 else 0.0
+        # update P, A P & P B, and compute change (squared Frobenius norm)
+        p += alpha * direction
+        ap += alpha * ad
+        pb += alpha * db
+        change = alpha ** 2 * np.vdot(direction, direction)
+        step += 1
+
+    if step == iteration:
+        print(f"Maximum iteration reached! change={change} & tolerance={tol}")
+
+    return p
+
+
+def _permutation_2sided_1trans_softassign(
+    a,
+    b,
+    guess,
+    tol,
+    iteration,
+    iteration_sink=200,
+    beta_r=1.10,
+    beta_f=1.e5,
+    epsilon_soft=1.e-3,
+    epsilon_sink=1.e-3,
+    k=0.15,
+    gamma_scaler=1.01,
+    n_stop=3,
+    adapted=True,
+    beta_0=None,
+    iteration_anneal=None,
+):
+    """Solve for 2-sided permutation Procrustes with 1-transformation using softassign."""
+    # pylint: disable=too-many-arguments,too-many-locals
+    # The benefit matrix C = kron(A, B) is never formed; its action on the relaxed permutation
+    # matrix M is the gradient sum_bj A_ab B_ij M_bj = [A M B.T]_ai (O(n^3) time & O(n^2) memory),
+    # & its eigenvalues are the products of the eigenvalues of A & B. For non-symmetric A & B, the
+    # eigenvalues of their symmetric parts are used.
+    n = a.shape[0]
+    # compute gamma (for a positive definite quadratic cost) from the eigenvalues of the
+    # centered A & B, i.e., R C R = kron(R A R, R B R) with centering matrix R = I - 1/n
+    center = np.eye(n) - 1.0 / n
+    eig_a = np.linalg.eigvalsh(_symmetric_part(np.linalg.multi_dot([center, a, center])))
+    eig_b = np.linalg.eigvalsh(_symmetric_part(np.linalg.multi_dot([center, b, center])))
+    gamma = np.max(np.abs(eig_a)) * np.max(np.abs(eig_b)) * gamma_scaler
+    # compute beta_0 from the eigenvalue of C + gamma I with largest absolute value
+    if beta_0 is None:
+        eig_a = np.linalg.eigvalsh(_symmetric_part(a))[[0, -1]]
+        eig_b = np.linalg.eigvalsh(_symmetric_part(b))[[0, -1]]
+        eig_c = np.outer(eig_a, eig_b)
+        eival_gamma = max(abs(np.max(eig_c) + gamma), abs(np.min(eig_c) + gamma))
+        beta_0 = 1 / (gamma_scaler * max(1.e-10, eival_gamma / n))
+    else:
+        beta_0 *= n
+    beta = beta_0
+    # iteration_anneal is used (if given) even if the final inverse temperature is specified
+    if iteration_anneal is not None:
+        beta_f = beta_0 * np.power(beta_r, iteration_anneal) * n
+    else:
+        beta_f *= n
+
+    array_m = guess / n
+    nochange = 0
+    if adapted:
+        epsilon_sink = epsilon_soft * k
+    while beta < beta_f:
+        # relaxation
+        m_old_beta = np.copy(array_m)
+        # softassign loop
+        for _ in range(iteration):
+            m_old_soft = np.copy(array_m)
+            # compute Z = A M B.T + gamma M in relaxation step & soft assign
+            array_z = np.linalg.multi_dot([a, array_m, b.T])
+            array_z += gamma * array_m
+            array_z *= beta
+            array_m = np.exp(array_z, out=array_z)
+            # Sinkhorn loop
+            for _ in range(iteration_sink):
+                # row & column normalization
+                array_m /= array_m.sum(axis=1, keepdims=True)
+                array_m /= array_m.sum(axis=0, keepdims=True)
+                if np.amax(np.abs(array_m.sum(axis=1) - 1)) < epsilon_sink:
+                    array_m /= array_m.sum(axis=1, keepdims=True)
+                    break
+
+            change_soft = np.amax(np.abs(array_m - m_old_soft))
+            if change_soft < epsilon_soft:
+                break
+            if adapted:
+                epsilon_sink = change_soft * k
+
+        change_annealing = np.amax(np.abs(array_m - m_old_beta))
+        if change_annealing < tol:
+            nochange += 1
+            if nochange > n_stop:
+                break
+        else:
+            nochange = 0
+
+        beta *= beta_r
+        if adapted:
+            epsilon_soft = change_soft * k
+            epsilon_sink = epsilon_soft * k
+
+    return array_m
+
+
+def _symmetric_part(a):
+    # symmetric part of a real matrix
+    return (a + a.T) * 0.5
+
+
+def _setup_nmf_arrays(a, b, guess, dtype):
+    # return C-contiguous (or CSR, for sparse A & B) copies of A, B & guess with the given (or
+    # float64) dtype
+    dtype = np.float64 if dtype is None else np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"The dtype of nmf method should be a floating type. Given {dtype}")
+    a, b = (scipy.sparse.csr_matrix(array, dtype=dtype) if scipy.sparse.issparse(array)
+            else np.ascontiguousarray(array, dtype=dtype) for array in (a, b))
+    return a, b, np.array(guess, dtype=dtype, order="C")
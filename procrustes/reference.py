@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Prepared Reference Module."""
+
+import numpy as np
+from procrustes.permutation import _compute_permutation_hungarian, _permutation_from_index
+from procrustes.rotational import _rotational_closed_form
+from procrustes.utils import (_compute_error_analytic, _setup_input_array_lower, _zero_padding,
+                              ProcrustesResult)
+import scipy
+
+__all__ = [
+    "Reference",
+]
+
+
+class Reference:
+    r"""Reference matrix :math:`\mathbf{B}` prepared for aligning many matrices to it.
+
+    Aligning many matrices :math:`\mathbf{A}` to the same reference matrix :math:`\mathbf{B}`
+    with the Procrustes routines checks and processes :math:`\mathbf{B}` (and decomposes it for
+    the two-sided orthogonal Procrustes) over and over again. Here, :math:`\mathbf{B}` is
+    processed once at construction, and its squared norm, eigendecomposition and singular value
+    decomposition are cached (the decompositions are computed when first needed), so that the
+    methods of this class only process and decompose :math:`\mathbf{A}`.
+
+    The given options are used for processing both :math:`\mathbf{A}` and :math:`\mathbf{B}`,
+    and each method gives the same result as the corresponding Procrustes routine called with
+    these options.
+
+    Parameters
+    ----------
+    b : ndarray
+        The 2D-array :math:`\mathbf{B}` representing the reference matrix.
+    pad : bool, optional
+        Add zero rows (at the bottom) and/or columns (to the right-hand side) of matrices
+        :math:`\mathbf{A}` and :math:`\mathbf{B}` so that they have the same shape.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    unpad_col : bool, optional
+        If True, zero columns (with values less than 1.0e-8) on the right-hand side of the intial
+        :math:`\mathbf{A}` and :math:`\mathbf{B}` matrices are removed.
+    unpad_row : bool, optional
+        If True, zero rows (with values less than 1.0e-8) at the bottom of the intial
+        :math:`\mathbf{A}` and :math:`\mathbf{B}` matrices are removed.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`.
+    lapack_driver : {'gesvd', 'gesdd'}, optional
+        Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
+        general rectangular approach ('gesvd') to compute the singular-value decomposition with
+        `scipy.linalg.svd`.
+
+    Attributes
+    ----------
+    new_b : ndarray
+        The processed reference matrix :math:`\mathbf{B}`.
+    norm_b : float
+        The squared Frobenius norm of the processed reference matrix :math:`\mathbf{B}`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> b = np.random.uniform(-10.0, 10.0, (100, 3))
+    >>> ref = Reference(b, translate=True, scale=True)
+    >>> errors = [ref.rotational(np.random.uniform(-10.0, 10.0, (100, 3))).error
+    ...           for _ in range(1000)]
+
+    """
+
+    def __init__(
+        self,
+        b,
+        pad=True,
+        translate=False,
+        scale=False,
+        unpad_col=False,
+        unpad_row=False,
+        check_finite=True,
+        weight=None,
+        lapack_driver="gesvd",
+    ):
+        """Process the reference matrix B with the given options."""
+        self._options = (unpad_col, unpad_row, translate, scale, check_finite, weight)
+        self._pad = pad
+        self._lapack_driver = lapack_driver
+        # process B once, the same way setup_input_arrays does
+        self.new_b = _setup_input_array_lower(b, None, *self._options)
+        self.norm_b = np.linalg.norm(self.new_b) ** 2
+        # the decompositions of B are computed when first needed
+        self._eigh_b = None
+        self._svd_b = None
+
+    def _setup(self, a):
+        """Return the processed A & B, where B is padded (copied) only if needed."""
+        new_a = _setup_input_array_lower(a, None, *self._options)
+        new_b = self.new_b
+        if self._pad:
+            new_a, new_b = _zero_padding(new_a, new_b, pad_mode="row-col")
+        return new_a, new_b
+
+    def _eigh(self, new_b):
+        """Return the eigendecomposition of (symmetric) B, cached unless B is padded."""
+        if new_b is self.new_b and self._eigh_b is not None:
+            return self._eigh_b
+        if not np.allclose(new_b.T, new_b):
+            raise ValueError(
+                f"Array B with {new_b.shape} shape is not symmetric. "
+                "Check pad, remove_zero_col, and remove_zero_row arguments."
+            )
+        decomposition = np.linalg.eigh(new_b)
+        if new_b is self.new_b:
+            self._eigh_b = decomposition
+        return decomposition
+
+    def _svd(self, new_b):
+        """Return the singular value decomposition of B, cached unless B is padded."""
+        if new_b is self.new_b and self._svd_b is not None:
+            return self._svd_b
+        decomposition = scipy.linalg.svd(new_b, lapack_driver=self._lapack_driver)
+        if new_b is self.new_b:
+            self._svd_b = decomposition
+        return decomposition
+
+    def orthogonal(self, a, return_arrays=True):
+        r"""Perform orthogonal Procrustes of :math:`\mathbf{A}` onto the reference.
+
+        Parameters
+        ----------
+        a : ndarray
+            The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+        return_arrays : bool, optional
+            If False, ``new_a`` and ``new_b`` of the result are None.
+
+        Returns
+        -------
+        res : ProcrustesResult
+            The Procrustes result represented as a class:`utils.ProcrustesResult` object, which is
+            the same as the result of :func:`procrustes.orthogonal`.
+
+        """
+        new_a, new_b = self._setup(a)
+        if new_a.shape != new_b.shape:
+            raise ValueError(
+                f"Shape of A and B does not match: {new_a.shape} != {new_b.shape} "
+                "Check pad, unpad_col, and unpad_row arguments."
+            )
+        u, s, vt = scipy.linalg.svd(np.dot(new_a.T, new_b), lapack_driver=self._lapack_driver)
+        u_opt = np.dot(u, vt)
+        error = np.linalg.norm(new_a) ** 2 + self.norm_b - 2 * np.sum(s)
+        error = _compute_error_analytic(error, new_a, new_b, u_opt)
+
+        if not return_arrays:
+            new_a, new_b = None, None
+        return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt, s=None)
+
+    def rotational(self, a, return_arrays=True):
+        r"""Perform rotational Procrustes of :math:`\mathbf{A}` onto the reference.
+
+        Parameters
+        ----------
+        a : ndarray
+            The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+        return_arrays : bool, optional
+            If False, ``new_a`` and ``new_b`` of the result are None.
+
+        Returns
+        -------
+        res : ProcrustesResult
+            The Procrustes result represented as a class:`utils.ProcrustesResult` object, which is
+            the same as the result of :func:`procrustes.rotational`.
+
+        """
+        new_a, new_b = self._setup(a)
+        if new_a.shape != new_b.shape:
+            raise ValueError(
+                f"Shape of A and B does not match: {new_a.shape} != {new_b.shape} "
+                "Check pad, unpad_col, and unpad_row arguments."
+            )
+        if new_a.shape[1] in (2, 3):
+            r_opt, trace = _rotational_closed_form(np.dot(new_a.T, new_b))
+        else:
+            u, sigma, vt = scipy.linalg.svd(np.dot(new_a.T, new_b),
+                                            lapack_driver=self._lapack_driver)
+            sign = np.sign(np.linalg.det(np.dot(u, vt)))
+            u[:, -1] *= sign
+            r_opt = np.dot(u, vt)
+            trace = np.sum(sigma[:-1]) + sign * sigma[-1]
+        error = np.linalg.norm(new_a) ** 2 + self.norm_b - 2 * trace
+        error = _compute_error_analytic(error, new_a, new_b, r_opt)
+
+        if not return_arrays:
+            new_a, new_b = None, None
+        return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=r_opt, s=None)
+
+    def permutation(self, a, return_arrays=True):
+        r"""Perform one-sided permutation Procrustes of :math:`\mathbf{A}` onto the reference.
+
+        Parameters
+        ----------
+        a : ndarray
+            The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+        return_arrays : bool, optional
+            If False, ``new_a`` and ``new_b`` of the result are None.
+
+        Returns
+        -------
+        res : ProcrustesResult
+            The Procrustes result represented as a class:`utils.ProcrustesResult` object, which is
+            the same as the result of :func:`procrustes.permutation`.
+
+        """
+        new_a, new_b = self._setup(a)
+        # if number of rows is less than column, the arrays are made square
+        if (new_a.shape[0] < new_a.shape[1]) or (new_b.shape[0] < new_b.shape[1]):
+            new_a, new_b = _zero_padding(new_a, new_b, "square")
+        c = np.dot(new_a.T, new_b)
+        n = c.shape[1]
+        index = _compute_permutation_hungarian(c, return_index=True)
+        p = _permutation_from_index(index)
+        error = np.linalg.norm(new_a) ** 2 + self.norm_b - 2 * np.sum(c[index, np.arange(n)])
+        error = _compute_error_analytic(error, new_a, new_b, p)
+
+        if not return_arrays:
+            new_a, new_b = None, None
+        return ProcrustesResult(new_a=new_a, new_b=new_b, t=p, error=error, t_index=index)
+
+    def orthogonal_2sided(self, a, single=True, return_arrays=True):
+        r"""Perform two-sided orthogonal Procrustes of :math:`\mathbf{A}` onto the reference.
+
+        The eigendecomposition (``single=True``) or the singular value decomposition
+        (``single=False``) of the reference matrix is only computed once.
+
+        Parameters
+        ----------
+        a : ndarray
+            The 2D-array :math:`\mathbf{A}` which is going to be transformed.
+        single : bool, optional
+            If True, single transformation is used (i.e., :math:`\mathbf{Q}_1=\mathbf{Q}_2=
+            \mathbf{Q}`), otherwise, two transformations are used.
+        return_arrays : bool, optional
+            If False, ``new_a`` and ``new_b`` of the result are None.
+
+        Returns
+        -------
+        res : ProcrustesResult
+            The Procrustes result represented as a class:`utils.ProcrustesResult` object, which is
+            the same as the result of :func:`procrustes.orthogonal_2sided`.
+
+        """
+        new_a, new_b = self._setup(a)
+        if single:
+            if not np.allclose(new_a.T, new_a):
+                raise ValueError(
+                    f"Array A with {new_a.shape} shape is not symmetric. "
+                    "Check pad, remove_zero_col, and remove_zero_row arguments."
+                )
+            sb, ub = self._eigh(new_b)
+            sa, ua = np.linalg.eigh(new_a)
+            u_opt1 = np.dot(ub, ua.T)
+            u_opt2 = u_opt1.T
+        else:
+            ub, sb, vtb = self._svd(new_b)
+            ua, sa, vta = scipy.linalg.svd(new_a, lapack_driver=self._lapack_driver)
+            u_opt1 = np.dot(ub, ua.T)
+            u_opt2 = np.dot(vta.T, vtb)
+        error = _compute_error_analytic(np.sum((sa - sb) ** 2), new_a, new_b, u_opt2, u_opt1)
+
+        if not return_arrays:
+            new_a, new_b = None, None
+        return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=u_opt2, s=u_opt1)
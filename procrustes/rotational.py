@@ -23,9 +23,18 @@
 """Rotational-Orthogonal Procrustes Module."""
 
 import numpy as np
-from procrustes.utils import compute_error, ProcrustesResult, setup_input_arrays
+from procrustes.utils import (_compute_error_analytic, _compute_error_statistics,
+                              _compute_statistics_stream, _setup_input_stacks, ProcrustesResult,
+                              setup_input_arrays)
 import scipy
 
+__all__ = [
+    "rotational",
+    "rotational_batch",
+    "rotational_stream",
+    "kabsch",
+]
+
 
 def rotational(
     a,
@@ -37,7 +46,8 @@ def rotational(
     unpad_row=False,
     check_finite=True,
     weight=None,
-    lapack_driver="gesvd"
+    lapack_driver="gesvd",
+    return_arrays=True,
 ):
     r"""Perform rotational Procrustes.
 
@@ -88,7 +98,12 @@ def rotational(
     lapack_driver : {'gesvd', 'gesdd'}, optional
         Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
         general rectangular approach ('gesvd') to compute the singular-value decomposition with
-        `scipy.linalg.svd`.
+        `scipy.linalg.svd`. This is not used when :math:`\mathbf{A}` has 2 or 3 columns, because
+        then the closed-form solution of :func:`kabsch` is used.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -163,14 +178,292 @@ def rotational(
             f"Shape of A and B does not match: {new_a.shape} != {new_b.shape} "
             "Check pad, unpad_col, and unpad_row arguments."
         )
-    # compute SVD of A.T * B
-    u, _, vt = scipy.linalg.svd(np.dot(new_a.T, new_b), lapack_driver=lapack_driver)
-    # construct S: an identity matrix with the smallest singular value replaced by sgn(|U*V^t|)
-    s = np.eye(new_a.shape[1])
-    s[-1, -1] = np.sign(np.linalg.det(np.dot(u, vt)))
-    # compute optimal rotational transformation
-    r_opt = np.dot(np.dot(u, s), vt)
-    # compute one-sided error
-    error = compute_error(new_a, new_b, r_opt)
+    if new_a.shape[1] in (2, 3):
+        # use the closed-form solution for 2D & 3D rotations (e.g., molecular structures)
+        r_opt, trace = _rotational_closed_form(np.dot(new_a.T, new_b))
+    else:
+        # compute SVD of A.T * B
+        u, sigma, vt = scipy.linalg.svd(np.dot(new_a.T, new_b), lapack_driver=lapack_driver)
+        # construct S: an identity matrix with the smallest singular value replaced by sgn(|U*V^t|)
+        s = np.eye(new_a.shape[1])
+        s[-1, -1] = np.sign(np.linalg.det(np.dot(u, vt)))
+        # compute optimal rotational transformation
+        r_opt = np.dot(np.dot(u, s), vt)
+        # Tr[R.T A.T B] is the sum of singular values with the sign-corrected smallest one
+        trace = np.sum(sigma[:-1]) + s[-1, -1] * sigma[-1]
+    # compute one-sided error, i.e. ||A||^2 + ||B||^2 - 2 Tr[R.T A.T B]
+    error = np.linalg.norm(new_a) ** 2 + np.linalg.norm(new_b) ** 2 - 2 * trace
+    error = _compute_error_analytic(error, new_a, new_b, r_opt)
 
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=r_opt, s=None)
+
+
+def rotational_batch(
+    a,
+    b,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    weight=None,
+    return_arrays=True,
+):
+    r"""Perform rotational Procrustes on a stack of matrix pairs.
+
+    Given stacks of matrices :math:`\mathbf{A}^{(i)}_{m \times n}` and reference matrices
+    :math:`\mathbf{B}^{(i)}_{m \times n}` with :math:`i=1,\dots,k`, find the rotational
+    transformation matrices :math:`\mathbf{R}^{(i)}_{n \times n}` that make each
+    :math:`\mathbf{A}^{(i)}\mathbf{R}^{(i)}` as close as possible to :math:`\mathbf{B}^{(i)}`.
+    This is equivalent to calling :func:`rotational` on each pair, but all pairs are solved at
+    once with batched (stacked) singular value decompositions and matrix products, which is much
+    faster for many small problems.
+
+    Because all matrices in a stack share the same shape, no padding or unpadding is performed.
+    In preparing the :math:`\mathbf{A}` and :math:`\mathbf{B}` stacks, the (optional) order of
+    operations is: **1)** translate each matrix to the origin, **2)** weight entries of each
+    matrix, **3)** scale each matrix to have unit norm.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 3D-array :math:`\mathbf{A}_{k \times m \times n}` stacking the matrices which are
+        going to be transformed.
+    b : ndarray
+        The 3D-array :math:`\mathbf{B}_{k \times m \times n}` stacking the reference matrices.
+    translate : bool, optional
+        If True, each matrix is centered at origin (columns of the matrices will have mean zero).
+    scale : bool, optional
+        If True, each matrix is normalized with respect to the Frobenius norm.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row, shared by all matrices in the stacks.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` is the :math:`k \times n \times n` stack of rotations and ``error`` is the
+        1D-array of the :math:`k` Procrustes errors.
+
+    """
+    # check inputs
+    new_a, new_b = _setup_input_stacks(a, b, translate, scale, check_finite, weight)
+    h = np.matmul(np.swapaxes(new_a, 1, 2), new_b)
+    if new_a.shape[2] in (2, 3):
+        # use the closed-form solution for 2D & 3D rotations
+        r_opt, trace = _rotational_closed_form(h)
+    else:
+        # compute SVD of each A.T * B
+        u, sigma, vt = np.linalg.svd(h)
+        # replace the smallest singular value by sgn(|U*V^t|), i.e., flip the last column of U
+        sign = np.sign(np.linalg.det(np.matmul(u, vt)))
+        u[:, :, -1] *= sign[:, np.newaxis]
+        # compute optimal rotational transformations
+        r_opt = np.matmul(u, vt)
+        trace = np.sum(sigma[:, :-1], axis=1) + sign * sigma[:, -1]
+    # compute one-sided errors from the (sign-corrected) singular values
+    error = (np.einsum("kij,kij->k", new_a, new_a) + np.einsum("kij,kij->k", new_b, new_b)
+             - 2 * trace)
+    error = _compute_error_analytic(error, new_a, new_b, r_opt)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=r_opt, s=None)
+
+
+def rotational_stream(
+    chunks,
+    pad=True,
+    translate=False,
+    scale=False,
+    check_finite=True,
+):
+    r"""Perform rotational Procrustes on arrays given as a stream of row chunks.
+
+    This solves the same problem as :func:`rotational`, but the (very tall) matrices
+    :math:`\mathbf{A}_{m \times n}` and :math:`\mathbf{B}_{m \times n}` are given as
+    chunks of rows. Only the sufficient statistics :math:`\mathbf{A}^\dagger\mathbf{A}`,
+    :math:`\mathbf{A}^\dagger\mathbf{B}` and the norms of the arrays are accumulated, so the
+    transformation matrix :math:`\mathbf{R}` and the error are computed using
+    :math:`\mathcal{O}(n^2)` memory regardless of the number of rows :math:`m`. The translation,
+    weighting and scaling of :math:`\mathbf{A}` and :math:`\mathbf{B}` (in that order) are
+    applied to the accumulated statistics. Unpadding zero rows/columns is not supported.
+
+    Parameters
+    ----------
+    chunks : iterable
+        An iterable (e.g., generator) of ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` tuples, where
+        ``a_i`` and ``b_i`` are 2D-arrays holding consecutive rows of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`, and ``w_i`` is the (optional) 1D-array of the corresponding row
+        weights. Each chunk is only used once, so the chunks can be read lazily from a file.
+    pad : bool, optional
+        Add zero columns (to the right-hand side) of matrices :math:`\mathbf{A}` and
+        :math:`\mathbf{B}` so that they have the same shape.
+    translate : bool, optional
+        If True, both arrays are centered at origin (columns of the arrays will have mean zero).
+    scale : bool, optional
+        If True, both arrays are normalized with respect to the Frobenius norm, i.e.,
+        :math:`\text{Tr}\left[\mathbf{A}^\dagger\mathbf{A}\right] = 1` and
+        :math:`\text{Tr}\left[\mathbf{B}^\dagger\mathbf{B}\right] = 1`.
+    check_finite : bool, optional
+        If True, convert the input chunks to arrays, checking for NaNs or Infs.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object. As the
+        processed arrays are never formed, ``new_a`` and ``new_b`` are None.
+
+    """
+    # accumulate A.T * A, A.T * B & norms of A and B
+    ata, atb, _, norm_b = _compute_statistics_stream(chunks, pad, translate, scale, check_finite)
+    if atb.shape[1] in (2, 3):
+        # use the closed-form solution for 2D & 3D rotations
+        r_opt, _ = _rotational_closed_form(atb)
+    else:
+        # compute SVD of A.T * B & flip the last column of U when the rotation is improper
+        u, _, vt = scipy.linalg.svd(atb)
+        u[:, -1] *= np.sign(np.linalg.det(np.dot(u, vt)))
+        r_opt = np.dot(u, vt)
+    # compute one-sided error
+    error = _compute_error_statistics(ata, atb, norm_b, r_opt)
+
+    return ProcrustesResult(error=error, new_a=None, new_b=None, t=r_opt, s=None)
+
+
+def kabsch(a, b, translate=False, check_finite=True, return_arrays=True):
+    r"""Perform rotational Procrustes of 2D or 3D coordinates with a closed-form solution.
+
+    Given coordinates :math:`\mathbf{A}_{m \times n}` and reference coordinates
+    :math:`\mathbf{B}_{m \times n}` of :math:`m` points in :math:`n=2` or :math:`n=3` dimensions,
+    find the rotation matrix :math:`\mathbf{R}_{n \times n}` that makes :math:`\mathbf{AR}` as
+    close as possible to :math:`\mathbf{B}`, along with the root-mean-square deviation (RMSD) of
+    the aligned points. This is the same problem solved by :func:`rotational`, but instead of a
+    general singular value decomposition, the optimal rotation is obtained in closed form, which
+    is vectorized over any number of leading (stacked) dimensions. This makes it well suited for
+    aligning many molecular structures or trajectory frames at once.
+
+    Parameters
+    ----------
+    a : ndarray
+        The array :math:`\mathbf{A}` of shape :math:`(\dots, m, n)` which is going to be
+        transformed. The leading dimensions (if any) enumerate the structures (frames).
+    b : ndarray
+        The array :math:`\mathbf{B}` of shape :math:`(\dots, m, n)` representing the reference
+        coordinates. Its leading dimensions are broadcast against those of :math:`\mathbf{A}`, so
+        a single :math:`(m, n)` reference can be used for all structures.
+    translate : bool, optional
+        If True, the coordinates are centered at origin (columns will have mean zero) before
+        alignment.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` holds the rotation matrices of shape :math:`(\dots, n, n)`, and ``error`` and
+        ``rmsd`` hold the Procrustes errors and the RMSD values of shape :math:`(\dots)`.
+
+    Notes
+    -----
+    For :math:`n=2`, the rotation by angle :math:`\theta` maximizing
+    :math:`\text{Tr}\left[\mathbf{R}^\dagger \mathbf{H}\right]` with
+    :math:`\mathbf{H} = \mathbf{A}^\dagger \mathbf{B}` is given by
+    :math:`\theta = \text{atan2}\left(h_{21} - h_{12}, h_{11} + h_{22}\right)`.
+
+    For :math:`n=3`, Horn's quaternion method is used: the optimal rotation corresponds to the
+    eigenvector of the largest eigenvalue of a symmetric :math:`4 \times 4` matrix built from the
+    elements of :math:`\mathbf{H}`, and that eigenvalue equals the maximum of
+    :math:`\text{Tr}\left[\mathbf{R}^\dagger \mathbf{H}\right]`. The Procrustes error is then
+    :math:`\|\mathbf{A}\|_F^2 + \|\mathbf{B}\|_F^2 -
+    2\,\text{max}\,\text{Tr}\left[\mathbf{R}^\dagger \mathbf{H}\right]`, and the RMSD is
+    :math:`\sqrt{\text{error} / m}`.
+
+    References
+    ----------
+    [1] B. K. P. Horn, "Closed-form solution of absolute orientation using unit quaternions,"
+          J. Opt. Soc. Am. A, 4:629-642, 1987.
+
+    """
+    if check_finite:
+        a, b = np.asarray_chkfinite(a), np.asarray_chkfinite(b)
+    else:
+        a, b = np.asarray(a), np.asarray(b)
+    if a.ndim < 2 or b.ndim < 2:
+        raise TypeError("Matrix inputs must be arrays with at least 2 dimensions")
+    if a.shape[-2:] != b.shape[-2:]:
+        raise ValueError(f"Shape of A and B does not match: {a.shape} != {b.shape}")
+    if a.shape[-1] not in (2, 3):
+        raise ValueError(f"Coordinates should be 2D or 3D, but A has {a.shape[-1]} columns.")
+
+    if translate:
+        a = a - np.mean(a, axis=-2, keepdims=True)
+        b = b - np.mean(b, axis=-2, keepdims=True)
+    # compute the cross-covariance matrices & closed-form rotations
+    r_opt, trace = _rotational_closed_form(np.matmul(np.swapaxes(a, -1, -2), b))
+    # compute errors from the norms & maximum trace, clipping round-off below zero
+    error = np.einsum("...ij,...ij->...", a, a) + np.einsum("...ij,...ij->...", b, b) - 2 * trace
+    error = np.maximum(error, 0.0)
+    rmsd = np.sqrt(error / a.shape[-2])
+
+    if not return_arrays:
+        a, b = None, None
+    return ProcrustesResult(error=error, rmsd=rmsd, new_a=a, new_b=b, t=r_opt, s=None)
+
+
+def _rotational_closed_form(h):
+    r"""Return the 2D or 3D rotations maximizing Tr[R.T H] and the maximum traces.
+
+    The cross-covariance matrix (or a stack of them) `h` has shape (..., n, n) with n=2 or n=3.
+    """
+    if h.shape[-1] == 2:
+        # the rotation angle is obtained from the elements of H
+        cos_sum = h[..., 0, 0] + h[..., 1, 1]
+        sin_sum = h[..., 1, 0] - h[..., 0, 1]
+        theta = np.arctan2(sin_sum, cos_sum)
+        cos, sin = np.cos(theta), np.sin(theta)
+        r_opt = np.empty(h.shape)
+        r_opt[..., 0, 0], r_opt[..., 0, 1] = cos, -sin
+        r_opt[..., 1, 0], r_opt[..., 1, 1] = sin, cos
+        return r_opt, np.hypot(cos_sum, sin_sum)
+
+    # build Horn's symmetric 4x4 matrix (only the upper triangle is used by eigh)
+    (sxx, sxy, sxz), (syx, syy, syz), (szx, szy, szz) = [
+        [h[..., i, j] for j in range(3)] for i in range(3)]
+    k = np.zeros(h.shape[:-2] + (4, 4))
+    k[..., 0, 0] = sxx + syy + szz
+    k[..., 0, 1] = syz - szy
+    k[..., 0, 2] = szx - sxz
+    k[..., 0, 3] = sxy - syx
+    k[..., 1, 1] = sxx - syy - szz
+    k[..., 1, 2] = sxy + syx
+    k[..., 1, 3] = szx + sxz
+    k[..., 2, 2] = syy - sxx - szz
+    k[..., 2, 3] = syz + szy
+    k[..., 3, 3] = szz - sxx - syy
+    eigval, eigvec = np.linalg.eigh(k, UPLO="U")
+    # the eigenvector of the largest eigenvalue is the optimal (unit) quaternion
+    q0, qx, qy, qz = [eigvec[..., i, -1] for i in range(4)]
+    # the rotation matrix of the quaternion maps A to B as Q a_i = b_i, so R = Q.T
+    r_opt = np.empty(h.shape)
+    r_opt[..., 0, 0] = q0 * q0 + qx * qx - qy * qy - qz * qz
+    r_opt[..., 1, 0] = 2 * (qx * qy - q0 * qz)
+    r_opt[..., 2, 0] = 2 * (qx * qz + q0 * qy)
+    r_opt[..., 0, 1] = 2 * (qy * qx + q0 * qz)
+    r_opt[..., 1, 1] = q0 * q0 - qx * qx + qy * qy - qz * qz
+    r_opt[..., 2, 1] = 2 * (qy * qz - q0 * qx)
+    r_opt[..., 0, 2] = 2 * (qz * qx - q0 * qy)
+    r_opt[..., 1, 2] = 2 * (qz * qy + q0 * qx)
+    r_opt[..., 2, 2] = q0 * q0 - qx * qx - qy * qy + qz * qz
+    return r_opt, eigval[..., -1]
@@ -22,12 +22,12 @@
 # --
 """The Softassign Procrustes Module."""
 
-from copy import deepcopy
 import warnings
 
 import numpy as np
-from procrustes.kopt import kopt_heuristic_single
-from procrustes.permutation import permutation
+from procrustes.kopt import _refine_quadratic
+from procrustes.permutation import (_compute_permutation_hungarian,
+                                    _permutation_2sided_1trans_softassign)
 from procrustes.utils import compute_error, ProcrustesResult, setup_input_arrays
 
 __all__ = [
@@ -41,7 +41,8 @@ def softassign(array_a, array_b, iteration_soft=50, iteration_sink=200,
                pad_mode='row-col', remove_zero_col=True, remove_zero_row=True,
                translate=False, scale=False, check_finite=True, adapted=True,
                beta_0=None, m_guess=None, iteration_anneal=None, kopt=False,
-               kopt_k=3, weight=None):
+               kopt_k=3, weight=None, return_arrays=True, kopt_method="k-opt", kopt_iter=None,
+               kopt_time=None, kopt_seed=None):
     r"""
     Find the transformation matrix for 2-sided permutation Procrustes with softassign algorithm.
 
@@ -129,6 +130,21 @@ def softassign(array_a, array_b, iteration_soft=50, iteration_sink=200,
         search of 3 items and kopt_k=2 only searches for two items locally. Default=3.
     weight : ndarray
         The weighting matrix. Default=None.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+    kopt_method : {"k-opt", "tabu", "anneal"}, optional
+        The local search used for refining the permutation matrix when kopt is True, i.e., the
+        k-opt heuristic (see :func:`procrustes.kopt.kopt_heuristic_quadratic`), robust tabu search
+        (see :func:`procrustes.kopt.tabu_search_quadratic`) or simulated annealing (see
+        :func:`procrustes.kopt.simulated_annealing_quadratic`). Default="k-opt".
+    kopt_iter : int, optional
+        Maximum number of iterations of the "tabu" and "anneal" searches. Default=None.
+    kopt_time : float, optional
+        Maximum time (in seconds) of the "tabu" and "anneal" searches. Default=None.
+    kopt_seed : int, optional
+        Seed of the random numbers of the "tabu" and "anneal" searches. Default=None.
 
     Returns
     -------
@@ -190,35 +206,16 @@ def softassign(array_a, array_b, iteration_soft=50, iteration_sink=200,
     # Check beta_r
     if beta_r <= 1:
         raise ValueError("Argument beta_r cannot be less than 1.")
+    if kopt_method not in ["k-opt", "tabu", "anneal"]:
+        raise ValueError("Argument kopt_method should be 'k-opt', 'tabu' or 'anneal'. "
+                         f"Given kopt_method={kopt_method}")
 
     new_a, new_b = setup_input_arrays(array_a, array_b, remove_zero_col, remove_zero_row,
                                       pad_mode, translate, scale, check_finite, weight)
-    # Initialization
-    # Compute the benefit matrix
-    array_c = np.kron(new_a, new_b)
     # Get the shape of A (B and the permutation matrix as well)
     row_num = new_a.shape[0]
-    c_tensor = array_c.reshape(row_num, row_num, row_num, row_num)
-    # Compute the beta_0
-    gamma = _compute_gamma(array_c, row_num, gamma_scaler)
-    if beta_0 is None:
-        c_gamma = array_c + gamma * (np.identity(row_num * row_num))
-        eival_gamma = np.amax(np.abs(np.linalg.eigvalsh(c_gamma)))
-        beta_0 = gamma_scaler * max(1.e-10, eival_gamma / row_num)
-        beta_0 = 1 / beta_0
-    else:
-        beta_0 *= row_num
-    beta = beta_0
-
     # We will use iteration_anneal if provided even if the final inverse temperature is specified
-    # iteration_anneal is not None, beta_f can be None or not
-    if iteration_anneal is not None:
-        beta_f = beta_0 * np.power(beta_r, iteration_anneal) * row_num
-    # iteration_anneal is None and beta_f is not None
-    elif iteration_anneal is None and beta_f is not None:
-        beta_f *= row_num
-    # Both iteration_anneal and beta_f are None
-    else:
+    if iteration_anneal is None and beta_f is None:
         raise ValueError("We must specify at least one of iteration_anneal and beta_f and "
                          "specify only one is recommended.")
     # Initialization of m_ai
@@ -228,7 +225,7 @@ def softassign(array_a, array_b, iteration_soft=50, iteration_sink=200,
             raise ValueError(
                 "The initial guess of permutation matrix cannot contain any negative values.")
         if m_guess.shape[0] == row_num and m_guess.shape[1] == row_num:
-            array_m = m_guess
+            array_m = np.array(m_guess, dtype=float)
         else:
             warnings.warn("The shape of m_guess does not match ({0}, {0})."
                           "Use random initial guess instead.".format(row_num))
@@ -236,75 +233,22 @@ def softassign(array_a, array_b, iteration_soft=50, iteration_sink=200,
     else:
         # m_relax_old = 1 / N + np.random.rand(N, N)
         array_m = np.abs(np.random.normal(loc=1.0, scale=0.1, size=(row_num, row_num)))
-    array_m[array_m < 0] = 0
-    array_m = array_m / row_num
 
-    nochange = 0
-    if adapted:
-        epsilon_sink = epsilon_soft * k
-    while beta < beta_f:
-        # relaxation
-        m_old_beta = deepcopy(array_m)
-        # softassign loop
-        for _ in np.arange(iteration_soft):
-            m_old_soft = deepcopy(array_m)
-            # Compute Z in relaxation step
-            # C_gamma_tensor = C_gamma.reshape(N, N, N, N)
-            # Z = -np.einsum('ijkl,jl->ik', C_gamma_tensor, M)
-            # Z -= linear_cost_func
-            array_z = np.einsum('aibj,bj->ai', c_tensor, array_m)
-            array_z += gamma * array_m
-            # soft_assign
-            array_m = np.exp(beta * array_z)
-            # Sinkhorn loop
-            for _ in np.arange(iteration_sink):
-                # Row normalization
-                array_m = array_m / array_m.sum(axis=1, keepdims=1)
-                # Column normalization
-                array_m = array_m / array_m.sum(axis=0, keepdims=1)
-                # Compute the delata_M_sink
-                if np.amax(np.abs(array_m.sum(axis=1, keepdims=1) - 1)) < epsilon_sink:
-                    array_m = array_m / array_m.sum(axis=1, keepdims=1)
-                    break
-
-            change_soft = np.amax(np.abs(array_m - m_old_soft))
-            # pylint: disable-msg=no-else-break
-            if change_soft < epsilon_soft:
-                break
-            else:
-                if adapted:
-                    epsilon_sink = change_soft * k
-                else:
-                    continue
-
-        change_annealing = np.amax(np.abs(array_m - m_old_beta))
-        if change_annealing < epsilon:
-            nochange += 1
-            if nochange > n_stop:
-                break
-        else:
-            nochange = 0
-
-        beta *= beta_r
-        if adapted:
-            epsilon_soft = change_soft * k
-            epsilon_sink = epsilon_soft * k
+    # Annealing of the relaxed permutation matrix, where the benefit matrix kron(A, B) is never
+    # formed (see _permutation_2sided_1trans_softassign)
+    array_m = _permutation_2sided_1trans_softassign(
+        new_a, new_b, array_m, epsilon, iteration_soft, iteration_sink, beta_r, beta_f,
+        epsilon_soft, epsilon_sink, k, gamma_scaler, n_stop, adapted, beta_0, iteration_anneal,
+    )
 
     # Compute the error
-    array_m = permutation(np.eye(array_m.shape[0]), array_m)["t"]
+    array_m = _compute_permutation_hungarian(array_m)
     # k-opt heuristic
     if kopt:
-        fun_error = lambda p: compute_error(new_a, new_b, p, p.T)
-        array_m, error = kopt_heuristic_single(fun_error, p0=array_m, k=kopt_k)
+        array_m, error = _refine_quadratic(new_a, new_b, array_m, kopt_method, kopt_k, kopt_iter,
+                                           kopt_time, kopt_seed)
     else:
         error = compute_error(new_a, new_b, array_m, array_m.T)
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=array_m, s=None)
-
-
-def _compute_gamma(array_c, row_num, gamma_scaler):
-    r"""Compute gamma for relaxation."""
-    array_r = np.eye(row_num) - np.ones(row_num) / row_num
-    big_r = np.kron(array_r, array_r)
-    rcr = np.dot(big_r, np.dot(array_c, big_r))
-    gamma = np.max(np.abs(np.linalg.eigvalsh(rcr))) * gamma_scaler
-    return gamma
@@ -23,10 +23,15 @@
 """Symmetric Procrustes Module."""
 
 import numpy as np
-from procrustes.utils import _zero_padding
-from procrustes.utils import compute_error, ProcrustesResult, setup_input_arrays
+from procrustes.utils import _compute_error_analytic, _setup_input_stacks, _zero_padding
+from procrustes.utils import ProcrustesResult, setup_input_arrays
 import scipy
 
+__all__ = [
+    "symmetric",
+    "symmetric_batch",
+]
+
 
 def symmetric(
     a,
@@ -38,7 +43,8 @@ def symmetric(
     unpad_row=False,
     check_finite=True,
     weight=None,
-    lapack_driver="gesvd"
+    lapack_driver="gesvd",
+    return_arrays=True,
 ):
     r"""Perform symmetric Procrustes.
 
@@ -91,6 +97,10 @@ def symmetric(
         Whether to use the more efficient divide-and-conquer approach ('gesdd') or the more robust
         general rectangular approach ('gesvd') to compute the singular-value decomposition with
         `scipy.linalg.svd`.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
 
     Returns
     -------
@@ -179,15 +189,105 @@ def symmetric(
     c = np.dot(np.dot(u.T, new_b), vt.T)
 
     # compute intermediate matrix Y
-    n = new_a.shape[1]
-    y = np.zeros((n, n))
-    for i in range(n):
-        for j in range(n):
-            if s[i] ** 2 + s[j] ** 2 != 0:
-                y[i, j] = (s[i] * c[i, j] + s[j] * c[j, i]) / (s[i] ** 2 + s[j] ** 2)
+    y = _compute_symmetric_y(s, c[:new_a.shape[1]])
 
     # compute optimum symmetric transformation matrix X
     x = np.dot(np.dot(vt.T, y), vt)
-    error = compute_error(new_a, new_b, x)
+    # compute one-sided error, i.e. U.T (A X - B) V = [diag(s) Y; 0] - C
+    n = new_a.shape[1]
+    error = np.linalg.norm(s[:, np.newaxis] * y - c[:n]) ** 2 + np.linalg.norm(c[n:]) ** 2
+    error = _compute_error_analytic(error, new_a, new_b, x)
 
+    if not return_arrays:
+        new_a, new_b = None, None
     return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=x, s=None)
+
+
+def symmetric_batch(
+    a,
+    b,
+    translate=False,
+    scale=False,
+    check_finite=True,
+    weight=None,
+    return_arrays=True,
+):
+    r"""Perform symmetric Procrustes on a stack of matrix pairs.
+
+    Given stacks of matrices :math:`\mathbf{A}^{(i)}_{m \times n}` and reference matrices
+    :math:`\mathbf{B}^{(i)}_{m \times n}` with :math:`i=1,\dots,k`, find the symmetric
+    transformation matrices :math:`\mathbf{X}^{(i)}_{n \times n}` that make each
+    :math:`\mathbf{A}^{(i)}\mathbf{X}^{(i)}` as close as possible to :math:`\mathbf{B}^{(i)}`.
+    This is equivalent to calling :func:`symmetric` on each pair, but all pairs are solved at
+    once with batched (stacked) singular value decompositions and matrix products, which is much
+    faster for many small problems.
+
+    Because all matrices in a stack share the same shape, no unpadding is performed; if
+    :math:`m < n`, the matrices are padded with zeros to be square. In preparing the
+    :math:`\mathbf{A}` and :math:`\mathbf{B}` stacks, the (optional) order of operations is:
+    **1)** translate each matrix to the origin, **2)** weight entries of each matrix, **3)** scale
+    each matrix to have unit norm.
+
+    Parameters
+    ----------
+    a : ndarray
+        The 3D-array :math:`\mathbf{A}_{k \times m \times n}` stacking the matrices which are
+        going to be transformed.
+    b : ndarray
+        The 3D-array :math:`\mathbf{B}_{k \times m \times n}` stacking the reference matrices.
+    translate : bool, optional
+        If True, each matrix is centered at origin (columns of the matrices will have mean zero).
+    scale : bool, optional
+        If True, each matrix is normalized with respect to the Frobenius norm.
+    check_finite : bool, optional
+        If True, convert the input to an array, checking for NaNs or Infs.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row, shared by all matrices in the stacks.
+    return_arrays : bool, optional
+        If False, the processed arrays are not kept in the result, i.e., ``new_a`` and ``new_b``
+        are None, so that the result only holds the transformation(s) and error. This keeps
+        results small, e.g., when many of them are stored or sent between processes.
+
+    Returns
+    -------
+    res : ProcrustesResult
+        The Procrustes result represented as a class:`utils.ProcrustesResult` object, in which
+        ``t`` is the :math:`k \times n \times n` stack of symmetric transformations and ``error``
+        is the 1D-array of the :math:`k` Procrustes errors.
+
+    """
+    # check inputs
+    new_a, new_b = _setup_input_stacks(a, b, translate, scale, check_finite, weight)
+
+    # if number of rows is less than column, the arrays are made square
+    k, m, n = new_a.shape
+    if m < n:
+        new_a = np.concatenate((new_a, np.zeros((k, n - m, n))), axis=1)
+        new_b = np.concatenate((new_b, np.zeros((k, n - m, n))), axis=1)
+
+    # compute SVD of each A & matrix C
+    u, s, vt = np.linalg.svd(new_a)
+    c = np.matmul(np.matmul(np.swapaxes(u, 1, 2), new_b), np.swapaxes(vt, 1, 2))
+
+    # compute intermediate matrices Y & optimum symmetric transformation matrices X
+    y = _compute_symmetric_y(s, c[:, :n, :])
+    x = np.matmul(np.matmul(np.swapaxes(vt, 1, 2), y), vt)
+    # compute one-sided errors from the singular values & matrices C and Y
+    diff = s[:, :, np.newaxis] * y - c[:, :n, :]
+    error = np.einsum("kij,kij->k", diff, diff) + np.einsum("kij,kij->k", c[:, n:], c[:, n:])
+    error = _compute_error_analytic(error, new_a, new_b, x)
+
+    if not return_arrays:
+        new_a, new_b = None, None
+    return ProcrustesResult(error=error, new_a=new_a, new_b=new_b, t=x, s=None)
+
+
+def _compute_symmetric_y(s, c):
+    r"""Compute the intermediate symmetric matrix Y (or a stack of them) from singular values."""
+    s_i, s_j = s[..., :, np.newaxis], s[..., np.newaxis, :]
+    denom = s_i ** 2 + s_j ** 2
+    numer = s_i * c + s_j * np.swapaxes(c, -1, -2)
+    # elements with zero denominator (i and j beyond the rank of A) are set to zero
+    y = np.zeros(numer.shape)
+    np.divide(numer, denom, out=y, where=denom != 0)
+    return y
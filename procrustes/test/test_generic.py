@@ -24,7 +24,7 @@
 
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises
-from procrustes.generic import generic
+from procrustes.generic import generic, generic_batch, generic_stream
 import pytest
 
 
@@ -135,3 +135,31 @@ def test_generic_rectangular_translate_scale(m, n):
     centered_b = array_b - np.mean(array_b, axis=0)
     assert_almost_equal(res.new_a, centered_a / np.linalg.norm(centered_a), decimal=6)
     assert_almost_equal(res.new_b, centered_b / np.linalg.norm(centered_b), decimal=6)
+
+
+@pytest.mark.parametrize("k, m, n", np.random.randint(2, 20, (3, 3)))
+def test_generic_batch_matches_loop(k, m, n):
+    r"""Test batched generic Procrustes against one-by-one generic Procrustes."""
+    array_a = np.random.uniform(-4.0, 4.0, (k, m, n))
+    array_b = np.random.uniform(-4.0, 4.0, (k, m, n))
+    res = generic_batch(array_a, array_b, translate=True)
+    assert res.t.shape == (k, n, n)
+    for index in range(k):
+        expected = generic(array_a[index], array_b[index], translate=True)
+        assert_almost_equal(res.error[index], expected.error, decimal=6)
+        if m > n:
+            assert_almost_equal(res.t[index], expected.t, decimal=6)
+
+
+@pytest.mark.parametrize("m, n, nchunk", np.random.randint(2, 20, (3, 3)))
+def test_generic_stream_matches_arrays(m, n, nchunk):
+    r"""Test generic Procrustes of row chunks against generic Procrustes of whole arrays."""
+    array_a = np.random.uniform(-4.0, 4.0, (10 * m, n))
+    array_b = np.random.uniform(-4.0, 4.0, (10 * m, n))
+    weight = np.random.uniform(0.5, 2.0, 10 * m)
+    chunks = zip(np.array_split(array_a, nchunk), np.array_split(array_b, nchunk),
+                 np.array_split(weight, nchunk))
+    res = generic_stream(chunks)
+    expected = generic(array_a, array_b, weight=weight)
+    assert_almost_equal(res.t, expected.t, decimal=6)
+    assert_almost_equal(res.error, expected.error, decimal=6)
@@ -23,8 +23,11 @@
 """Test Module for Kopt."""
 
 import numpy as np
-from numpy.testing import assert_equal, assert_raises
-from procrustes.kopt import kopt_heuristic_double, kopt_heuristic_single
+from numpy.testing import assert_almost_equal, assert_equal, assert_raises
+from procrustes.kopt import (_compute_delta_quadratic, _compute_delta_swaps, _update_delta_swaps,
+                             kopt_heuristic_double, kopt_heuristic_quadratic,
+                             kopt_heuristic_single, ObjectiveCache,
+                             simulated_annealing_quadratic, tabu_search_quadratic)
 from procrustes.utils import compute_error
 import pytest
 
@@ -91,6 +94,35 @@ def test_kopt_heuristic_single_all_permutations(m):
     assert_equal(error, 0.0)
 
 
+@pytest.mark.parametrize("m", np.random.randint(5, 10, 3))
+def test_kopt_heuristic_single_strategy(m):
+    r"""Test k-opt heuristic single search algorithm with first/best strategy & don't-look bits."""
+    a = np.random.uniform(-10.0, 10.0, (m, m))
+    p = np.random.permutation(np.eye(m))
+    b = np.linalg.multi_dot([p.T, a, p])
+    # each 2- & 3-fold column-permutation is tried once, i.e., 1 & 2 per pair & triple of columns
+    evaluations = []
+
+    def fun_count(x):
+        evaluations.append(x)
+        return compute_error(a, b, x, x.T)
+
+    kopt_heuristic_single(fun_count, np.eye(m), k=3, tol=-1.0)
+    n_moves = m * (m - 1) // 2 + m * (m - 1) * (m - 2) // 3
+    assert len(evaluations) % n_moves == 1
+    fun = lambda x: compute_error(a, b, x, x.T)
+    for strategy in ["best", "first"]:
+        perm, error = kopt_heuristic_single(fun, np.eye(m), k=m, strategy=strategy)
+        assert_equal(perm, p)
+        assert_equal(error, 0.0)
+        # with don't-look bits, the search is not worse than the initial guess
+        perm, error = kopt_heuristic_single(fun, np.eye(m), k=2, strategy=strategy,
+                                            dont_look=True)
+        assert_almost_equal(error, fun(perm), decimal=8)
+        assert error <= fun(np.eye(m))
+    assert_raises(ValueError, kopt_heuristic_single, fun, np.eye(m), 2, 1.0e-8, "worst")
+
+
 def test_kopt_heuristic_double_raises():
     r"""Test k-opt heuristic double search algorithm raises."""
     # check raises for k
@@ -166,3 +198,191 @@ def test_kopt_heuristic_double_all_permutations(m, n):
     assert_equal(perm1, p1)
     assert_equal(perm2, p2)
     assert_equal(error, 0.0)
+
+
+def test_kopt_heuristic_quadratic_raises():
+    r"""Test k-opt heuristic quadratic search algorithm raises."""
+    a = np.random.uniform(-2.0, 2.0, (4, 4))
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a, np.eye(4), 1)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a, np.eye(4), 5)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a[:3], np.eye(4), 2)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a, np.eye(3), 2)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a, np.ones((4, 4)), 2)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, a, np.eye(4) + 0.1, 2)
+
+
+@pytest.mark.parametrize("m", np.random.randint(4, 10, 3))
+def test_kopt_heuristic_quadratic_delta(m):
+    r"""Test the changes of the quadratic objective against evaluating the objective function."""
+    c, b = np.random.uniform(-10.0, 10.0, (2, m, m))
+    fun = lambda index: np.linalg.norm(c[np.ix_(index, index)] - b) ** 2
+    delta = _compute_delta_swaps(c, b)
+    for row in range(m):
+        for col in range(m):
+            index = np.arange(m)
+            index[[row, col]] = index[[col, row]]
+            assert_almost_equal(delta[row, col], fun(index) - fun(np.arange(m)), decimal=8)
+    # random 3-fold permutation
+    comb = np.sort(np.random.choice(m, 3, replace=False))
+    perm = comb[[1, 2, 0]]
+    index = np.arange(m)
+    index[comb] = perm
+    assert_almost_equal(_compute_delta_quadratic(c, b, comb, perm),
+                        fun(index) - fun(np.arange(m)), decimal=8)
+    # changes of the swaps updated after a random swap
+    row, col = np.random.choice(m, 2, replace=False)
+    c[[row, col]] = c[[col, row]]
+    c[:, [row, col]] = c[:, [col, row]]
+    _update_delta_swaps(delta, c, b, row, col)
+    assert_almost_equal(delta, _compute_delta_swaps(c, b), decimal=8)
+    assert_almost_equal(_compute_delta_swaps(c, b, [col, row]), delta[[col, row]], decimal=8)
+
+
+@pytest.mark.parametrize("m", np.random.randint(5, 9, 3))
+def test_kopt_heuristic_quadratic_local_optimum(m):
+    r"""Test k-opt heuristic quadratic search algorithm against the single search algorithm."""
+    # for B = P^T A P, the permutation is found
+    a = np.random.uniform(-10.0, 10.0, (m, m))
+    p = np.random.permutation(np.eye(m))
+    b = np.linalg.multi_dot([p.T, a, p])
+    perm, error = kopt_heuristic_quadratic(a, b, np.eye(m), k=m)
+    assert_equal(perm, p)
+    assert_almost_equal(error, 0.0, decimal=8)
+    # for random B, the solution is a local optimum of the single search algorithm
+    b = np.random.uniform(-10.0, 10.0, (m, m))
+    fun = lambda x: compute_error(a, b, x, x.T)
+    perm, error = kopt_heuristic_quadratic(a, b, np.eye(m), k=3)
+    assert_almost_equal(error, fun(perm), decimal=8)
+    perm_single, error_single = kopt_heuristic_single(fun, perm, k=3)
+    assert_equal(perm_single, perm)
+    assert_almost_equal(error_single, error, decimal=8)
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(3, 6, (3, 2)))
+def test_kopt_heuristic_double_alternating(m, n):
+    r"""Test k-opt heuristic double search algorithm with alternating mode."""
+    # create a random matrix A and random permutations of identity matrices
+    a = np.random.uniform(-10.0, 10.0, (m, n))
+    p1 = np.random.permutation(np.eye(m))
+    p2 = np.random.permutation(np.eye(n))
+    b = np.linalg.multi_dot([p1.T, a, p2])
+    fun = lambda x, y: compute_error(a, b, y, x)
+    # the alternating search is not worse than the initial guess & each matrix is locally optimal
+    perm1, perm2, error = kopt_heuristic_double(fun, np.eye(m), np.eye(n), k=2,
+                                                mode="alternating")
+    assert error <= fun(np.eye(m), np.eye(n))
+    assert_almost_equal(error, fun(perm1, perm2), decimal=8)
+    assert_almost_equal(kopt_heuristic_single(lambda x: fun(perm1, x), perm2, k=2)[1], error,
+                        decimal=8)
+    assert_almost_equal(kopt_heuristic_single(lambda x: fun(x.T, perm2), perm1.T, k=2)[1], error,
+                        decimal=8)
+    # the joint search (polish) with k=max(m, n) is exhaustive
+    perm1, perm2, error = kopt_heuristic_double(fun, np.eye(m), np.eye(n), k=max(m, n),
+                                                mode="alternating", polish=True)
+    assert_almost_equal(error, 0.0, decimal=8)
+    assert_raises(ValueError, kopt_heuristic_double, fun, np.eye(m), np.eye(n), 2, 1.0e-8, "none")
+
+
+@pytest.mark.parametrize("m", np.random.randint(6, 10, 2))
+def test_kopt_heuristic_quadratic_n_jobs(m):
+    r"""Test k-opt heuristic quadratic search algorithm with a pool of processes."""
+    a, b = np.random.uniform(-10.0, 10.0, (2, m, m))
+    for strategy in ["first", "best"]:
+        perm, error = kopt_heuristic_quadratic(a, b, np.eye(m), k=3, strategy=strategy)
+        # the result does not depend on the number of processes
+        perm_pool, error_pool = kopt_heuristic_quadratic(a, b, np.eye(m), k=3, strategy=strategy,
+                                                         n_jobs=2)
+        assert_equal(perm_pool, perm)
+        assert_equal(error_pool, error)
+    assert_raises(ValueError, kopt_heuristic_quadratic, a, b, np.eye(m), 3, 1.0e-8, "worst")
+
+
+def test_tabu_search_quadratic_raises():
+    r"""Test tabu search & simulated annealing raise errors for invalid input."""
+    a = np.random.uniform(-2.0, 2.0, (4, 4))
+    for search in [tabu_search_quadratic, simulated_annealing_quadratic]:
+        assert_raises(ValueError, search, a, a[:3], np.eye(4))
+        assert_raises(ValueError, search, a, a, np.eye(3))
+        assert_raises(ValueError, search, a, a, np.eye(4) + 0.1)
+
+
+@pytest.mark.parametrize("m", np.random.randint(5, 9, 3))
+def test_tabu_search_quadratic(m):
+    r"""Test tabu search of the quadratic objective."""
+    # for B = P^T A P, the permutation is found
+    a = np.random.uniform(-10.0, 10.0, (m, m))
+    p = np.random.permutation(np.eye(m))
+    b = np.linalg.multi_dot([p.T, a, p])
+    perm, error = tabu_search_quadratic(a, b, np.eye(m), max_iter=50 * m, seed=42)
+    assert_equal(perm, p)
+    assert_almost_equal(error, 0.0, decimal=8)
+    # for random B, the search is not worse than the k-opt heuristic it starts from
+    b = np.random.uniform(-10.0, 10.0, (m, m))
+    p0, error_kopt = kopt_heuristic_quadratic(a, b, np.eye(m), k=2)
+    perm, error = tabu_search_quadratic(a, b, p0, seed=42)
+    assert error <= error_kopt + 1.0e-8
+    assert_almost_equal(error, compute_error(a, b, perm, perm.T), decimal=8)
+    # the same seed gives the same result
+    perm_seed, error_seed = tabu_search_quadratic(a, b, p0, seed=42)
+    assert_equal(perm_seed, perm)
+    assert_equal(error_seed, error)
+
+
+@pytest.mark.parametrize("m", np.random.randint(5, 9, 3))
+def test_simulated_annealing_quadratic(m):
+    r"""Test simulated annealing of the quadratic objective."""
+    a, b = np.random.uniform(-10.0, 10.0, (2, m, m))
+    p0 = np.random.permutation(np.eye(m))
+    perm, error = simulated_annealing_quadratic(a, b, p0, seed=42)
+    # the best permutation found is not worse than the initial guess
+    assert error <= compute_error(a, b, p0, p0.T) + 1.0e-8
+    assert_almost_equal(error, compute_error(a, b, perm, perm.T), decimal=8)
+    assert_equal(np.sort(np.argmax(perm, axis=0)), np.arange(m))
+    # the same seed gives the same result
+    perm_seed, error_seed = simulated_annealing_quadratic(a, b, p0, seed=42)
+    assert_equal(perm_seed, perm)
+    assert_equal(error_seed, error)
+    # the search stops when the time is over
+    perm, error = simulated_annealing_quadratic(a, b, p0, max_time=0.0, seed=42)
+    assert_equal(perm, p0)
+
+
+def test_objective_cache():
+    r"""Test the cache of the values of an objective function."""
+    calls = []
+    fun = lambda p: calls.append(1) or float(np.argmax(p, axis=0)[0])
+    cache = ObjectiveCache(maxsize=2)
+    cached_fun = cache.wrap(fun)
+    p1, p2, p3 = np.eye(3), np.eye(3)[:, [1, 0, 2]], np.eye(3)[:, [2, 1, 0]]
+    assert_equal([cached_fun(p) for p in [p1, p2, p1, p3, p2]], [0.0, 1.0, 0.0, 2.0, 1.0])
+    # p1 is found in the cache, & p2 is evaluated again as it was the least recently used
+    assert_equal((cache.hits, cache.misses, len(cache), len(calls)), (1, 4, 2, 4))
+    cache.clear()
+    assert_equal((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+    assert_raises(ValueError, ObjectiveCache, 0)
+    assert_raises(ValueError, ObjectiveCache, 1.5)
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(3, 6, (3, 2)))
+def test_kopt_heuristic_cache(m, n):
+    r"""Test k-opt heuristic search algorithms with the cache of the objective function."""
+    a = np.random.uniform(-10.0, 10.0, (m, n))
+    b = np.random.uniform(-10.0, 10.0, (m, n))
+    fun = lambda x, y: compute_error(a, b, y, x)
+    # the results do not change, & each permutation matrix is evaluated once
+    result = kopt_heuristic_double(fun, np.eye(m), np.eye(n), k=2, mode="alternating")
+    cache = ObjectiveCache()
+    result_cache = kopt_heuristic_double(fun, np.eye(m), np.eye(n), k=2, mode="alternating",
+                                         cache=cache)
+    for value, value_cache in zip(result, result_cache):
+        assert_equal(value_cache, value)
+    assert cache.hits > 0 and cache.misses == len(cache)
+    a = np.random.uniform(-10.0, 10.0, (m, m))
+    b = np.random.uniform(-10.0, 10.0, (m, m))
+    fun = lambda x: compute_error(a, b, x, x.T)
+    perm, error = kopt_heuristic_single(fun, np.eye(m), k=2)
+    cache = ObjectiveCache()
+    perm_cache, error_cache = kopt_heuristic_single(fun, np.eye(m), k=2, cache=cache)
+    assert_equal(perm_cache, perm)
+    assert_equal(error_cache, error)
+    assert cache.misses == len(cache)
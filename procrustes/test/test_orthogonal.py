@@ -24,7 +24,8 @@ r"""Testings for orthogonal Procrustes module."""
 
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_equal, assert_raises
-from procrustes.orthogonal import orthogonal, orthogonal_2sided
+from procrustes.orthogonal import (orthogonal, orthogonal_2sided, orthogonal_batch,
+                                   orthogonal_stream)
 import pytest
 from scipy.stats import ortho_group
 
@@ -367,3 +368,56 @@ def test_two_sided_orthogonal_single_transformation_random_orthogonal(n):
     assert_almost_equal(np.dot(result.t, result.t.T), np.eye(n), decimal=8)
     assert_almost_equal(abs(np.linalg.det(result.t)), 1.0, decimal=8)
     assert_almost_equal(result.error, 0, decimal=8)
+
+
+@pytest.mark.parametrize("k, m, n", np.random.randint(2, 20, (3, 3)))
+def test_orthogonal_batch_matches_loop(k, m, n):
+    r"""Test batched orthogonal Procrustes against one-by-one orthogonal Procrustes."""
+    array_a = np.random.uniform(-10.0, 10.0, (k, m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (k, m, n))
+    weight = np.random.uniform(0.5, 2.0, m)
+    for translate, scale in [(False, False), (True, True)]:
+        res = orthogonal_batch(array_a, array_b, translate=translate, scale=scale)
+        assert res.t.shape == (k, n, n)
+        assert res.error.shape == (k,)
+        for index in range(k):
+            expected = orthogonal(array_a[index], array_b[index], translate=translate, scale=scale)
+            assert_almost_equal(res.error[index], expected.error, decimal=6)
+            assert_almost_equal(res.new_a[index], expected.new_a, decimal=6)
+            # check transformation array, only if it is unique
+            if m > n:
+                assert_almost_equal(res.t[index], expected.t, decimal=6)
+    # check weighted stacks
+    res = orthogonal_batch(array_a, array_b, weight=weight)
+    expected = orthogonal(array_a[0], array_b[0], weight=weight)
+    assert_almost_equal(res.error[0], expected.error, decimal=6)
+    # check invalid stacks
+    assert_raises(TypeError, orthogonal_batch, array_a[0], array_b[0])
+    assert_raises(ValueError, orthogonal_batch, array_a, array_b[:, :, :-1])
+
+
+@pytest.mark.parametrize("m, n, nchunk", np.random.randint(2, 50, (3, 3)))
+def test_orthogonal_stream_matches_arrays(m, n, nchunk):
+    r"""Test orthogonal Procrustes of row chunks against orthogonal Procrustes of whole arrays."""
+    # the arrays have more rows than columns, so the transformation is unique
+    array_a = np.random.uniform(-10.0, 10.0, (10 * m + n, n)) + 50.0
+    array_b = np.random.uniform(-10.0, 10.0, (10 * m + n, n))
+    weight = np.random.uniform(0.5, 2.0, 10 * m + n)
+    for translate, scale in [(False, False), (True, False), (True, True)]:
+        chunks = ((a, b, w) for a, b, w in zip(np.array_split(array_a, nchunk),
+                                               np.array_split(array_b, nchunk),
+                                               np.array_split(weight, nchunk)))
+        res = orthogonal_stream(chunks, translate=translate, scale=scale)
+        expected = orthogonal(array_a, array_b, translate=translate, scale=scale, weight=weight)
+        assert_almost_equal(res.t, expected.t, decimal=6)
+        assert_almost_equal(res.error, expected.error, decimal=6)
+        assert res.new_a is None and res.new_b is None
+    # check padding with zero columns (the transformation is not unique, so only check error)
+    array_b = np.random.uniform(-10.0, 10.0, (10 * m + n, n + 2))
+    res = orthogonal_stream(zip(np.array_split(array_a, nchunk), np.array_split(array_b, nchunk)))
+    assert_almost_equal(res.error, orthogonal(array_a, array_b).error, decimal=6)
+    # check invalid chunks
+    assert_raises(ValueError, orthogonal_stream, iter([]))
+    assert_raises(ValueError, orthogonal_stream, [(array_a, array_b)], pad=False)
+    assert_raises(ValueError, orthogonal_stream, [(array_a, array_b[1:])])
+    assert_raises(ValueError, orthogonal_stream, [(array_a, array_b), (array_a[:, 1:], array_b)])
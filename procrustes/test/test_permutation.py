@@ -28,11 +28,17 @@ import itertools
 
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises
+from procrustes.kopt import kopt_heuristic_single, ObjectiveCache
 from procrustes.permutation import (_approx_permutation_2sided_1trans_normal1,
                                     _approx_permutation_2sided_1trans_normal2,
                                     _approx_permutation_2sided_1trans_umeyama,
-                                    permutation, permutation_2sided)
+                                    _compute_eigenvectors_truncated, _symmetrize_matrix,
+                                    permutation, permutation_2sided,
+                                    permutation_2sided_multistart, permutation_batch,
+                                    permutation_stream)
+from procrustes.utils import compute_error
 import pytest
+import scipy.sparse
 
 
 def generate_random_permutation_matrix(n):
@@ -538,10 +544,26 @@ def test_permutation_2sided_2trans_kopt(n):
     p1 = generate_random_permutation_matrix(n)
     p2 = generate_random_permutation_matrix(n)
     b = p2.dot(a.dot(p1))
-    result = permutation_2sided(b, a, single=False, method="k-opt", options={"k": n})
-    assert_almost_equal(result.s, p2, decimal=6)
+    # the joint search (polish) with k=n is exhaustive
+    result = permutation_2sided(b, a, single=False, method="k-opt",
+                                options={"k": n, "polish": True})
+    assert_almost_equal(result.s, p2.T, decimal=6)
     assert_almost_equal(result.t, p1.T, decimal=6)
     assert_almost_equal(result.error, 0, decimal=6)
+    # the alternating search is not worse than the initial guess
+    result = permutation_2sided(b, a, single=False, method="k-opt", options={"k": n})
+    assert_almost_equal(result.error, compute_error(b, a, result.t, result.s), decimal=6)
+    assert result.error <= compute_error(b, a, np.eye(n), np.eye(n)) + 1.0e-6
+    # the result is a local optimum, so starting from it gives the same result
+    result_guess = permutation_2sided(b, a, single=False, method="k-opt", options={"k": n},
+                                      guess_p1=result.s, guess_p2=result.t)
+    assert_almost_equal(result_guess.error, result.error, decimal=6)
+    # the errors of the permutations tried are cached
+    cache = ObjectiveCache()
+    result_cache = permutation_2sided(b, a, single=False, method="k-opt",
+                                      options={"k": n, "cache": cache})
+    assert_almost_equal(result_cache.error, result.error, decimal=6)
+    assert cache.hits > 0 and cache.misses == len(cache)
 
 
 def test_permutation_2sided_2trans_flipflop_rectangular():
@@ -718,3 +740,325 @@ def test_permutation_2sided_invalid_input_kopt_single_transform():
 #                      [0, 0, 0, 0, 0, 1, 0],
 #                      [0, 0, 0, 0, 0, 0, 1]])
 #     assert_almost_equal(res["t"], perm)
+
+
+@pytest.mark.parametrize("k, m, n", np.random.randint(2, 20, (3, 3)))
+def test_permutation_batch_matches_loop(k, m, n):
+    r"""Test batched permutation Procrustes against one-by-one permutation Procrustes."""
+    array_a = np.random.uniform(-10.0, 10.0, (k, m, n))
+    perms = np.array([generate_random_permutation_matrix(n) for _ in range(k)])
+    array_b = np.matmul(array_a, perms)
+    res = permutation_batch(array_a, array_b, n_jobs=2)
+    assert_almost_equal(res.error, np.zeros(k), decimal=6)
+    if m >= n:
+        assert_almost_equal(res.t, perms, decimal=6)
+    for index in range(k):
+        expected = permutation(array_a[index], array_b[index])
+        assert_almost_equal(res.error[index], expected.error, decimal=6)
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(2, 50, (5, 2)))
+@pytest.mark.parametrize("shift", [0.0, 0.5])
+def test_permutation_sparse(m, n, shift):
+    r"""Test permutation Procrustes of sparse arrays against dense arrays."""
+    array_a = scipy.sparse.random(m, n, density=0.2, format="csr")
+    # make (some) elements of the sparse cost matrix negative
+    array_a.data -= shift
+    perm = generate_random_permutation_matrix(n)
+    # exact permutation
+    res = permutation(array_a, array_a @ perm, scale=True)
+    assert scipy.sparse.issparse(res.t) and scipy.sparse.issparse(res.new_a)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+    assert_almost_equal((res.new_a @ res.t - res.new_b).toarray(), 0.0, decimal=6)
+    # random sparse matrices, with zero padding of columns
+    array_b = scipy.sparse.random(m, n + 1, density=0.2, format="csc")
+    weight = np.random.uniform(0.5, 1.0, m)
+    res = permutation(array_a, array_b, unpad_col=True, weight=weight)
+    expected = permutation(array_a.toarray(), array_b.toarray(), unpad_col=True, weight=weight)
+    assert_almost_equal(res.error, expected.error, decimal=6)
+    assert_almost_equal(res.t.sum(axis=0), 1.0)
+    assert_almost_equal(res.t.sum(axis=1), 1.0)
+    assert_almost_equal(res.new_a.toarray(), expected.new_a, decimal=8)
+    assert_raises(ValueError, permutation, array_a, array_b, translate=True)
+
+
+@pytest.mark.parametrize("m, n, nchunk", np.random.randint(2, 20, (3, 3)))
+def test_permutation_stream_matches_arrays(m, n, nchunk):
+    r"""Test permutation Procrustes of row chunks against permutation Procrustes of whole arrays."""
+    array_a = np.random.uniform(-10.0, 10.0, (5 * m, n))
+    perm = generate_random_permutation_matrix(n)
+    array_b = np.dot(array_a, perm) + 3.0
+    chunks = zip(np.array_split(array_a, nchunk), np.array_split(array_b, nchunk))
+    res = permutation_stream(chunks, translate=True)
+    assert_almost_equal(res.t, perm, decimal=6)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(2, 20, (3, 2)))
+def test_permutation_index_vectors(m, n):
+    r"""Test the index vectors representing the permutation matrices of the results."""
+    array_a = np.random.uniform(-10.0, 10.0, (m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (m, n))
+    # one-sided permutation Procrustes, A P = A[:, index]
+    res = permutation(array_a, array_b)
+    assert_almost_equal(res.new_a[:, res.t_index], np.dot(res.new_a, res.t), decimal=8)
+    res_batch = permutation_batch(np.array([array_a, array_b]), np.array([array_b, array_a]))
+    assert_almost_equal(res_batch.t_index[0], res.t_index)
+    res_sparse = permutation(scipy.sparse.csr_matrix(array_a), array_b)
+    assert_almost_equal(res_sparse.t_index, res.t_index)
+    # two-sided permutation Procrustes with one transformation, P.T A P = A[index][:, index]
+    array_a = np.random.uniform(-10.0, 10.0, (n, n))
+    perm = generate_random_permutation_matrix(n)
+    array_b = np.dot(perm.T, np.dot(array_a, perm))
+    for method in ["approx-normal1", "approx-umeyama", "k-opt"]:
+        res = permutation_2sided(array_a, array_b, method=method, options={"k": 2})
+        assert_almost_equal(res.new_a[np.ix_(res.s_index, res.t_index)],
+                            np.linalg.multi_dot([res.s, res.new_a, res.t]), decimal=8)
+    # two-sided permutation Procrustes with two transformations, S A T = A[s_index][:, t_index]
+    array_a = np.random.uniform(-10.0, 10.0, (min(m, 5), min(n, 5)))
+    array_b = np.random.uniform(-10.0, 10.0, (min(m, 5), min(n, 5)))
+    for method in ["flip-flop", "k-opt"]:
+        res = permutation_2sided(array_a, array_b, single=False, method=method, options={"k": 2})
+        assert_almost_equal(res.new_a[np.ix_(res.s_index, res.t_index)],
+                            np.linalg.multi_dot([res.s, res.new_a, res.t]), decimal=8)
+        # both the matrices & the index vectors reproduce the error
+        assert_almost_equal(res.error, compute_error(res.new_a, res.new_b, res.t, res.s),
+                            decimal=8)
+        assert_almost_equal(res.error, np.linalg.norm(
+            res.new_a[np.ix_(res.s_index, res.t_index)] - res.new_b) ** 2, decimal=8)
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(3, 30, (5, 2)))
+def test_permutation_2sided_2trans_flipflop_local_optimum(m, n, capsys):
+    r"""Test that flip-flop stops at a locally-optimal pair of permutations."""
+    array_a = np.random.uniform(-10.0, 10.0, (m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (m, n))
+    res = permutation_2sided(array_a, array_b, single=False, method="flip-flop")
+    # iterations stop once a pair of permutations is repeated, not at maximum iterations
+    assert "Maximum iterations" not in capsys.readouterr().out
+    assert_almost_equal(res.error, compute_error(array_a, array_b, res.t, res.s), decimal=6)
+    # neither of the permutations can be improved by one-sided permutation Procrustes
+    res_t = permutation(np.dot(res.s, array_a), array_b)
+    res_s = permutation(np.dot(array_a, res.t).T, array_b.T)
+    assert res_t.error >= res.error - 1.0e-6
+    assert res_s.error >= res.error - 1.0e-6
+
+
+@pytest.mark.parametrize("n", np.random.randint(4, 10, (2,)))
+def test_permutation_2sided_multistart(n):
+    r"""Test multi-start two-sided permutation Procrustes with & without a process pool."""
+    array_a = np.random.uniform(-10.0, 10.0, (n, n))
+    perm = generate_random_permutation_matrix(n)
+    array_b = np.dot(perm.T, np.dot(array_a, perm))
+    res = permutation_2sided_multistart(array_a, array_b, n_starts=7, n_jobs=2, seed=42,
+                                        options={"k": 2})
+    assert_almost_equal(res.error, 0.0, decimal=6)
+    assert_almost_equal(np.linalg.multi_dot([res.s, res.new_a, res.t]), res.new_b, decimal=6)
+    assert [start["guess"] for start in res.starts] == [
+        "identity", "approx-umeyama", "approx-umeyama-svd", "approx-normal1", "approx-normal2",
+        "random", "random"]
+    assert res.error == min(start["error"] for start in res.starts)
+    # the starts are seeded, so solving them in the calling process gives the same result
+    expected = permutation_2sided_multistart(array_a, array_b, n_starts=7, n_jobs=1, seed=42,
+                                             options={"k": 2})
+    assert_almost_equal([start["error"] for start in res.starts],
+                        [start["error"] for start in expected.starts])
+    assert_almost_equal(res.t_index, expected.t_index)
+    # the nmf local search starts inside the Birkhoff polytope (not from the guess itself)
+    array_b = np.random.uniform(-10.0, 10.0, (n, n))
+    res = permutation_2sided_multistart(array_a, array_b, method="nmf", n_starts=3, n_jobs=1,
+                                        seed=42)
+    assert_almost_equal(res.error, compute_error(res.new_a, res.new_b, res.t, res.s), decimal=6)
+    assert res.error == min(start["error"] for start in res.starts)
+    error_identity = compute_error(array_a, array_b, np.eye(n), np.eye(n))
+    assert abs(res.starts[0]["error"] - error_identity) > 1.0e-6
+    # two transformations
+    array_b = np.random.uniform(-10.0, 10.0, (n, n - 1))
+    for method in ["flip-flop", "k-opt"]:
+        res = permutation_2sided_multistart(array_a[:, :-1], array_b, single=False,
+                                            method=method, n_starts=3, n_jobs=2, seed=1,
+                                            options={"k": 2})
+        assert_almost_equal(res.error, compute_error(res.new_a, res.new_b, res.t, res.s),
+                            decimal=6)
+        assert_almost_equal(res.error, np.linalg.norm(
+            res.new_a[np.ix_(res.s_index, res.t_index)] - res.new_b) ** 2, decimal=6)
+        assert len(res.starts) == 3
+    # check invalid arguments
+    assert_raises(ValueError, permutation_2sided_multistart, array_a, array_b, method="nmf",
+                  single=False)
+    assert_raises(ValueError, permutation_2sided_multistart, array_a, array_a, n_starts=0)
+    assert_raises(ValueError, permutation_2sided_multistart, scipy.sparse.csr_matrix(array_a),
+                  array_a, n_starts=2)
+
+
+@pytest.mark.parametrize("n", np.random.randint(10, 50, (3,)))
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_permutation_2sided_1trans_nmf_float32_check_every(n, symmetric):
+    r"""Test nmf method in single precision, checking convergence every few iterations."""
+    a = np.random.uniform(-10.0, 10.0, (n, n))
+    if symmetric:
+        a = a + a.T
+    p = generate_random_permutation_matrix(n)
+    b = np.dot(p.T, np.dot(a, p))
+    # start inside the Birkhoff polytope (a permutation matrix is a fixed point of the nmf
+    # updates), from the noisy uniform matrix slightly pulled towards the solution
+    guess = 0.1 * p + 0.9 / n + np.random.uniform(0.0, 0.01 / n, (n, n))
+    res = permutation_2sided(a, b, method="nmf", guess_p2=guess)
+    res32 = permutation_2sided(a, b, method="nmf", guess_p2=guess,
+                               options={"dtype": np.float32, "check_every": 5})
+    assert_almost_equal(res.t, p)
+    assert_almost_equal(res32.t, res.t)
+    assert_almost_equal(res32.error, res.error, decimal=6)
+    assert_raises(ValueError, permutation_2sided, a, b, method="nmf", options={"dtype": int})
+
+
+@pytest.mark.parametrize("n", np.random.randint(3, 8, (5,)))
+def test_permutation_2sided_1trans_softassign(n):
+    r"""Test 2sided-perm with single transform using softassign method."""
+    a = np.random.uniform(-10.0, 10.0, (n, n))
+    a = a + a.T
+    p = generate_random_permutation_matrix(n)
+    b = np.dot(p.T, np.dot(a, p))
+    res = permutation_2sided(a, b, method="soft-assign", options={"tol": 0.05, "maxiter": 50})
+    assert_almost_equal(res.t, p, decimal=6)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+    # start from a guess
+    res = permutation_2sided(a, b, method="soft-assign", guess_p2=p, options={"tol": 0.05})
+    assert_almost_equal(res.t, p, decimal=6)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+
+
+@pytest.mark.parametrize("n", np.random.randint(10, 60, (4,)))
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_permutation_2sided_1trans_faq(n, symmetric):
+    r"""Test 2sided-perm with single transform using Frank-Wolfe (FAQ) method."""
+    a = np.random.uniform(-10.0, 10.0, (n, n))
+    if symmetric:
+        a = a + a.T
+    p = generate_random_permutation_matrix(n)
+    b = np.dot(p.T, np.dot(a, p))
+    res = permutation_2sided(a, b, method="faq")
+    assert_almost_equal(res.t, p, decimal=6)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+    # warm start from the solution
+    res = permutation_2sided(a, b, method="faq", guess_p2=p, options={"maxiter": 1})
+    assert_almost_equal(res.t, p, decimal=6)
+    # noisy graphs, where the error cannot be larger than that of the identity guess
+    b += np.random.uniform(-1.0, 1.0, (n, n))
+    res = permutation_2sided(a, b, method="faq", guess_p2=np.eye(n))
+    assert res.error <= compute_error(a, b, np.eye(n), np.eye(n)) + 1.0e-6
+
+
+@pytest.mark.parametrize("n, n_eig", [(10, 1), (20, 5), (30, 29)])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_permutation_2sided_1trans_umeyama_truncated(n, n_eig, symmetric):
+    r"""Test truncated umeyama against the full eigendecomposition."""
+    a = np.random.uniform(-10.0, 10.0, (n, n))
+    if symmetric:
+        a = a + a.T
+    # compare to the eigenvectors of the largest absolute eigenvalues (sorted by eigenvalue)
+    eigval, eigvec = np.linalg.eigh(a if symmetric else _symmetrize_matrix(a))
+    select = np.sort(np.argsort(np.abs(eigval))[-n_eig:])
+    array_u = _compute_eigenvectors_truncated(a, n_eig, symmetric)
+    # for non-symmetric A, each eigenvector appears twice
+    if not symmetric:
+        assert_almost_equal(array_u[:, 1::2], np.abs(eigvec[:, select]), decimal=6)
+        array_u = array_u[:, ::2]
+    assert_almost_equal(array_u, np.abs(eigvec[:, select]), decimal=6)
+    assert_raises(ValueError, _compute_eigenvectors_truncated, a, n, symmetric)
+    # permuted sparse graph
+    a = np.random.uniform(0.0, 1.0, (5 * n, 5 * n)) * (np.random.rand(5 * n, 5 * n) < 0.2)
+    if symmetric:
+        a = a + a.T
+    p = generate_random_permutation_matrix(5 * n)
+    b = np.dot(p.T, np.dot(a, p))
+    if n_eig > 1:
+        res = permutation_2sided(a, b, method="approx-umeyama", options={"n_eig": n_eig})
+        assert_almost_equal(res.t, p, decimal=6)
+        assert_almost_equal(res.error, 0.0, decimal=6)
+
+
+@pytest.mark.parametrize("n", np.random.randint(20, 60, (3,)))
+def test_permutation_2sided_1trans_normal_truncated(n):
+    r"""Test truncated normal1 & normal2 signatures against the full signatures."""
+    a = np.random.uniform(-10.0, 10.0, (n, n))
+    # by default, 14 off-diagonal elements of each row are kept
+    sign1 = _approx_permutation_2sided_1trans_normal1(a)
+    full1 = _approx_permutation_2sided_1trans_normal1(a, n_off=n - 1)
+    assert sign1.shape == (15, n) and full1.shape == (n, n)
+    assert_almost_equal(sign1, full1[:15], decimal=8)
+    assert_almost_equal(np.abs(full1[1:]), np.sort(np.abs(full1[1:]), axis=0)[::-1], decimal=8)
+    sign2 = _approx_permutation_2sided_1trans_normal2(a)
+    full2 = _approx_permutation_2sided_1trans_normal2(a, n_off=n - 1)
+    assert sign2.shape == (29, n) and full2.shape == (2 * n - 1, n)
+    assert_almost_equal(sign2, full2[:29], decimal=8)
+    # the truncated signatures still find the permutation of a symmetric matrix
+    a = a + a.T
+    p = generate_random_permutation_matrix(n)
+    b = np.dot(p.T, np.dot(a, p))
+    for method in ["approx-normal1", "approx-normal2"]:
+        res = permutation_2sided(a, b, method=method)
+        assert_almost_equal(res.t, p, decimal=6)
+        assert_almost_equal(res.error, 0.0, decimal=6)
+
+
+@pytest.mark.parametrize("n", np.random.randint(10, 20, (3,)))
+def test_permutation_2sided_sparse(n):
+    r"""Test 2-sided permutation Procrustes of sparse arrays against dense arrays."""
+    # sparse symmetric & non-symmetric matrices with negative elements (so they are shifted)
+    array_a = scipy.sparse.random(n, n, density=0.2, format="csr") - 0.5 * scipy.sparse.eye(n)
+    p = generate_random_permutation_matrix(n)
+    for a in [array_a + array_a.T, array_a]:
+        b = scipy.sparse.csr_matrix(np.dot(p.T, np.dot(a.toarray(), p)))
+        # (the permutations may differ, as sparse matrices have many equivalent elements)
+        for method, options in [("nmf", None), ("approx-umeyama", None),
+                                ("approx-umeyama", {"n_eig": 5})]:
+            res = permutation_2sided(a, b, method=method, options=options)
+            res_dense = permutation_2sided(a.toarray(), b.toarray(), method=method,
+                                           options=options)
+            assert scipy.sparse.issparse(res.t) and scipy.sparse.issparse(res.new_a)
+            t, s = res.t.toarray(), res.s.toarray()
+            assert_almost_equal(s, t.T, decimal=6)
+            assert_almost_equal(res.error, compute_error(a.toarray(), b.toarray(), t, s),
+                                decimal=6)
+            assert_almost_equal(res.error, res_dense.error, decimal=6)
+        # sparse k-opt uses the generic k-opt heuristic
+        res = permutation_2sided(a, b, method="k-opt", options={"k": 2})
+        fun = lambda x: compute_error(a.toarray(), b.toarray(), x, x.T)
+        _, error = kopt_heuristic_single(fun, np.eye(n), k=2)
+        assert_almost_equal(res.error, fun(res.t.toarray()), decimal=6)
+        assert_almost_equal(res.error, error, decimal=6)
+    # two transformations with k-opt (for smaller matrices, as its search is expensive)
+    a = scipy.sparse.random(5, 5, density=0.6, format="csr")
+    b = scipy.sparse.csr_matrix(np.random.uniform(-1.0, 1.0, (5, 5)))
+    res = permutation_2sided(a, b, single=False, method="k-opt", options={"k": 2})
+    res_dense = permutation_2sided(a.toarray(), b.toarray(), single=False, method="k-opt",
+                                   options={"k": 2})
+    assert_almost_equal(res.t.toarray(), res_dense.t, decimal=6)
+    assert_almost_equal(res.s.toarray(), res_dense.s, decimal=6)
+    assert_almost_equal(res.error, res_dense.error, decimal=6)
+    # methods which are not supported for sparse arrays
+    assert_raises(ValueError, permutation_2sided, a, b, method="faq")
+    assert_raises(ValueError, permutation_2sided, a, b, single=False, method="flip-flop")
+
+
+@pytest.mark.parametrize("n", np.random.randint(6, 10, (3,)))
+def test_permutation_2sided_refine(n):
+    r"""Test 2-sided permutation Procrustes with the permutation refined by a local search."""
+    array_a = np.random.uniform(-10.0, 10.0, (n, n))
+    array_b = np.random.uniform(-10.0, 10.0, (n, n))
+    res = permutation_2sided(array_a, array_b, method="approx-umeyama")
+    for refine in ["k-opt", "tabu", "anneal"]:
+        options = {"refine": refine, "k": 2, "refine_iter": 20 * n, "seed": 42}
+        res_refine = permutation_2sided(array_a, array_b, method="approx-umeyama",
+                                        options=options)
+        # the refined permutation is not worse than the unrefined one
+        assert res_refine.error <= res.error + 1.0e-8
+        assert_almost_equal(res_refine.s, res_refine.t.T, decimal=8)
+        assert_almost_equal(res_refine.error, compute_error(array_a, array_b, res_refine.t,
+                                                            res_refine.s), decimal=8)
+    assert_raises(ValueError, permutation_2sided, array_a, array_b, options={"refine": "none"})
+    assert_raises(ValueError, permutation_2sided, array_a, array_b, single=False,
+                  method="flip-flop", options={"refine": "tabu"})
+    assert_raises(ValueError, permutation_2sided, scipy.sparse.csr_matrix(array_a),
+                  scipy.sparse.csr_matrix(array_b), options={"refine": "tabu"})
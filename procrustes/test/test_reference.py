@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# The Procrustes library provides a set of functions for transforming
+# a matrix to make it as similar as possible to a target matrix.
+#
+# Copyright (C) 2017-2021 The QC-Devs Community
+#
+# This file is part of Procrustes.
+#
+# Procrustes is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# Procrustes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Testing for the prepared reference module."""
+
+import numpy as np
+from numpy.testing import assert_almost_equal, assert_raises
+from procrustes import orthogonal, orthogonal_2sided, permutation, Reference, rotational
+import pytest
+
+
+@pytest.mark.parametrize("m, n", np.random.randint(2, 10, (10, 2)))
+@pytest.mark.parametrize("translate, scale", [(False, False), (True, True)])
+def test_reference_one_sided(m, n, translate, scale):
+    r"""Test one-sided Procrustes of several matrices against a prepared reference."""
+    array_b = np.random.uniform(-10.0, 10.0, (m, n))
+    weight = np.random.uniform(0.5, 1.0, m)
+    ref = Reference(array_b, translate=translate, scale=scale, weight=weight)
+    for _ in range(3):
+        array_a = np.random.uniform(-10.0, 10.0, (m, n))
+        for method, func in [("orthogonal", orthogonal), ("rotational", rotational),
+                             ("permutation", permutation)]:
+            res = getattr(ref, method)(array_a)
+            expected = func(array_a, array_b, translate=translate, scale=scale, weight=weight)
+            assert_almost_equal(res.error, expected.error, decimal=6)
+            assert_almost_equal(res.new_a, expected.new_a, decimal=8)
+            assert_almost_equal(res.new_b, expected.new_b, decimal=8)
+            if method == "permutation" or m > n:
+                # the transformation is unique
+                assert_almost_equal(res.t, expected.t, decimal=6)
+    # only the processed array B is kept by the reference
+    assert ref.norm_b == pytest.approx(np.linalg.norm(ref.new_b) ** 2)
+    res = ref.orthogonal(np.random.uniform(-10.0, 10.0, (m, n)), return_arrays=False)
+    assert res.new_a is None and res.new_b is None
+
+
+@pytest.mark.parametrize("n", np.random.randint(2, 10, 5))
+def test_reference_orthogonal_2sided(n):
+    r"""Test two-sided orthogonal Procrustes against a prepared reference."""
+    array_b = np.random.uniform(-10.0, 10.0, (n, n))
+    array_b = np.dot(array_b, array_b.T)
+    ref = Reference(array_b)
+    for single in [True, False, True]:
+        array_a = np.random.uniform(-10.0, 10.0, (n, n))
+        array_a = np.dot(array_a, array_a.T)
+        res = ref.orthogonal_2sided(array_a, single=single)
+        expected = orthogonal_2sided(array_a, array_b, single=single)
+        assert_almost_equal(res.error, expected.error, decimal=6)
+        assert_almost_equal(np.dot(np.dot(res.s, array_a), res.t),
+                            np.dot(np.dot(expected.s, array_a), expected.t), decimal=6)
+    # padded reference is decomposed without being cached
+    array_a = np.random.uniform(-10.0, 10.0, (n + 1, n + 1))
+    array_a = np.dot(array_a, array_a.T)
+    res = ref.orthogonal_2sided(array_a)
+    assert_almost_equal(res.error, orthogonal_2sided(array_a, array_b).error, decimal=6)
+    assert ref._eigh_b[0].shape == (n,)
+    # check non-symmetric input
+    assert_raises(ValueError, ref.orthogonal_2sided, np.random.uniform(-10.0, 10.0, (n, n)))
+    assert_raises(ValueError, Reference(np.arange(9.).reshape(3, 3)).orthogonal_2sided, np.eye(3))
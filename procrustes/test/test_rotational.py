@@ -24,7 +24,7 @@
 
 import numpy as np
 from numpy.testing import assert_almost_equal
-from procrustes import rotational
+from procrustes import kabsch, rotational, rotational_batch, rotational_stream
 import pytest
 from scipy.stats import special_ortho_group
 
@@ -123,3 +123,72 @@ def test_rotational_raises_error_shape_mismatch():
         rotational(array_a, array_b, pad=False, unpad_row=True)
     with pytest.raises(ValueError):
         rotational(array_a, array_b, pad=False, unpad_row=True, unpad_col=True)
+
+
+@pytest.mark.parametrize("k, m, n", np.random.randint(2, 20, (3, 3)))
+def test_rotational_batch_matches_loop(k, m, n):
+    r"""Test batched rotational Procrustes against one-by-one rotational Procrustes."""
+    array_a = np.random.uniform(-10.0, 10.0, (k, m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (k, m, n))
+    res = rotational_batch(array_a, array_b, translate=True, scale=True)
+    assert res.t.shape == (k, n, n)
+    assert_almost_equal(np.linalg.det(res.t), np.ones(k), decimal=6)
+    for index in range(k):
+        expected = rotational(array_a[index], array_b[index], translate=True, scale=True)
+        assert_almost_equal(res.error[index], expected.error, decimal=6)
+        # check transformation array, only if it is unique
+        if m > n:
+            assert_almost_equal(res.t[index], expected.t, decimal=6)
+
+
+@pytest.mark.parametrize("m, n", [(10, 2), (10, 3), (100, 3)])
+def test_rotational_closed_form_matches_svd(m, n):
+    r"""Test rotational Procrustes of 2D & 3D coordinates against the SVD-based solution."""
+    array_a = np.random.uniform(-10.0, 10.0, (m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (m, n))
+    res = rotational(array_a, array_b, translate=True)
+    # compute the SVD-based rotation
+    u, _, vt = np.linalg.svd(np.dot(res.new_a.T, res.new_b))
+    u[:, -1] *= np.sign(np.linalg.det(np.dot(u, vt)))
+    assert_almost_equal(res.t, np.dot(u, vt), decimal=8)
+    assert_almost_equal(np.linalg.det(res.t), 1.0, decimal=8)
+    # check rotated coordinates are recovered exactly
+    rot_array = special_ortho_group.rvs(n)
+    res = rotational(array_a, np.dot(array_a, rot_array))
+    assert_almost_equal(res.t, rot_array, decimal=8)
+    assert_almost_equal(res.error, 0.0, decimal=6)
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_kabsch_stacked_frames(n):
+    r"""Test closed-form rotational Procrustes of stacked frames with a shared reference."""
+    nframe, natom = 20, 15
+    array_b = np.random.uniform(-5.0, 5.0, (natom, n))
+    rot_arrays = np.array([special_ortho_group.rvs(n) for _ in range(nframe)])
+    noise = np.random.normal(0.0, 0.1, (nframe, natom, n))
+    # frames are rotated & translated copies of the reference with noise
+    array_a = np.matmul(array_b + noise, np.swapaxes(rot_arrays, 1, 2)) + 3.0
+    res = kabsch(array_a, array_b, translate=True)
+    assert res.t.shape == (nframe, n, n)
+    assert res.rmsd.shape == (nframe,)
+    for index in range(nframe):
+        expected = rotational(array_a[index], array_b, translate=True)
+        assert_almost_equal(res.t[index], expected.t, decimal=8)
+        assert_almost_equal(res.error[index], expected.error, decimal=8)
+        assert_almost_equal(res.rmsd[index], np.sqrt(expected.error / natom), decimal=8)
+    # check invalid inputs
+    pytest.raises(ValueError, kabsch, np.ones((5, 4)), np.ones((5, 4)))
+    pytest.raises(ValueError, kabsch, np.ones((5, 3)), np.ones((4, 3)))
+    pytest.raises(TypeError, kabsch, np.ones(3), np.ones(3))
+
+
+@pytest.mark.parametrize("m, n, nchunk", [(100, 3, 7), (50, 8, 3)])
+def test_rotational_stream_matches_arrays(m, n, nchunk):
+    r"""Test rotational Procrustes of row chunks against rotational Procrustes of whole arrays."""
+    array_a = np.random.uniform(-10.0, 10.0, (m, n))
+    array_b = np.dot(array_a, special_ortho_group.rvs(n)) + np.random.normal(0.0, 0.1, (m, n))
+    chunks = zip(np.array_split(array_a, nchunk), np.array_split(array_b, nchunk))
+    res = rotational_stream(chunks, translate=True, scale=True)
+    expected = rotational(array_a, array_b, translate=True, scale=True)
+    assert_almost_equal(res.t, expected.t, decimal=8)
+    assert_almost_equal(res.error, expected.error, decimal=8)
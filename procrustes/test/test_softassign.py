@@ -28,6 +28,7 @@ import warnings
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises
 from procrustes import softassign
+from procrustes.utils import compute_error
 
 
 def test_softassign_4by4():
@@ -352,3 +353,21 @@ def test_softassign_kopt():
                                gamma_scaler=1.5,
                                n_stop=2)
     assert res_no_kopt["error"] >= res_with_kopt["error"]
+
+
+def test_softassign_kopt_method():
+    """Test softassign with tabu search & simulated annealing local search."""
+    rng = np.random.default_rng(seed=3456)
+    array_a = rng.integers(low=-5, high=10, size=(8, 8))
+    array_b = rng.integers(low=-5, high=10, size=(8, 8))
+    options = {"remove_zero_row": False, "remove_zero_col": False, "iteration_soft": 1,
+               "iteration_sink": 1, "beta_r": 1.05, "beta_f": 1.e3, "gamma_scaler": 1.5,
+               "n_stop": 2}
+    res_no_kopt = softassign(array_a, array_b, kopt=False, **options)
+    for kopt_method in ["tabu", "anneal"]:
+        res = softassign(array_a, array_b, kopt=True, kopt_method=kopt_method, kopt_iter=200,
+                         kopt_seed=42, **options)
+        assert res["error"] <= res_no_kopt["error"]
+        assert_almost_equal(res["error"], compute_error(array_a, array_b, res["t"], res["t"].T),
+                            decimal=6)
+    assert_raises(ValueError, softassign, array_a, array_b, kopt=True, kopt_method="none")
@@ -24,7 +24,7 @@
 
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_equal
-from procrustes import symmetric
+from procrustes import symmetric, symmetric_batch
 from procrustes.test.common import minimize_one_transformation
 import pytest
 from scipy.stats import ortho_group
@@ -168,3 +168,16 @@ def test_fat_rectangular_matrices_with_square_padding_with_lapack_driver(nrow):
     # check results (solution is not uniqueness)
     assert_almost_equal(np.abs(res.error - desired_func), 0.0, decimal=5)
     assert_equal(res.s, None)
+
+
+@pytest.mark.parametrize("k, m, n", np.random.randint(2, 20, (3, 3)))
+def test_symmetric_batch_matches_loop(k, m, n):
+    r"""Test batched symmetric Procrustes against one-by-one symmetric Procrustes."""
+    array_a = np.random.uniform(-10.0, 10.0, (k, m, n))
+    array_b = np.random.uniform(-10.0, 10.0, (k, m, n))
+    res = symmetric_batch(array_a, array_b, scale=True)
+    assert res.t.shape == (k, n, n)
+    for index in range(k):
+        expected = symmetric(array_a[index], array_b[index], scale=True)
+        assert_almost_equal(res.t[index], res.t[index].T, decimal=6)
+        assert_almost_equal(res.error[index], expected.error, decimal=6)
@@ -22,9 +22,26 @@
 # --
 """Utils module for Procrustes."""
 
+import pickle
+
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises
-from procrustes.utils import _hide_zero_padding, _scale_array, _translate_array, _zero_padding
+from procrustes import utils
+from procrustes.generic import generic
+from procrustes.orthogonal import orthogonal, orthogonal_2sided, orthogonal_stream
+from procrustes.permutation import permutation
+from procrustes.rotational import rotational
+from procrustes.symmetric import symmetric
+from procrustes.utils import (
+    _check_finite,
+    _compute_error_analytic,
+    _hide_zero_padding,
+    _scale_array,
+    _translate_array,
+    _zero_padding,
+    iter_row_chunks,
+    setup_input_arrays,
+)
 
 
 def test_zero_padding_rows():
@@ -348,3 +365,140 @@ def test_scale_array():
     # array_trans_scale should be identical to array after the above analysis
     expected = array_a
     assert (abs(predicted - expected) < 1.e-10).all()
+
+
+def test_zero_padding_returns_input_without_copy():
+    r"""Test _zero_padding returns the given arrays when no padding is needed."""
+    array1 = np.random.uniform(-1, 1, (4, 3))
+    array2 = np.random.uniform(-1, 1, (4, 3))
+    padded1, padded2 = _zero_padding(array1, array2, pad_mode="row-col")
+    assert padded1 is array1
+    assert padded2 is array2
+    # only the array needing padding is (re)allocated
+    array3 = np.random.uniform(-1, 1, (2, 3))
+    padded1, padded3 = _zero_padding(array1, array3, pad_mode="row")
+    assert padded1 is array1
+    assert padded3.shape == (4, 3)
+    assert_almost_equal(padded3[:2], array3, decimal=12)
+    assert_almost_equal(padded3[2:], 0.0, decimal=12)
+
+
+def test_check_finite_chunks():
+    r"""Test _check_finite detects NaNs and Infs in any block of rows."""
+    array = np.random.uniform(-1, 1, (50, 3))
+    assert _check_finite(array, chunk_size=7) is array
+    array[-1, 2] = np.nan
+    assert_raises(ValueError, _check_finite, array, chunk_size=7)
+    array[-1, 2] = np.inf
+    assert_raises(ValueError, _check_finite, array)
+
+
+def test_setup_input_arrays_memmap(tmp_path):
+    r"""Test setup_input_arrays does not copy memory-mapped arrays when there is nothing to do."""
+    array_a = np.memmap(tmp_path / "a.dat", dtype=float, mode="w+", shape=(20, 3))
+    array_b = np.memmap(tmp_path / "b.dat", dtype=float, mode="w+", shape=(20, 3))
+    array_a[:] = np.random.uniform(-1, 1, (20, 3))
+    array_b[:] = np.random.uniform(-1, 1, (20, 3))
+    new_a, new_b = setup_input_arrays(array_a, array_b, remove_zero_col=False,
+                                      remove_zero_row=False, pad=True, translate=False,
+                                      scale=False, check_finite=True, weight=None)
+    assert np.shares_memory(new_a, array_a)
+    assert np.shares_memory(new_b, array_b)
+
+
+def test_iter_row_chunks_memmap_stream(tmp_path):
+    r"""Test streaming Procrustes over row chunks of memory-mapped arrays."""
+    array_a = np.memmap(tmp_path / "a.dat", dtype=float, mode="w+", shape=(103, 4))
+    array_b = np.memmap(tmp_path / "b.dat", dtype=float, mode="w+", shape=(103, 4))
+    array_a[:] = np.random.uniform(-10, 10, (103, 4))
+    array_b[:] = np.random.uniform(-10, 10, (103, 4))
+    chunks = list(iter_row_chunks(array_a, array_b, chunk_size=10))
+    assert len(chunks) == 11
+    assert all(np.shares_memory(chunk_a, array_a) for chunk_a, _ in chunks)
+    res = orthogonal_stream(iter_row_chunks(array_a, array_b, chunk_size=10), translate=True,
+                            scale=True)
+    expected = orthogonal(np.array(array_a), np.array(array_b), translate=True, scale=True)
+    assert_almost_equal(res.t, expected.t, decimal=6)
+    assert_almost_equal(res.error, expected.error, decimal=6)
+    # check invalid inputs
+    assert_raises(ValueError, next, iter_row_chunks(array_a, array_b[:10]))
+    assert_raises(ValueError, next, iter_row_chunks(array_a, array_b, chunk_size=0))
+    assert_raises(ValueError, next, iter_row_chunks(array_a, array_b, weight=np.ones(5)))
+
+
+def test_hide_zero_padding_blocks():
+    r"""Test _hide_zero_padding on large arrays scanned in several blocks."""
+    array = np.zeros((3000, 700))
+    array[:1234, :567] = np.random.uniform(1, 2, (1234, 567))
+    unpadded = _hide_zero_padding(array)
+    assert unpadded.shape == (1234, 567)
+    assert np.shares_memory(unpadded, array)
+    # zero values inside of the array are kept
+    array[:1234, 566] = 0.0
+    array[1233, :] = 0.0
+    array[0, 565] = 1.e-3
+    assert _hide_zero_padding(array).shape == (1233, 566)
+    assert _hide_zero_padding(array, remove_zero_col=False).shape == (1233, 700)
+    assert _hide_zero_padding(array, remove_zero_row=False).shape == (3000, 566)
+    assert _hide_zero_padding(np.zeros((4, 3))).shape == (0, 0)
+
+
+def test_setup_input_arrays_weight_broadcast():
+    r"""Test the weighting, translation & scaling of setup_input_arrays."""
+    nrow, ncol = np.random.randint(2, 10, 2)
+    array_a = np.random.uniform(-10, 10, (nrow, ncol))
+    array_b = np.random.uniform(-10, 10, (nrow, ncol))
+    weight = np.random.uniform(0, 1, nrow)
+    for translate in [True, False]:
+        new_a, new_b = setup_input_arrays(array_a, array_b, False, False, True, translate, True,
+                                          True, weight)
+        if translate:
+            expected_a = array_a - np.average(array_a, axis=0, weights=weight)
+            expected_b = array_b - np.average(array_b, axis=0, weights=weight)
+        else:
+            expected_a = np.dot(np.diag(weight), array_a)
+            expected_b = np.dot(np.diag(weight), array_b)
+        assert_almost_equal(new_a, expected_a / np.linalg.norm(expected_a), decimal=10)
+        assert_almost_equal(new_b, expected_b / np.linalg.norm(expected_b), decimal=10)
+    # negative weights are not allowed
+    assert_raises(ValueError, setup_input_arrays, array_a, array_b, False, False, True, False, True,
+                  True, -weight)
+
+
+def test_compute_error_analytic(monkeypatch):
+    r"""Test analytic errors of the solvers are cross-checked against compute_error."""
+    monkeypatch.setattr(utils, "CHECK_ERROR", True)
+    array_a = np.random.uniform(-10, 10, (6, 4))
+    array_b = np.random.uniform(-10, 10, (6, 4))
+    for func in [orthogonal, rotational, generic, symmetric, permutation]:
+        res = func(array_a, array_b)
+        assert_almost_equal(res.error, utils.compute_error(res.new_a, res.new_b, res.t), decimal=8)
+    array_a, array_b = np.dot(array_a.T, array_a), np.dot(array_b.T, array_b)
+    for single in [True, False]:
+        res = orthogonal_2sided(array_a, array_b, single=single)
+        assert_almost_equal(res.error, utils.compute_error(res.new_a, res.new_b, res.t, res.s),
+                            decimal=8)
+    # a wrong analytic error is detected, and negative round-off errors are clipped
+    assert_raises(RuntimeError, _compute_error_analytic, 1.0, array_a, array_a, np.eye(4))
+    assert _compute_error_analytic(-1.e-12, array_a, array_a, np.eye(4)) == 0.0
+
+
+def test_procrustes_result_return_arrays():
+    r"""Test results without the processed arrays are small and can be pickled."""
+    array_a = np.random.uniform(-10, 10, (50, 4))
+    array_b = np.random.uniform(-10, 10, (50, 4))
+    for func in [orthogonal, rotational, generic, symmetric, permutation]:
+        res = func(array_a, array_b, translate=True, return_arrays=False)
+        expected = func(array_a, array_b, translate=True)
+        assert res.new_a is None and res.new_b is None
+        assert_almost_equal(res.error, expected.error, decimal=8)
+        assert_almost_equal(res.t, expected.t, decimal=8)
+        # the pickled result only holds the (small) transformation and error
+        new_res = pickle.loads(pickle.dumps(res))
+        assert isinstance(new_res, utils.ProcrustesResult)
+        assert_almost_equal(new_res.t, res.t, decimal=8)
+        assert len(pickle.dumps(res)) < len(pickle.dumps(expected)) / 5
+    # the result has no instance dictionary, so attributes are stored as items
+    assert not hasattr(res, "__dict__")
+    res.extra = 1.0
+    assert res["extra"] == 1.0
@@ -23,13 +23,21 @@
 """Utility Module."""
 
 import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
 
 __all__ = [
     "compute_error",
     "setup_input_arrays",
+    "iter_row_chunks",
     "ProcrustesResult",
 ]
 
+# If True, the Procrustes errors evaluated analytically by the solvers (from the factorizations
+# used to find the transformations) are cross-checked against the explicit formula of
+# `compute_error`. This is meant for debugging, as it adds back the cost of forming A T - B.
+CHECK_ERROR = False
+
 
 def _zero_padding(array_a, array_b, pad_mode="row-col"):
     r"""
@@ -76,40 +84,48 @@ def _zero_padding(array_a, array_b, pad_mode="row-col"):
         # special case of square arrays, mode is set to None so that array_a & array_b are returned.
         pad_mode = None
 
+    # compute the shape of the padded arrays
+    (a_n1, a_m1), (a_n2, a_m2) = array_a.shape, array_b.shape
+    shape_a, shape_b = [a_n1, a_m1], [a_n2, a_m2]
     if pad_mode == "square":
         # calculate desired dimension of square array
-        (a_n1, a_m1), (a_n2, a_m2) = array_a.shape, array_b.shape
         dim = max(a_n1, a_n2, a_m1, a_m2)
-        # padding rows to have both arrays have dim rows
-        if a_n1 < dim:
-            array_a = np.pad(array_a, [[0, dim - a_n1], [0, 0]], "constant", constant_values=0)
-        if a_n2 < dim:
-            array_b = np.pad(array_b, [[0, dim - a_n2], [0, 0]], "constant", constant_values=0)
-        # padding columns to have both arrays have dim columns
-        if a_m1 < dim:
-            array_a = np.pad(array_a, [[0, 0], [0, dim - a_m1]], "constant", constant_values=0)
-        if a_m2 < dim:
-            array_b = np.pad(array_b, [[0, 0], [0, dim - a_m2]], "constant", constant_values=0)
-
+        shape_a, shape_b = [dim, dim], [dim, dim]
     if pad_mode in ["row", "row-col"]:
         # padding rows to have both arrays have the same number of rows
-        diff = array_a.shape[0] - array_b.shape[0]
-        if diff < 0:
-            array_a = np.pad(array_a, [[0, -diff], [0, 0]], "constant", constant_values=0)
-        else:
-            array_b = np.pad(array_b, [[0, diff], [0, 0]], "constant", constant_values=0)
-
+        shape_a[0] = shape_b[0] = max(a_n1, a_n2)
     if pad_mode in ["col", "row-col"]:
         # padding columns to have both arrays have the same number of columns
-        diff = array_a.shape[1] - array_b.shape[1]
-        if diff < 0:
-            array_a = np.pad(array_a, [[0, 0], [0, -diff]], "constant", constant_values=0)
-        else:
-            array_b = np.pad(array_b, [[0, 0], [0, diff]], "constant", constant_values=0)
+        shape_a[1] = shape_b[1] = max(a_m1, a_m2)
 
+    # allocate each padded array once (instead of padding rows & columns one after the other)
+    array_a = _pad_array(array_a, shape_a)
+    array_b = _pad_array(array_b, shape_b)
     return array_a, array_b
 
 
+def _pad_array(array, shape):
+    """Return array padded with zero rows (bottom) and columns (right) to the given shape."""
+    if array.shape == tuple(shape):
+        return array
+    padded = np.zeros(shape, dtype=array.dtype)
+    padded[:array.shape[0], :array.shape[1]] = array
+    return padded
+
+
+def _check_finite(array, chunk_size=2 ** 20):
+    """Raise ValueError if array contains NaNs or Infs, checking blocks of rows without copying.
+
+    Unlike `np.asarray_chkfinite`, the temporary boolean array only covers a block of about
+    `chunk_size` elements, so memory-mapped arrays are checked without loading them at once.
+    """
+    nrow = max(1, chunk_size // max(1, int(np.prod(array.shape[1:]))))
+    for start in range(0, array.shape[0], nrow):
+        if not np.isfinite(array[start:start + nrow]).all():
+            raise ValueError("array must not contain infs or NaNs")
+    return array
+
+
 def _translate_array(array_a, array_b=None, weight=None):
     """
     Return translated array_a and translation vector.
@@ -207,27 +223,43 @@ def _hide_zero_padding(array_a, remove_zero_col=True, remove_zero_row=True, tol=
         raise TypeError("Matrix inputs must be 1- or 2- dimensional arrays")
     # Check zero rows from bottom to top
     if remove_zero_row:
-        num_row = array_a.shape[0]
         tmp_a = array_a[..., np.newaxis] if array_a.ndim == 1 else array_a
-        for array_v in tmp_a[::-1]:
-            if any(abs(i) > tol for i in array_v):
-                break
-            num_row -= 1
-        array_a = array_a[:num_row]
-    # Cut off zero rows
-    if remove_zero_col:
-        if array_a.ndim == 2:
-            # Check zero columns from right to left
-            col_m = array_a.shape[1]
-            for array_v in array_a.T[::-1]:
-                if any(abs(i) > tol for i in array_v):
-                    break
-                col_m -= 1
-            # Cut off zero columns
-            array_a = array_a[:, :col_m]
+        array_a = array_a[:_count_leading_nonzero(tmp_a, tol)]
+    # Cut off zero columns
+    if remove_zero_col and array_a.ndim == 2:
+        # Check zero columns from right to left
+        array_a = array_a[:, :_count_leading_nonzero(array_a.T, tol, block_axis=1)]
     return array_a
 
 
+def _count_leading_nonzero(array, tol, block_axis=0, chunk_size=2 ** 20):
+    r"""Return the number of rows of a 2D-array remaining once trailing zero rows are removed.
+
+    The rows are scanned in blocks of about `chunk_size` elements, starting from the bottom for
+    rows (`block_axis=0`), so only the trailing zero rows and the block containing the last
+    non-zero row are read. When the rows are the columns of a C-ordered array (`block_axis=1`),
+    the blocks are taken along the other axis and the scan stops as soon as the last column is
+    known to be non-zero.
+    """
+    nrow, ncol = array.shape
+    if array.size == 0:
+        return 0
+    if block_axis == 0:
+        step = max(1, chunk_size // ncol)
+        for stop in range(nrow, 0, -step):
+            nonzero = np.flatnonzero((np.abs(array[max(0, stop - step):stop]) > tol).any(axis=1))
+            if nonzero.size:
+                return max(0, stop - step) + nonzero[-1] + 1
+        return 0
+    step = max(1, chunk_size // nrow)
+    nonzero = np.zeros(nrow, dtype=bool)
+    for start in range(0, ncol, step):
+        nonzero |= (np.abs(array[:, start:start + step]) > tol).any(axis=1)
+        if nonzero[-1]:
+            break
+    return np.flatnonzero(nonzero)[-1] + 1 if nonzero.any() else 0
+
+
 def compute_error(a, b, t, s=None):
     r"""Return the one- or two-sided Procrustes (squared Frobenius norm) error.
 
@@ -317,6 +349,115 @@ def setup_input_arrays(array_a, array_b, remove_zero_col, remove_zero_row,
     return array_a, array_b
 
 
+def iter_row_chunks(array_a, array_b, weight=None, chunk_size=100000):
+    r"""
+    Iterate over chunks of rows of two arrays (and weights) without copying them.
+
+    This is meant for feeding (memory-mapped) arrays with a large number of rows to the streaming
+    Procrustes routines, e.g., :func:`procrustes.orthogonal_stream`. The chunks are views of the
+    given arrays, so translating, weighting, scaling and padding are folded into the accumulated
+    :math:`\mathbf{A}^\dagger\mathbf{A}` and :math:`\mathbf{A}^\dagger\mathbf{B}` products instead
+    of materializing processed copies of the (possibly larger than memory) arrays.
+
+    Parameters
+    ----------
+    array_a : ndarray
+        The 2D-array :math:`\mathbf{A}`, e.g., a `np.memmap`.
+    array_b : ndarray
+        The 2D-array :math:`\mathbf{B}` with the same number of rows as :math:`\mathbf{A}`.
+    weight : ndarray, optional
+        The 1D-array representing the weights of each row.
+    chunk_size : int, optional
+        The (maximum) number of rows in each chunk.
+
+    Yields
+    ------
+    tuple :
+        The ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` views of consecutive rows.
+
+    Examples
+    --------
+    >>> a = np.memmap("a.dat", dtype=float, mode="r", shape=(10000000, 100))
+    >>> b = np.memmap("b.dat", dtype=float, mode="r", shape=(10000000, 100))
+    >>> res = orthogonal_stream(iter_row_chunks(a, b), translate=True)
+
+    """
+    _check_arraytypes(array_a, array_b)
+    if array_a.shape[0] != array_b.shape[0]:
+        raise ValueError(f"Arrays A and B should have the same number of rows: "
+                         f"{array_a.shape[0]} != {array_b.shape[0]}")
+    if weight is not None and weight.shape != (array_a.shape[0],):
+        raise ValueError("The weight should be a 1d row vector with one element per row.")
+    if chunk_size < 1:
+        raise ValueError(f"Argument chunk_size={chunk_size} should be a positive integer.")
+    for start in range(0, array_a.shape[0], chunk_size):
+        rows = slice(start, start + chunk_size)
+        if weight is None:
+            yield array_a[rows], array_b[rows]
+        else:
+            yield array_a[rows], array_b[rows], weight[rows]
+
+
+def _setup_input_arrays_sparse(array_a, array_b, remove_zero_col, remove_zero_row, pad, translate,
+                               scale, check_finite, weight):
+    r"""
+    Check and process sparse array inputs for the Procrustes transformation routines.
+
+    This mirrors ``setup_input_arrays`` for `scipy.sparse` matrices (dense arrays are converted),
+    returning CSR matrices. The rows are weighted and the arrays are scaled and padded without
+    making them dense. Translation is not supported, as subtracting the centroid would make the
+    arrays dense.
+
+    Returns
+    -------
+    (scipy.sparse.csr_matrix, scipy.sparse.csr_matrix) :
+        Returns the processed sparse arrays.
+
+    """
+    if translate:
+        raise ValueError("Argument translate=True is not supported for sparse arrays, because "
+                         "translating them makes them dense.")
+    if weight is not None:
+        if weight.ndim != 1:
+            raise ValueError("The weight should be a 1d row vector.")
+        if not (weight >= 0).all():
+            raise ValueError("The elements of the weight should be non-negative.")
+
+    arrays = []
+    for array in (array_a, array_b):
+        array = scipy.sparse.csr_matrix(array)
+        if array.ndim != 2:
+            raise TypeError("Matrix inputs must be 2-dimensional arrays")
+        if check_finite and not np.isfinite(array.data).all():
+            raise ValueError("array must not contain infs or NaNs")
+        if remove_zero_row or remove_zero_col:
+            # remove zero rows (bottom) & columns (right) based on the non-zero elements
+            coo = array.tocoo()
+            nonzero = np.abs(coo.data) > 1.0e-8
+            nrow = coo.row[nonzero].max() + 1 if nonzero.any() else 0
+            ncol = coo.col[nonzero].max() + 1 if nonzero.any() else 0
+            array = array[:nrow if remove_zero_row else array.shape[0],
+                          :ncol if remove_zero_col else array.shape[1]]
+        if weight is not None:
+            array = array.multiply(weight[:, np.newaxis]).tocsr()
+        if scale:
+            array = array / scipy.sparse.linalg.norm(array)
+        arrays.append(array)
+
+    if pad:
+        shape = np.max([array.shape for array in arrays], axis=0)
+        arrays = [_pad_sparse(array, shape) for array in arrays]
+    return arrays[0], arrays[1]
+
+
+def _pad_sparse(array, shape):
+    """Return sparse CSR array padded with zero rows (bottom) and columns (right), sharing data."""
+    if array.shape == tuple(shape):
+        return array
+    indptr = np.concatenate((array.indptr, np.full(shape[0] - array.shape[0], array.indptr[-1])))
+    return scipy.sparse.csr_matrix((array.data, array.indices, indptr), shape=tuple(shape))
+
+
 def setup_input_arrays_multi(array_list, array_ref, remove_zero_col, remove_zero_row,
                              pad_mode, translate, scale, check_finite, weight):
     r"""
@@ -378,24 +519,251 @@ def setup_input_arrays_multi(array_list, array_ref, remove_zero_col, remove_zero
     return array_list_new
 
 
+def _setup_input_stacks(array_a, array_b, translate, scale, check_finite, weight):
+    r"""
+    Check and process stacks of arrays for the batched Procrustes transformation routines.
+
+    Each item of the stacks is processed exactly like ``setup_input_arrays`` processes a single
+    array (i.e., translate, weight and scale), but all items are handled at once by broadcasting
+    over the leading axis.
+
+    Parameters
+    ----------
+    array_a : ndarray
+        The 3D-array :math:`\mathbf{A}_{k \times m \times n}` holding a stack of :math:`k`
+        matrices being transformed.
+    array_b : ndarray
+        The 3D-array :math:`\mathbf{B}_{k \times m \times n}` holding a stack of :math:`k`
+        reference matrices.
+    translate : bool
+        If true, then translate each item of both stacks to the origin, ie columns of each matrix
+        will have mean zero.
+    scale : bool
+        If True, each item of both stacks is normalized to one with respect to the Frobenius norm.
+    check_finite : bool
+        If true, then checks if both stacks contain NaNs or Infs.
+    weight : ndarray
+        The 1D-array of row weights shared by all items of both stacks. Default=None.
+
+    Returns
+    -------
+    (ndarray, ndarray) :
+        Returns the processed stacks.
+
+    """
+    if not isinstance(array_a, np.ndarray) or not isinstance(array_b, np.ndarray):
+        raise TypeError("Matrix inputs must be NumPy arrays")
+    if array_a.ndim != 3 or array_b.ndim != 3:
+        raise TypeError("Matrix stack inputs must be 3-dimensional arrays")
+    if array_a.shape != array_b.shape:
+        raise ValueError(f"Shape of A and B stacks does not match: {array_a.shape} != "
+                         f"{array_b.shape}")
+    if check_finite:
+        array_a = _check_finite(array_a)
+        array_b = _check_finite(array_b)
+    if weight is not None:
+        if weight.ndim != 1:
+            raise ValueError("The weight should be a 1d row vector.")
+        if not (weight >= 0).all():
+            raise ValueError("The elements of the weight should be non-negative.")
+
+    stacks = []
+    for array in (array_a, array_b):
+        if translate:
+            array = array - np.average(array, axis=1, weights=weight)[:, np.newaxis, :]
+        elif weight is not None:
+            array = array * weight[np.newaxis, :, np.newaxis]
+        if scale:
+            norm = np.linalg.norm(array, axis=(1, 2))[:, np.newaxis, np.newaxis]
+            # scale in-place when a new array was already made by translating or weighting
+            inplace = (translate or weight is not None) and array.dtype.kind in "fc"
+            array = np.divide(array, norm, out=array if inplace else None)
+        stacks.append(array)
+    return stacks[0], stacks[1]
+
+
+def _compute_error_stack(a, b, t):
+    r"""Return the one-sided Procrustes error of each item of the stacks."""
+    diff = np.matmul(a, t) - b
+    return np.einsum("kij,kij->k", diff, diff)
+
+
+def _compute_error_analytic(error, a, b, t, s=None):
+    r"""Return the Procrustes error(s) evaluated analytically by a solver, clipped at zero.
+
+    The solvers evaluate the error from the factorization used to find the transformation(s),
+    e.g., :math:`\|\mathbf{A}\|_F^2 + \|\mathbf{B}\|_F^2 - 2\sum_i \sigma_i` for the orthogonal
+    Procrustes, which avoids forming :math:`\mathbf{S}\mathbf{A}\mathbf{T} - \mathbf{B}`. When
+    `CHECK_ERROR` is True, the error is compared to the one computed by `compute_error` (or by
+    `_compute_error_stack` for stacks of arrays) and a RuntimeError is raised if they differ.
+    """
+    error = np.maximum(error, 0.0)
+    if CHECK_ERROR:
+        if a.ndim == 3:
+            expected = _compute_error_stack(a, b, t)
+        else:
+            expected = compute_error(a, b, t, s)
+        atol = 1.e-8 * max(1.0, np.linalg.norm(a) ** 2 + np.linalg.norm(b) ** 2)
+        if not np.allclose(error, expected, rtol=1.e-6, atol=atol):
+            raise RuntimeError(f"Analytic error {error} does not match the explicit error "
+                               f"{expected}.")
+    return error
+
+
+def _compute_statistics_stream(chunks, pad, translate, scale, check_finite):
+    r"""
+    Accumulate the sufficient statistics of one-sided Procrustes from chunks of rows.
+
+    The one-sided Procrustes methods only depend on the input arrays through
+    :math:`\mathbf{A}^\dagger\mathbf{A}`, :math:`\mathbf{A}^\dagger\mathbf{B}` and the norm
+    :math:`\|\mathbf{B}\|_F^2`, so these are accumulated chunk by chunk using
+    :math:`\mathcal{O}(n^2)` memory regardless of the number of rows. The (optional) translation,
+    weighting, scaling and padding are applied to the accumulated statistics, so that they are
+    equal to those of the arrays processed by ``setup_input_arrays``.
+
+    Parameters
+    ----------
+    chunks : iterable
+        An iterable (e.g., generator) of ``(a_i, b_i)`` or ``(a_i, b_i, w_i)`` tuples, where
+        ``a_i`` and ``b_i`` are 2D-arrays holding consecutive rows of :math:`\mathbf{A}` and
+        :math:`\mathbf{B}`, and ``w_i`` is the 1D-array of the corresponding row weights.
+    pad : bool
+        If True, the statistics are padded with zeros as if :math:`\mathbf{A}` and
+        :math:`\mathbf{B}` had been padded with zero columns to have the same shape.
+    translate : bool
+        If true, then translate both arrays :math:`A, B` to the origin, ie columns of the arrays
+        will have mean zero. The weights are used for computing the (weighted) centroids.
+    scale : bool
+        If True, both arrays are normalized to one with respect to the Frobenius norm.
+    check_finite : bool
+        If true, then checks if the chunks contain NaNs or Infs.
+
+    Returns
+    -------
+    (ndarray, ndarray, float, float) :
+        The arrays :math:`\mathbf{A}^\dagger\mathbf{A}` and :math:`\mathbf{A}^\dagger\mathbf{B}`,
+        and the squared Frobenius norms :math:`\|\mathbf{A}\|_F^2` and :math:`\|\mathbf{B}\|_F^2`.
+
+    """
+    ata, atb, norm_a, norm_b = None, None, 0.0, 0.0
+    # the sums of (weighted) rows & weights used for computing the centroids
+    sum_a, sum_b, sum_wa, sum_wb, sum_w, nrow = 0.0, 0.0, 0.0, 0.0, 0.0, 0
+    shift_a, shift_b = 0.0, 0.0
+    for chunk in chunks:
+        if len(chunk) not in [2, 3]:
+            raise ValueError("Each chunk should be a tuple of (a, b) or (a, b, weight) arrays.")
+        chunk_a, chunk_b = chunk[0], chunk[1]
+        chunk_w = chunk[2] if len(chunk) == 3 else None
+        _check_arraytypes(chunk_a, chunk_b)
+        if check_finite:
+            chunk_a, chunk_b = _check_finite(chunk_a), _check_finite(chunk_b)
+        if chunk_a.shape[0] != chunk_b.shape[0]:
+            raise ValueError(f"Chunks of A and B should have the same number of rows: "
+                             f"{chunk_a.shape[0]} != {chunk_b.shape[0]}")
+        if chunk_w is not None and (chunk_w.ndim != 1 or chunk_w.shape[0] != chunk_a.shape[0]):
+            raise ValueError("The weight of each chunk should be a 1d row vector with one "
+                             "element per row.")
+        if chunk_w is not None and not (chunk_w >= 0).all():
+            raise ValueError("The elements of the weight should be non-negative.")
+
+        if ata is None:
+            ata = np.zeros((chunk_a.shape[1], chunk_a.shape[1]))
+            atb = np.zeros((chunk_a.shape[1], chunk_b.shape[1]))
+            if translate:
+                # shift rows by the mean of the first chunk to reduce round-off errors when
+                # removing the centroids; this does not change the translated arrays
+                shift_a, shift_b = np.mean(chunk_a, axis=0), np.mean(chunk_b, axis=0)
+        elif chunk_a.shape[1] != ata.shape[0] or chunk_b.shape[1] != atb.shape[1]:
+            raise ValueError("All chunks of A (and B) should have the same number of columns.")
+
+        if translate:
+            chunk_a, chunk_b = chunk_a - shift_a, chunk_b - shift_b
+            weight = np.ones(chunk_a.shape[0]) if chunk_w is None else chunk_w
+            sum_a, sum_b = sum_a + np.sum(chunk_a, axis=0), sum_b + np.sum(chunk_b, axis=0)
+            sum_wa, sum_wb = sum_wa + np.dot(weight, chunk_a), sum_wb + np.dot(weight, chunk_b)
+            sum_w += np.sum(weight)
+        elif chunk_w is not None:
+            chunk_a = chunk_a * chunk_w[:, np.newaxis]
+            chunk_b = chunk_b * chunk_w[:, np.newaxis]
+        ata += np.dot(chunk_a.T, chunk_a)
+        atb += np.dot(chunk_a.T, chunk_b)
+        norm_a += np.einsum("ij,ij->", chunk_a, chunk_a)
+        norm_b += np.einsum("ij,ij->", chunk_b, chunk_b)
+        nrow += chunk_a.shape[0]
+
+    if ata is None:
+        raise ValueError("No chunks of rows were given.")
+    if translate:
+        # remove the centroids, i.e., compute (A - 1 c_a.T).T (B - 1 c_b.T) from sums of rows
+        centroid_a, centroid_b = sum_wa / sum_w, sum_wb / sum_w
+        ata += (nrow * np.outer(centroid_a, centroid_a) - np.outer(centroid_a, sum_a)
+                - np.outer(sum_a, centroid_a))
+        atb += (nrow * np.outer(centroid_a, centroid_b) - np.outer(centroid_a, sum_b)
+                - np.outer(sum_a, centroid_b))
+        norm_a = np.trace(ata)
+        norm_b += nrow * np.dot(centroid_b, centroid_b) - 2 * np.dot(centroid_b, sum_b)
+    if scale:
+        ata /= norm_a
+        atb /= np.sqrt(norm_a * norm_b)
+        norm_a, norm_b = 1.0, 1.0
+
+    # padding A and B with zero columns pads the statistics with zeros (zero rows don't matter)
+    if ata.shape[0] != atb.shape[1]:
+        if not pad:
+            raise ValueError(f"Number of columns of A and B does not match: {ata.shape[0]} != "
+                             f"{atb.shape[1]} Check pad argument.")
+        ncol = max(atb.shape)
+        ata = np.pad(ata, [[0, ncol - ata.shape[0]]] * 2, "constant", constant_values=0)
+        atb = np.pad(atb, [[0, ncol - atb.shape[0]], [0, ncol - atb.shape[1]]], "constant",
+                     constant_values=0)
+    return ata, atb, norm_a, norm_b
+
+
+def _compute_error_statistics(ata, atb, norm_b, t):
+    r"""Return the one-sided Procrustes error from the sufficient statistics of A & B.
+
+    This uses :math:`\|\mathbf{AT} - \mathbf{B}\|_F^2 = \text{Tr}[\mathbf{T}^\dagger
+    \mathbf{A}^\dagger\mathbf{A}\mathbf{T}] - 2 \text{Tr}[\mathbf{T}^\dagger \mathbf{A}^\dagger
+    \mathbf{B}] + \|\mathbf{B}\|_F^2`, clipping the round-off errors below zero.
+    """
+    error = np.sum(t * np.dot(ata, t)) - 2 * np.sum(t * atb) + norm_b
+    return max(error, 0.0)
+
+
 def _setup_input_array_lower(array_a, array_ref, remove_zero_col, remove_zero_row, translate, scale,
                              check_finite, weight):
     """Pre-processing the matrices with translation, scaling."""
     _check_arraytypes(array_a)
     if check_finite:
-        array_a = np.asarray_chkfinite(array_a)
+        array_a = _check_finite(array_a)
         # Sometimes arrays already have zero padding that messes up zero padding below.
     array_a = _hide_zero_padding(array_a, remove_zero_col, remove_zero_row)
+    if weight is not None:
+        if weight.ndim != 1:
+            raise ValueError("The weight should be a 1d row vector.")
+        if not (weight >= 0).all():
+            raise ValueError("The elements of the weight should be non-negative.")
+    if not translate and weight is None and not scale:
+        # nothing to do, so a view of the (unpadded) input array is returned
+        return array_a
+
+    # translate or weight the rows (by broadcasting) into a single new array
     if translate:
-        array_a, _ = _translate_array(array_a, array_ref, weight)
-    # scale the matrix when translate is False, but weight is True
+        centroid = np.average(array_a, axis=0, weights=weight)
+        if array_ref is not None:
+            centroid -= np.average(array_ref, axis=0, weights=weight)
+        new_a = np.subtract(array_a, centroid, dtype=np.result_type(array_a, float))
+    elif weight is not None:
+        new_a = np.multiply(array_a, weight[:, np.newaxis], dtype=np.result_type(array_a, float))
     else:
-        if weight is not None:
-            array_a = np.dot(np.diag(weight), array_a)
-
+        new_a = np.array(array_a, dtype=np.result_type(array_a, float))
+    # scale the new array in-place
     if scale:
-        array_a, _ = _scale_array(array_a, array_ref)
-    return array_a
+        factor = 1. / np.linalg.norm(new_a)
+        if array_ref is not None:
+            factor *= np.linalg.norm(array_ref)
+        new_a *= factor
+    return new_a
 
 
 def _check_arraytypes(*args):
@@ -414,17 +782,30 @@ class ProcrustesResult(dict):
     error : float
         The Procrustes (squared Frobenius norm) error.
     new_a : ndarray
-        The translated/scaled numpy ndarray :math:`\mathbf{A}`.
+        The translated/scaled numpy ndarray :math:`\mathbf{A}`. This is None when the
+        Procrustes routine is called with ``return_arrays=False``.
     new_b : ndarray
-        The translated/scaled numpy ndarray :math:`\mathbf{B}`.
+        The translated/scaled numpy ndarray :math:`\mathbf{B}`. This is None when the
+        Procrustes routine is called with ``return_arrays=False``.
     t : ndarray
         The 2D-array :math:`\mathbf{T}` representing the right-hand-side transformation matrix.
     s : ndarray, optional
         The 2D-array :math:`\mathbf{S}` representing the left-hand-side transformation
         matrix. If set to `None`, the one-sided Procrustes is performed.
+    t_index : ndarray, optional
+        The 1D-array of indices representing the permutation matrix :math:`\mathbf{T}`, i.e.,
+        :math:`\mathbf{AT}` equals ``a[:, t_index]``. This is only given by the permutation
+        Procrustes routines.
+    s_index : ndarray, optional
+        The 1D-array of indices representing the permutation matrix :math:`\mathbf{S}`, i.e.,
+        :math:`\mathbf{SA}` equals ``a[s_index]``. This is only given by the two-sided
+        permutation Procrustes routine.
 
     """
 
+    # no instance __dict__ is needed, as the attributes are stored as the items of the dictionary
+    __slots__ = ()
+
     # modification on https://github.com/scipy/scipy/blob/v1.4.1/scipy/optimize/optimize.py#L77-L132
     def __getattr__(self, name):
         """Deal with attributes which it doesn't explicitly manage."""